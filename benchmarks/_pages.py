@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+基准测试用的模拟历史数据页面
+
+生成与 history.php 结构相同的页面，便于在没有网络的环境下重复测试。
+"""
+
+import datetime
+import os
+import random
+import sys
+from typing import List, Tuple
+
+# 允许直接以脚本方式运行基准测试
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Draw = Tuple[str, List[int], int, str]
+
+
+def make_draws(count: int, seed: int = 2003) -> List[Draw]:
+    """
+    生成模拟开奖数据，按期号升序排列
+
+    Args:
+        count: 期数
+        seed: 随机种子
+
+    Returns:
+        list: (期号, 红球列表, 蓝球, 开奖日期) 列表
+    """
+    rnd = random.Random(seed)
+    draws = []
+    day = datetime.date(2003, 2, 23)
+    year, number = day.year, 1
+    for _ in range(count):
+        if day.year != year:
+            year, number = day.year, 1
+        reds = sorted(rnd.sample(range(1, 34), 6))
+        draws.append((f"{year % 100:02d}{number:03d}", reds, rnd.randint(1, 16), day.isoformat()))
+        number += 1
+        day += datetime.timedelta(days=rnd.choice((2, 2, 3)))
+    return draws
+
+
+def render_page(draws: List[Draw]) -> str:
+    """
+    将开奖数据渲染为历史数据页面，最新一期在最前面
+
+    Args:
+        draws: 开奖数据
+
+    Returns:
+        str: HTML内容
+    """
+    out = [
+        '<html><head><meta charset="utf-8"></head><body>',
+        '<table width="100%" border="0" cellpadding="0" cellspacing="1" id="tablelist">',
+        '<thead><tr><td>期号</td><td colspan="7">中奖号码</td><td>快乐星期天</td><td>奖池奖金(元)</td>'
+        '<td>一等奖注数</td><td>一等奖奖金(元)</td><td>二等奖注数</td><td>二等奖奖金(元)</td>'
+        '<td>总投注额(元)</td><td>开奖日期</td></tr></thead>',
+        '<tbody id="tdata">',
+    ]
+    for i, (issue, reds, blue, date) in enumerate(reversed(draws)):
+        cells = ''.join(f'<td class="t_cfont2">{red:02d}</td>' for red in reds)
+        out.append(
+            f'<tr class="t_tr1"><!--<td>{i + 1}</td>--><td>{issue}</td>{cells}'
+            f'<td class="t_cfont4">{blue:02d}</td><td class="t_cfont4">&nbsp;</td>'
+            f'<td>1,234,567,890</td><td>7</td><td>6,000,000</td><td>120</td><td>200,000</td>'
+            f'<td>350,000,000</td><td>{date}</td></tr>'
+        )
+    out.append('</tbody></table></body></html>')
+    return '\n'.join(out)
+
+
+def make_page(count: int, seed: int = 2003) -> str:
+    """生成包含指定期数的历史数据页面"""
+    return render_page(make_draws(count, seed))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+按列返回数据的基准测试
+
+对比数据工具按期返回对象列表（layout="rows"）与按列返回并行数组（layout="columns"）时，
+构造并序列化为JSON的耗时和字节数，并检查两种结构包含的数据完全一致。
+同时给出同时返回Markdown（output="both"）时的字节数作为参照。
+
+运行: python benchmarks/bench_columns.py
+"""
+
+import json
+import time
+
+from _pages import make_page
+from ssq_mcp import server
+from ssq_mcp.crawler import AsyncSSQCrawler
+from ssq_mcp.parsers import parse_history_html
+from ssq_mcp.server import build_data_list
+
+
+def serialize(df, output, layout):
+    """构造数据列表并序列化为JSON"""
+    return build_data_list(df, "bench", output=output, layout=layout).model_dump_json(exclude_none=True)
+
+
+def best_of(func, repeat, *args):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    # 生成Markdown时使用不带本地存储的爬虫，避免创建数据库文件
+    server._crawler = AsyncSSQCrawler(cache_enabled=False)
+
+    print(f"{'期数':>6} {'按期(ms)':>10} {'按列(ms)':>10} {'按期(字节)':>12} {'按列(字节)':>12}"
+          f" {'字节比':>8} {'含Markdown(字节)':>18}")
+    for rows in (100, 1000, 3000):
+        df = parse_history_html(make_page(rows))
+
+        row_json = serialize(df, "structured", "rows")
+        column_json = serialize(df, "structured", "columns")
+
+        # 两种结构包含的数据应完全一致
+        data = json.loads(row_json)['data']
+        columns = json.loads(column_json)['columns']
+        assert [
+            {'issue': issue, 'red_balls': columns['red_balls'][6 * i:6 * i + 6], 'blue_ball': blue, 'draw_date': date}
+            for i, (issue, blue, date) in enumerate(zip(columns['issues'], columns['blue_balls'], columns['draw_dates']))
+        ] == data
+
+        repeat = 20 if rows <= 1000 else 5
+        row_time = best_of(serialize, repeat, df, "structured", "rows")
+        column_time = best_of(serialize, repeat, df, "structured", "columns")
+        both_size = len(serialize(df, "both", "rows").encode('utf-8'))
+        row_size, column_size = len(row_json.encode('utf-8')), len(column_json.encode('utf-8'))
+
+        print(f"{rows:>6} {row_time * 1000:>10.2f} {column_time * 1000:>10.2f} {row_size:>12} {column_size:>12}"
+              f" {row_size / column_size:>7.1f}x {both_size:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SSQData 转换基准测试
+
+对比四种将查询结果转换为 SSQData 列表的方式在100、1000和3000期数据上的耗时：
+旧的 iterrows 逐行构造、经过数据表逐行构造、跳过校验的 model_construct，
+以及按列批量校验构造（build_ssq_data），并检查序列化后的结果完全一致。
+
+在 pydantic 2 中校验由 pydantic-core 完成，model_construct 是纯Python实现，反而比校验构造更慢，
+所以批量构造保留了校验，主要节省的是 iterrows 和数据表与字符串之间往返转换的开销。
+
+运行: python benchmarks/bench_convert.py
+"""
+
+import time
+
+from _pages import make_page
+from ssq_mcp.parsers import parse_history_html
+from ssq_mcp.server import SSQData, SSQDataList, build_ssq_data
+from ssq_mcp.table import DrawTable
+
+
+def legacy_iterrows(df):
+    """旧实现：iterrows 逐行读取并完整校验"""
+    data_list = []
+    for _, row in df.iterrows():
+        data_list.append(SSQData(
+            issue=row['期号'],
+            red_balls=[int(row[f'红球{i}']) for i in range(1, 7)],
+            blue_ball=int(row['蓝球']),
+            draw_date=row['开奖日期'] if '开奖日期' in df.columns else None
+        ))
+    return data_list
+
+
+def validated_rows(df):
+    """旧的共享实现：从数据表逐行构造并完整校验"""
+    table = DrawTable.from_dataframe(df)
+    return [
+        SSQData(issue=issue, red_balls=balls[:6], blue_ball=balls[6], draw_date=draw_date)
+        for issue, balls, draw_date in zip(table.issue_strings(), table.balls.tolist(), table.date_strings())
+    ]
+
+
+def construct_rows(df):
+    """按列读取后用 model_construct 跳过校验逐行构造"""
+    construct = SSQData.model_construct
+    reds = df[['红球1', '红球2', '红球3', '红球4', '红球5', '红球6']].to_numpy().tolist()
+    return [
+        construct(issue=issue, red_balls=red_balls, blue_ball=blue_ball, draw_date=draw_date)
+        for issue, red_balls, blue_ball, draw_date in zip(df['期号'].tolist(), reds, df['蓝球'].tolist(),
+                                                           df['开奖日期'].tolist())
+    ]
+
+
+def best_of(func, arg, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def dump(data_list):
+    """序列化为JSON，用于比较结果"""
+    return SSQDataList(data=data_list, total=len(data_list), markdown="").model_dump_json()
+
+
+def main():
+    print(f"{'期数':>6} {'iterrows(ms)':>14} {'数据表逐行(ms)':>16} {'model_construct(ms)':>20}"
+          f" {'批量构造(ms)':>14} {'相对iterrows':>14}")
+    for rows in (100, 1000, 3000):
+        df = parse_history_html(make_page(rows))
+
+        expected = dump(legacy_iterrows(df))
+        assert dump(validated_rows(df)) == expected
+        assert dump(construct_rows(df)) == expected
+        assert dump(build_ssq_data(df)) == expected
+
+        repeat = 30 if rows <= 1000 else 10
+        legacy_time = best_of(legacy_iterrows, df, repeat)
+        validated_time = best_of(validated_rows, df, repeat)
+        construct_time = best_of(construct_rows, df, repeat)
+        bulk_time = best_of(build_ssq_data, df, repeat)
+
+        print(f"{rows:>6} {legacy_time * 1000:>14.2f} {validated_time * 1000:>16.2f} {construct_time * 1000:>20.2f}"
+              f" {bulk_time * 1000:>14.2f} {legacy_time / bulk_time:>13.1f}x")
+
+
+if __name__ == "__main__":
+    main()
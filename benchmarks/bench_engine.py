@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+增量分析引擎基准测试
+
+逐期追加3000期数据，每追加一期都与一次性全量计算的结果比较（包括增量更新的共现矩阵），确保两者始终一致；
+并对比追加一期与全量重新计算的耗时。
+
+运行: python benchmarks/bench_engine.py
+"""
+
+import time
+
+import numpy as np
+
+from _pages import make_draws, render_page
+from ssq_mcp.analysis import AnalysisEngine
+from ssq_mcp.parsers import parse_history_html
+from ssq_mcp.table import DrawTable
+
+
+def assert_same(engine, expected, compare_output=True):
+    """比较两个引擎的全部统计，compare_output 为True时还比较频率、遗漏和共现分析的输出"""
+    for name in ('red_counts', 'blue_counts', 'red_omission', 'blue_omission'):
+        assert np.array_equal(getattr(engine, name), getattr(expected, name)), name
+    assert engine.total == expected.total
+    assert np.array_equal(engine._prefix[:engine.total + 1], expected._prefix)
+    assert engine.latest_issue == expected.latest_issue
+    if not compare_output:
+        return
+    assert engine.frequency() is None or all(
+        engine.frequency()[key].equals(expected.frequency()[key]) for key in ('red_freq', 'blue_freq'))
+    assert engine.missing() is None or all(
+        engine.missing()[key].equals(expected.missing()[key]) for key in ('red_missing', 'blue_missing'))
+    # 遗漏分布中的当前遗漏与增量维护的遗漏期数一致
+    gaps = engine.gaps()
+    assert [item['current_gap'] for item in gaps['red_gaps']] == engine.red_omission.tolist()
+    assert [item['current_gap'] for item in gaps['blue_gaps']] == engine.blue_omission.tolist()
+    # 第一次比较后共现矩阵在追加时增量更新
+    assert engine.cooccurrence() == expected.cooccurrence()
+    assert np.array_equal(engine._pairs, expected._pairs) and engine._triples == expected._triples
+
+
+def main():
+    rows = 3000
+    # 按期号升序排列
+    table = DrawTable.from_dataframe(parse_history_html(render_page(make_draws(rows))))[::-1]
+
+    engine = AnalysisEngine()
+    append_time = 0.0
+    for i in range(rows):
+        start = time.perf_counter()
+        engine.append(int(table.issues[i]), table.reds[i].tolist(), int(table.blues[i]))
+        append_time += time.perf_counter() - start
+        # 每追加一期都与全量计算比较
+        assert_same(engine, AnalysisEngine.from_table(table[:i + 1]), compare_output=i % 100 == 0)
+
+    repeat = 100
+    start = time.perf_counter()
+    for _ in range(repeat):
+        AnalysisEngine.from_table(table)
+    full_time = (time.perf_counter() - start) / repeat
+
+    print(f"期数: {rows}，逐期追加结果与全量计算结果全部一致")
+    print(f"追加一期:     {append_time / rows * 1e6:.2f} us")
+    print(f"全量重新计算: {full_time * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CPU任务执行器基准测试
+
+BeautifulSoup 备用解析和数据分析执行期间，另一个协程每毫秒醒来一次，
+记录事件循环的最大延迟，模拟同时到达的其他MCP请求和健康检查。
+分别测量直接在事件循环中执行（inline）、线程池和进程池三种方式，
+并检查三种方式的解析结果一致，且线程池和进程池不会长时间阻塞事件循环。
+
+运行: python benchmarks/bench_executor.py
+"""
+
+import asyncio
+import time
+
+from _pages import make_page
+from ssq_mcp.crawler import AsyncSSQCrawler
+from ssq_mcp.parsers import parse_history_html, parse_history_bs4
+
+
+async def heartbeat(stop: asyncio.Event, delays: list) -> None:
+    """每毫秒醒来一次，记录实际醒来时间与预期时间的差"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+async def measure(kind: str, html_content: str, table) -> tuple:
+    """返回 (解析结果, 分析结果, 总耗时, 事件循环最大延迟, 执行器状态)"""
+    crawler = AsyncSSQCrawler(cache_enabled=False, cpu_executor=kind, cpu_workers=2)
+    # 进程池先执行一次，排除启动子进程和导入模块的时间
+    await crawler.analyze_frequency(table)
+
+    stop = asyncio.Event()
+    delays = []
+    beat = asyncio.create_task(heartbeat(stop, delays))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    df, *analyses = await asyncio.gather(
+        crawler.cpu.run(parse_history_bs4, html_content),
+        crawler.analyze_missing_periods(table),
+        crawler.analyze_cooccurrence(table),
+        crawler.analyze_gap_distribution(table),
+    )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await beat
+    status = crawler.cpu.status()
+    await crawler.close()
+    return df, analyses, elapsed, max(delays), status
+
+
+async def main():
+    html_content = make_page(1000)
+    table = parse_history_html(make_page(3000))
+
+    print(f"{'执行方式':>8} {'总耗时(ms)':>11} {'循环最大延迟(ms)':>17} {'最大排队(ms)':>13} {'最大排队数':>10}")
+    results = {}
+    for kind in ("inline", "thread", "process"):
+        df, analyses, elapsed, lag, status = await measure(kind, html_content, table)
+        results[kind] = (df, analyses, lag)
+        print(f"{kind:>8} {elapsed * 1e3:>11.1f} {lag * 1e3:>17.1f} {status['max_wait_ms']:>13.1f} {status['max_queued']:>10}")
+
+    expected_df, expected_analyses, inline_lag = results["inline"]
+    for kind in ("thread", "process"):
+        df, analyses, lag = results[kind]
+        # 三种方式的结果应完全一致
+        assert df.equals(expected_df)
+        assert str(analyses) == str(expected_analyses)
+        # 解析在事件循环之外执行，事件循环只会被短暂阻塞
+        assert lag < inline_lag / 4
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Markdown表格生成基准测试
+
+对比 pandas to_markdown（tabulate）与直接拼接字符串生成数据表格的耗时和文本长度，
+并检查两者每个单元格的内容和每列的对齐方式完全一致。
+
+运行: python benchmarks/bench_markdown.py
+"""
+
+import time
+
+from _pages import make_page
+from ssq_mcp.crawler import AsyncSSQCrawler
+from ssq_mcp.parsers import parse_history_html
+
+
+def parse_table(markdown):
+    """将Markdown表格解析为 (对齐方式, 单元格) ，忽略单元格两侧的补齐空格"""
+    lines = markdown.splitlines()
+    rows = [[cell.strip() for cell in line.strip().strip('|').split('|')] for line in lines]
+    # 对齐行只比较冒号的位置
+    align = ['right' if cell.endswith(':') else 'left' for cell in rows[1]]
+    return align, [rows[0]] + rows[2:]
+
+
+def best_of(func, arg, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    crawler = AsyncSSQCrawler(cache_enabled=False)
+
+    print(f"{'期数':>6} {'tabulate(ms)':>14} {'直接拼接(ms)':>14} {'加速比':>8} {'tabulate字符数':>16} {'直接拼接字符数':>16}")
+    for rows in (100, 1000, 3000):
+        df = parse_history_html(make_page(rows))
+
+        def legacy(data):
+            return data.to_markdown(index=False)
+
+        expected = legacy(df)
+        result = crawler.format_to_markdown(df)
+        # 两种方式生成的表格内容应完全一致
+        assert parse_table(result) == parse_table(expected)
+
+        repeat = 20 if rows <= 1000 else 5
+        tabulate_time = best_of(legacy, df, repeat)
+        direct_time = best_of(crawler.format_to_markdown, df, repeat)
+
+        print(f"{rows:>6} {tabulate_time * 1000:>14.2f} {direct_time * 1000:>14.2f} {tabulate_time / direct_time:>7.1f}x"
+              f" {len(expected):>16} {len(result):>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+遗漏期数分析基准测试
+
+对比旧的逐号码 iterrows 实现与新实现在3000期数据上的耗时，并检查两者的结果完全一致。
+新实现分别测量传入DataFrame（每次都要转换为数据表）、直接传入数据表，
+以及工具的实际路径：从已命中的内存缓存获取数据表（复用已转换的数据表）后分析。
+
+旧实现找到号码第一次出现的位置后就停止遍历，所以耗时取决于数据：
+随机数据中大多数号码在前几十期内就会出现；最坏情况下（有号码在所有期都没出现）
+每个号码都要遍历全部 N 行，即 49×N 次 iterrows。两种情况分别测试。
+
+为减少计时波动，旧实现取多次运行中的最短耗时，新实现取多批运行中平均耗时最短的一批。
+要求工具路径比旧实现快100倍以上；传入DataFrame的入口每次都要转换数据表，达不到这一目标。
+
+运行: python benchmarks/bench_missing.py
+"""
+
+import asyncio
+import time
+
+import pandas as pd
+
+from _pages import make_page
+from ssq_mcp.crawler import AsyncSSQCrawler
+from ssq_mcp.parsers import parse_history_html
+from ssq_mcp.table import DrawTable
+
+
+def legacy_analyze_missing_periods(df, top_n=10):
+    """旧实现：对每个号码逐行遍历DataFrame"""
+    latest_issue = df.iloc[0]['期号']
+
+    red_missing = {}
+    for num in range(1, 34):
+        for i, row in df.iterrows():
+            if any(num == row[f'红球{j}'] for j in range(1, 7)):
+                red_missing[num] = i
+                break
+        else:
+            red_missing[num] = len(df)
+
+    blue_missing = {}
+    for num in range(1, 17):
+        for i, row in df.iterrows():
+            if num == row['蓝球']:
+                blue_missing[num] = i
+                break
+        else:
+            blue_missing[num] = len(df)
+
+    return {
+        'red_missing': pd.Series(red_missing).sort_values(ascending=False).head(top_n),
+        'blue_missing': pd.Series(blue_missing).sort_values(ascending=False).head(top_n),
+        'latest_issue': latest_issue
+    }
+
+
+def worst_case(df):
+    """将红球限制在1-12、蓝球限制在1-8，其余号码从未出现，旧实现需要遍历全部行"""
+    df = df.copy()
+    for j in range(1, 7):
+        df[f'红球{j}'] = (df[f'红球{j}'] - 1) % 12 + 1
+    df['蓝球'] = (df['蓝球'] - 1) % 8 + 1
+    return df
+
+
+# 工具路径相对旧实现的最低加速比
+TARGET_SPEEDUP = 100
+
+
+def measure_legacy(df, rounds=5):
+    """多次运行旧实现，返回最短耗时（秒）和结果"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = legacy_analyze_missing_periods(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+async def measure(crawler, data, repeat=100, rounds=10):
+    """在同一个事件循环中分批多次运行，返回平均耗时最短一批的平均耗时（秒）和结果"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = await crawler.analyze_missing_periods(data)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best, result
+
+
+async def measure_tool(crawler, limit, repeat=100, rounds=10):
+    """工具路径：从内存缓存获取数据表后分析，返回平均耗时最短一批的平均耗时（秒）和结果"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = await crawler.analyze_missing_periods(await crawler.fetch_table(limit=limit))
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best, result
+
+
+def main():
+    rows = 3000
+    crawler = AsyncSSQCrawler()
+    base = parse_history_html(make_page(rows))
+
+    print(f"期数: {rows}")
+    print(f"{'数据':<10} {'旧实现(ms)':>12} {'DataFrame(ms)':>15} {'加速比':>8} {'DrawTable(ms)':>15} {'加速比':>8}"
+          f" {'工具路径(ms)':>14} {'加速比':>8}")
+    df_speedups = {}
+    for name, df in (("随机数据", base), ("最坏情况", worst_case(base))):
+        legacy, expected = measure_legacy(df)
+
+        from_df, result = asyncio.run(measure(crawler, df))
+        from_table, table_result = asyncio.run(measure(crawler, DrawTable.from_dataframe(df)))
+        # 内存缓存中已有该数据时工具的路径
+        crawler.cache.put(rows, 0, df)
+        from_cache, cache_result = asyncio.run(measure_tool(crawler, rows))
+
+        # 所有实现的结果应完全一致
+        for key in ('red_missing', 'blue_missing'):
+            pd.testing.assert_series_equal(result[key], expected[key], check_dtype=False)
+            pd.testing.assert_series_equal(table_result[key], expected[key], check_dtype=False)
+            pd.testing.assert_series_equal(cache_result[key], expected[key], check_dtype=False)
+        assert result['latest_issue'] == expected['latest_issue']
+
+        print(f"{name:<10} {legacy * 1000:>12.1f} {from_df * 1000:>15.3f} {legacy / from_df:>7.0f}x"
+              f" {from_table * 1000:>15.3f} {legacy / from_table:>7.0f}x"
+              f" {from_cache * 1000:>14.3f} {legacy / from_cache:>7.0f}x")
+        df_speedups[name] = legacy / from_df
+        # 随机数据上旧实现很早就停止遍历，是最难达到目标的情况
+        assert legacy / from_cache >= TARGET_SPEEDUP, \
+            f"{name}: 工具路径加速比 {legacy / from_cache:.0f}x 低于 {TARGET_SPEEDUP}x"
+
+    print(f"\n工具路径（复用内存缓存中的数据表）达到 {TARGET_SPEEDUP}x 目标。")
+    missed = [f"{name} {speedup:.0f}x" for name, speedup in df_speedups.items() if speedup < TARGET_SPEEDUP]
+    if missed:
+        print(f"注意：传入DataFrame的入口每次都要转换数据表，未达到 {TARGET_SPEEDUP}x 目标（{', '.join(missed)}）。")
+
+
+if __name__ == "__main__":
+    main()
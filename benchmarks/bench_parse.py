@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+历史数据页面解析基准测试
+
+对比旧的逐行全文搜索开奖日期的解析方式与单次扫描解析的耗时，
+并检查单次扫描的耗时随行数线性增长。
+
+运行: python benchmarks/bench_parse.py
+"""
+
+import re
+import time
+
+from _pages import make_page
+from ssq_mcp.parsers import parse_history_rows
+
+
+def legacy_parse_rows(html_content):
+    """旧实现：每一行都在整个文档中重新搜索开奖日期"""
+    pattern = r'<tr[^>]*><!--<td>\d+</td>--><td>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td>'
+    data = []
+    for match in re.findall(pattern, html_content, re.DOTALL):
+        date_pattern = r'<td>{}.*?<td>(\d{{4}}-\d{{2}}-\d{{2}})</td>'.format(match[0])
+        date_match = re.search(date_pattern, html_content)
+        data.append((match[0], date_match.group(1) if date_match else ""))
+    return data
+
+
+def best_of(func, arg, repeat):
+    """多次运行取最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [100, 500, 1000, 2000, 5000]
+    print(f"{'行数':>6} {'旧实现(ms)':>12} {'单次扫描(ms)':>14} {'每行(us)':>10} {'加速比':>8}")
+    per_row = []
+    for rows in sizes:
+        html_content = make_page(rows)
+        # 两种实现解析出的期号和日期应一致
+        new_rows = parse_history_rows(html_content)
+        assert [(r['期号'], r['开奖日期']) for r in new_rows] == legacy_parse_rows(html_content)
+
+        legacy = best_of(legacy_parse_rows, html_content, 1 if rows >= 2000 else 3)
+        single = best_of(parse_history_rows, html_content, 5)
+        per_row.append(single / rows)
+        print(f"{rows:>6} {legacy * 1000:>12.1f} {single * 1000:>14.2f} {single / rows * 1e6:>10.2f} {legacy / single:>7.0f}x")
+
+    # 线性增长：每行耗时在不同规模下基本不变
+    ratio = max(per_row) / min(per_row)
+    print(f"\n每行耗时最大/最小比值: {ratio:.2f}（接近1表示线性增长）")
+
+
+if __name__ == "__main__":
+    main()
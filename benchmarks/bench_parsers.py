@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+解析策略基准测试
+
+在不同期数的模拟历史数据页面上对比各解析策略的耗时：流式解析（下载时使用）、
+单次扫描正则解析、lxml XPath 解析和 BeautifulSoup 解析，并检查所有策略的结果完全一致。
+
+另外用去掉了数据行开头注释列的页面（正则解析会失败）测量策略链：
+第一次解析时正则失败后由 lxml 解析成功，之后直接优先使用 lxml。
+
+运行: python benchmarks/bench_parsers.py
+"""
+
+import re
+import time
+
+from _pages import make_page
+from ssq_mcp.parsers import PARSERS, DEFAULT_PARSERS, ParserChain, iter_history_rows, rows_to_frame
+
+
+def parse_stream(html_content, limit=None):
+    """按16KB分块流式解析"""
+    raw = html_content.encode('utf-8')
+    chunks = (raw[i:i + 16384] for i in range(0, len(raw), 16384))
+    return rows_to_frame(list(iter_history_rows(chunks)), limit)
+
+
+def best_of(func, html_content, repeat):
+    """多次运行取最短耗时（秒），并返回结果"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(html_content, None)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    strategies = [('stream', parse_stream)] + [(name, PARSERS[name]) for name in DEFAULT_PARSERS]
+
+    print(f"{'期数':>6} {'页面(KB)':>9} " + " ".join(f"{name + '(ms)':>12}" for name, _ in strategies))
+    for count in (100, 1000, 3000):
+        html_content = make_page(count)
+        expected = None
+        times = []
+        for name, parser in strategies:
+            repeat = 1 if name == 'bs4' and count >= 1000 else 3
+            df, elapsed = best_of(parser, html_content, repeat)
+            # 所有策略的解析结果应完全一致
+            assert df is not None and len(df) == count, name
+            if expected is None:
+                expected = df
+            assert df.equals(expected), name
+            times.append(elapsed)
+        print(f"{count:>6} {len(html_content.encode('utf-8')) / 1024:>9.0f} "
+              + " ".join(f"{elapsed * 1e3:>12.1f}" for elapsed in times))
+
+    # 页面结构变化：数据行开头没有注释列，正则解析失败
+    changed = re.sub(r'<!--<td>\d+</td>-->', '', make_page(1000))
+    chain = ParserChain()
+    print()
+    print("策略链（页面结构变化后）:")
+    for call in range(1, 4):
+        order = chain.order()
+        start = time.perf_counter()
+        df = chain.parse(changed)
+        elapsed = time.perf_counter() - start
+        assert df is not None and len(df) == 1000
+        print(f"  第{call}次: 尝试顺序 {order}，耗时 {elapsed * 1e3:.1f} ms")
+    # 第一次正则失败后记住 lxml，之后不再先尝试正则
+    assert chain.preferred == 'lxml'
+    assert chain.stats['regex'] == {'success': 0, 'failure': 1}
+    assert chain.stats['lxml'] == {'success': 3, 'failure': 0}
+
+
+if __name__ == "__main__":
+    main()
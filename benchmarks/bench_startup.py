@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+服务冷启动基准测试
+
+每次都在新的Python进程中测量：
+1. 导入 ssq_mcp.server 的耗时，并检查导入后没有加载 pandas、BeautifulSoup、lxml、aiohttp 等依赖；
+2. 以 `python -m ssq_mcp` 启动服务，通过标准输入输出完成 initialize 握手，到收到 tools/list 响应的耗时。
+
+作为对比，同时测量在导入服务之前先导入这些依赖（相当于按需导入之前）的耗时。
+
+运行: python benchmarks/bench_startup.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'bs4', 'lxml', 'aiohttp', 'tabulate', 'ssq_mcp.crawler']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{preload}
+import ssq_mcp.server
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {modules!r} if m in sys.modules]}}))
+"""
+
+EAGER_PRELOAD = "import pandas, numpy, bs4, lxml.html, aiohttp, aiohttp.web, tabulate"
+
+
+def measure_import(preload: str = "") -> dict:
+    """在新进程中导入服务模块，返回耗时和已加载的重量级模块"""
+    script = IMPORT_SCRIPT.format(preload=preload, modules=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def send(process: subprocess.Popen, message: dict) -> None:
+    """发送一条JSON-RPC消息"""
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def receive(process: subprocess.Popen, request_id: int) -> dict:
+    """读取指定id的JSON-RPC响应，跳过日志等通知"""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("服务进程提前退出")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def measure_tools_list(preload: bool = False) -> tuple:
+    """启动服务进程，返回 (收到 tools/list 响应的耗时, 工具数量)"""
+    command = [sys.executable, "-m", "ssq_mcp"]
+    if preload:
+        command = [sys.executable, "-c", f"{EAGER_PRELOAD}\nfrom ssq_mcp.server import mcp\nmcp.run()"]
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, text=True)
+    try:
+        send(process, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2025-06-18",
+                "capabilities": {},
+                "clientInfo": {"name": "bench_startup", "version": "1.0"}
+            }
+        })
+        receive(process, 1)
+        send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = receive(process, 2)["result"]["tools"]
+        return time.perf_counter() - start, len(tools)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    repeat = 5
+
+    lazy = [measure_import() for _ in range(repeat)]
+    eager = [measure_import(EAGER_PRELOAD) for _ in range(repeat)]
+    # 导入服务模块时不应加载任何重量级依赖
+    assert all(not result["loaded"] for result in lazy), lazy[0]["loaded"]
+
+    lazy_list = [measure_tools_list() for _ in range(repeat)]
+    eager_list = [measure_tools_list(preload=True) for _ in range(repeat)]
+    tool_count = lazy_list[0][1]
+    assert tool_count > 0 and all(count == tool_count for _, count in lazy_list + eager_list)
+
+    def median_ms(values):
+        return statistics.median(values) * 1e3
+
+    print(f"每项测量 {repeat} 次取中位数，工具数量: {tool_count}")
+    print(f"导入 ssq_mcp.server:   按需导入 {median_ms([r['elapsed'] for r in lazy]):.1f} ms，"
+          f"预先导入依赖 {median_ms([r['elapsed'] for r in eager]):.1f} ms")
+    print(f"首个 tools/list 响应: 按需导入 {median_ms([t for t, _ in lazy_list]):.1f} ms，"
+          f"预先导入依赖 {median_ms([t for t, _ in eager_list]):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+流式解析基准测试
+
+对比先读取完整页面文本再正则解析，与按 16KB 分块边接收边解析的：
+1. 总耗时和得到第一行数据的耗时；
+2. 解析过程中Python对象的内存峰值（tracemalloc，不含页面原始字节本身），
+   以及流式解析不保留数据行时解析器自身的内存峰值。
+
+并检查两种方式解析出的数据完全一致，且流式解析器自身的内存峰值不随页面大小增长。
+
+运行: python benchmarks/bench_stream.py
+"""
+
+import time
+import tracemalloc
+
+from _pages import make_page
+from ssq_mcp.crawler import AsyncSSQCrawler
+from ssq_mcp.parsers import parse_history_rows, HistoryStreamParser, rows_to_frame
+
+CHUNK_SIZE = AsyncSSQCrawler.STREAM_CHUNK_SIZE
+
+
+def chunks_of(raw):
+    """模拟按块接收的响应内容"""
+    return [raw[i:i + CHUNK_SIZE] for i in range(0, len(raw), CHUNK_SIZE)]
+
+
+def full_parse(chunks):
+    """旧方式：拼接并解码完整页面后一次解析，返回 (数据行, 得到第一行的耗时)"""
+    start = time.perf_counter()
+    html_content = b"".join(chunks).decode("utf-8")
+    rows = parse_history_rows(html_content)
+    return rows, time.perf_counter() - start
+
+
+def stream_parse(chunks):
+    """流式解析：每块内容到达后立即解析，返回 (数据行, 得到第一行的耗时)"""
+    start = time.perf_counter()
+    first = None
+    parser = HistoryStreamParser()
+    rows = []
+    for chunk in chunks:
+        rows.extend(parser.feed(chunk))
+        if first is None and rows:
+            first = time.perf_counter() - start
+    rows.extend(parser.close())
+    return rows, first
+
+
+def stream_count(chunks):
+    """流式解析但不保留数据行，只统计行数，用于测量解析器自身的内存占用"""
+    parser = HistoryStreamParser()
+    count = 0
+    for chunk in chunks:
+        count += len(parser.feed(chunk))
+    return count + len(parser.close())
+
+
+def best_of(func, chunks, repeat):
+    """返回 (数据行, 最短总耗时, 最短首行耗时)"""
+    best_total = best_first = float('inf')
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows, first = func(chunks)
+        best_total = min(best_total, time.perf_counter() - start)
+        best_first = min(best_first, first)
+    return rows, best_total, best_first
+
+
+def peak_memory(func, chunks):
+    """运行一次并返回Python对象的内存峰值（字节）"""
+    tracemalloc.start()
+    func(chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    print(f"{'期数':>6} {'页面(KB)':>9} {'完整解析(ms)':>13} {'流式(ms)':>10} {'完整首行(ms)':>13} {'流式首行(ms)':>13}"
+          f" {'完整峰值(KB)':>13} {'流式峰值(KB)':>13} {'流式不保留(KB)':>15}")
+    discard_peaks = []
+    for count in (500, 1000, 3000, 6000):
+        raw = make_page(count).encode("utf-8")
+        chunks = chunks_of(raw)
+        repeat = 5 if count <= 1000 else 3
+
+        full_rows, full_time, full_first = best_of(full_parse, chunks, repeat)
+        stream_rows, stream_time, stream_first = best_of(stream_parse, chunks, repeat)
+        # 两种方式解析出的数据应完全一致
+        assert rows_to_frame(stream_rows).equals(rows_to_frame(full_rows))
+        assert stream_count(chunks) == count
+
+        full_peak = peak_memory(full_parse, chunks)
+        stream_peak = peak_memory(stream_parse, chunks)
+        discard_peak = peak_memory(stream_count, chunks)
+        discard_peaks.append(discard_peak)
+
+        print(f"{count:>6} {len(raw) / 1024:>9.0f} {full_time * 1e3:>13.1f} {stream_time * 1e3:>10.1f}"
+              f" {full_first * 1e3:>13.1f} {stream_first * 1e3:>13.2f}"
+              f" {full_peak / 1024:>13.0f} {stream_peak / 1024:>13.0f} {discard_peak / 1024:>15.0f}")
+        # 流式解析不保存页面文本，内存峰值只有数据行本身
+        assert stream_peak < full_peak / 2
+
+    # 不保留数据行时，流式解析的内存峰值与页面大小无关
+    assert discard_peaks[-1] < discard_peaks[0] * 2
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ setup(
         "aiohttp>=3.8.0",
         "beautifulsoup4>=4.10.0",
         "pandas>=1.3.0",
+        "numpy>=1.21.0",
         "tabulate>=0.8.9",
         "lxml>=4.6.3",
         "pydantic>=1.9.0"
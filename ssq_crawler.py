@@ -640,15 +640,69 @@ class SSQCrawler:
         return f"## 红球遗漏期数分析（截至{latest_issue}期）\n\n{red_markdown}\n\n## 蓝球遗漏期数分析（截至{latest_issue}期）\n\n{blue_markdown}"
 
 
+def backfill(start_year, db_path=None, concurrency=None):
+    """
+    并发获取全部历史数据并保存到本地数据库
+
+    Args:
+        start_year: 起始年份
+        db_path: 本地数据库路径，默认与 MCP 服务器相同，使用配置中的 store.db_path
+        concurrency: 最大并发请求数，默认使用配置中的 backfill.concurrency
+    """
+    import asyncio
+    from ssq_mcp.crawler import AsyncSSQCrawler
+    from ssq_mcp.server import load_config, resolve_db_path
+
+    config = load_config()
+    if db_path is None:
+        # 配置中未启用本地存储时为None，回填会直接返回错误
+        db_path = resolve_db_path(config)
+    if concurrency is None:
+        concurrency = config.get("backfill", {}).get("concurrency", 4)
+
+    async def progress(done, total, message):
+        print(f"[{done}/{total}] {message}")
+
+    async def run():
+        crawler = AsyncSSQCrawler(db_path=db_path, chunk_concurrency=concurrency)
+        try:
+            return await crawler.backfill(start_year=start_year, progress=progress)
+        finally:
+            await crawler.close()
+
+    print(f"\n## 获取{start_year}年以来的全部双色球历史数据\n")
+    result = asyncio.run(run())
+    if result.get('error'):
+        # 错误信息已由爬虫输出
+        return
+    print(f"\n历史数据总期数: {result['total']}，新增期数: {result['added']}")
+    if result['skipped']:
+        print(f"本地已有的年份: {result['skipped']}")
+    if result['staged']:
+        print(f"已获取但暂未保存的年份: {result['staged']}，需等更新的年份获取成功后才能保存")
+    if result['failed']:
+        print(f"获取失败的年份: {result['failed']}，重新执行 --backfill 可继续获取")
+    print(f"数据已保存到 {db_path}")
+
+
 def main():
     parser = argparse.ArgumentParser(description='双色球数据爬虫')
     parser.add_argument('--recent', type=int, help='获取最近n期的数据')
     parser.add_argument('--range', type=str, help='获取指定期号范围的数据，格式为"起始期号-结束期号"')
     parser.add_argument('--issue', type=str, help='获取指定期号的数据')
     parser.add_argument('--analyze', action='store_true', help='分析号码频率和遗漏期数')
+    parser.add_argument('--backfill', type=int, nargs='?', const=2003, metavar='起始年份',
+                        help='并发获取指定年份（默认2003年）以来的全部历史数据并保存到本地数据库')
+    parser.add_argument('--db', type=str, help='本地数据库路径，默认使用配置中的 store.db_path')
+    parser.add_argument('--concurrency', type=int,
+                        help='回填历史数据时的最大并发请求数，默认使用配置中的 backfill.concurrency')
 
     args = parser.parse_args()
 
+    if args.backfill:
+        backfill(args.backfill, args.db, args.concurrency)
+        return
+
     crawler = SSQCrawler()
 
     if args.recent:
@@ -0,0 +1,861 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+双色球向量化分析模块
+
+基于 DrawTable 的红球/蓝球位掩码，用按位运算和 popcount 回答集合类问题，
+对全部历史数据的一次查询只需要几次数组运算。
+"""
+
+from itertools import combinations
+from typing import Iterable, List, Tuple, Optional, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+from .table import DrawTable, ISSUE_WIDTH, NO_DATE
+
+
+def numbers_to_mask(numbers: Iterable[int]) -> int:
+    """
+    将号码集合编码为位掩码
+
+    Args:
+        numbers: 号码列表，号码n对应第n-1位
+
+    Returns:
+        int: 位掩码
+    """
+    mask = 0
+    for num in numbers:
+        mask |= 1 << (int(num) - 1)
+    return mask
+
+
+def mask_to_numbers(mask: int) -> List[int]:
+    """
+    将位掩码解码为号码列表
+
+    Args:
+        mask: 位掩码
+
+    Returns:
+        list: 升序排列的号码列表
+    """
+    mask = int(mask)
+    return [bit + 1 for bit in range(mask.bit_length()) if mask >> bit & 1]
+
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(masks: np.ndarray) -> np.ndarray:
+        """
+        统计每个掩码中为1的位数
+
+        Args:
+            masks: 无符号整数数组
+
+        Returns:
+            ndarray: 每个元素的置位数（uint8）
+        """
+        return np.bitwise_count(masks)
+else:
+    def popcount(masks: np.ndarray) -> np.ndarray:
+        """
+        统计每个掩码中为1的位数（NumPy 2.0 之前没有 bitwise_count，使用并行位计数）
+
+        Args:
+            masks: 无符号整数数组
+
+        Returns:
+            ndarray: 每个元素的置位数（uint8）
+        """
+        x = masks.astype(np.uint64)
+        x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+        x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+        x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+        return ((x * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+def red_one_hot(table: DrawTable) -> np.ndarray:
+    """
+    构造红球one-hot矩阵
+
+    Args:
+        table: 开奖数据表
+
+    Returns:
+        ndarray: N×33 的布尔矩阵，第j列表示号码j+1是否在该期出现
+    """
+    matrix = np.zeros((len(table), 34), dtype=bool)
+    matrix[np.arange(len(table))[:, None], table.reds] = True
+    return matrix[:, 1:]
+
+
+def blue_one_hot(table: DrawTable) -> np.ndarray:
+    """
+    构造蓝球one-hot矩阵
+
+    Args:
+        table: 开奖数据表
+
+    Returns:
+        ndarray: N×16 的布尔矩阵，第j列表示号码j+1是否为该期蓝球
+    """
+    matrix = np.zeros((len(table), 17), dtype=bool)
+    matrix[np.arange(len(table)), table.blues] = True
+    return matrix[:, 1:]
+
+
+def first_occurrence(matrix: np.ndarray) -> np.ndarray:
+    """
+    计算每一列第一次为True的行号
+
+    Args:
+        matrix: N×K 的布尔矩阵
+
+    Returns:
+        ndarray: 长度为K的数组，从未出现的列为N
+    """
+    rows = matrix.argmax(axis=0)
+    rows[~matrix.any(axis=0)] = len(matrix)
+    return rows
+
+
+def omission_rows(table: DrawTable, block: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算每个号码第一次出现的行号，即遗漏期数
+
+    从第一行开始按块扫描，块大小逐次翻倍，所有号码都出现后立即停止：
+    随机开奖中所有号码通常在最近几十期内就会出现，不需要构造全部数据的one-hot矩阵。
+
+    Args:
+        table: 开奖数据表，按期号降序排列
+        block: 第一块的行数
+
+    Returns:
+        tuple: (长度为33的红球行号数组, 长度为16的蓝球行号数组)，从未出现的号码为总行数
+    """
+    n = len(table)
+    red_rows = np.full(33, n, dtype=np.int64)
+    blue_rows = np.full(16, n, dtype=np.int64)
+    start = 0
+    while start < n:
+        end = min(n, start + block)
+        part = table[start:end]
+        red = first_occurrence(red_one_hot(part))
+        blue = first_occurrence(blue_one_hot(part))
+        red_rows = np.where((red_rows == n) & (red < end - start), red + start, red_rows)
+        blue_rows = np.where((blue_rows == n) & (blue < end - start), blue + start, blue_rows)
+        if (red_rows < n).all() and (blue_rows < n).all():
+            break
+        start, block = end, block * 2
+    return red_rows, blue_rows
+
+
+def top_frequency(red_counts: np.ndarray, blue_counts: np.ndarray, top_n: int = 10) -> Dict[str, pd.Series]:
+    """
+    选出出现次数最多的号码
+
+    Args:
+        red_counts: 长度为33的红球出现次数数组，第j个元素对应号码j+1
+        blue_counts: 长度为16的蓝球出现次数数组
+        top_n: 选出的号码个数
+
+    Returns:
+        dict: 包含 red_freq 和 blue_freq 的字典，按次数降序排列，次数相同时按号码升序
+    """
+    red_freq = pd.Series(red_counts, index=range(1, 34))
+    blue_freq = pd.Series(blue_counts, index=range(1, 17))
+    return {
+        'red_freq': red_freq[red_freq > 0].sort_values(ascending=False, kind='stable').head(top_n),
+        'blue_freq': blue_freq[blue_freq > 0].sort_values(ascending=False, kind='stable').head(top_n)
+    }
+
+
+def top_missing(red_omission: np.ndarray, blue_omission: np.ndarray, top_n: int = 10) -> Dict[str, pd.Series]:
+    """
+    选出遗漏期数最多的号码
+
+    Args:
+        red_omission: 长度为33的红球遗漏期数数组，第j个元素对应号码j+1
+        blue_omission: 长度为16的蓝球遗漏期数数组
+        top_n: 选出的号码个数
+
+    Returns:
+        dict: 包含 red_missing 和 blue_missing 的字典，按遗漏期数降序排列
+    """
+    return {
+        'red_missing': top_descending(red_omission, top_n),
+        'blue_missing': top_descending(blue_omission, top_n)
+    }
+
+
+def top_descending(values: np.ndarray, top_n: int = 10) -> pd.Series:
+    """
+    按值降序选出前N个号码，顺序与 pd.Series.sort_values(ascending=False) 完全相同
+
+    只有几十个号码时，在NumPy中排序后再构造较短的Series，比先构造Series再排序快得多。
+
+    Args:
+        values: 第j个元素对应号码j+1的数组
+        top_n: 选出的号码个数
+
+    Returns:
+        Series: 以号码为索引、按值降序排列的Series
+    """
+    values = np.asarray(values)
+    # 与pandas相同：将数组反转后升序排序，再将结果反转
+    last = len(values) - 1
+    order = (last - values[::-1].argsort(kind='quicksort'))[::-1][:top_n]
+    return pd.Series(values[order], index=order + 1)
+
+
+# 6个红球中任取3个的20种位置组合
+_TRIPLE_POSITIONS = np.array(list(combinations(range(6), 3)), dtype=np.intp)
+
+
+def pair_matrix(table: DrawTable) -> np.ndarray:
+    """
+    用一次矩阵乘法计算红球两两共同出现的次数
+
+    Args:
+        table: 开奖数据表
+
+    Returns:
+        ndarray: 33×33 的矩阵，[i, j] 为号码i+1与j+1在同一期出现的次数，对角线为出现次数
+    """
+    one_hot = red_one_hot(table).astype(np.int32)
+    return one_hot.T @ one_hot
+
+
+def triple_keys(reds: np.ndarray) -> np.ndarray:
+    """
+    将每期红球的全部三元组编码为整数
+
+    Args:
+        reds: N×6 的红球矩阵
+
+    Returns:
+        ndarray: N×20 的三元组编码，编码为 a*34*34 + b*34 + c（a < b < c）
+    """
+    triples = np.sort(reds, axis=1).astype(np.int64)[:, _TRIPLE_POSITIONS]
+    return triples[..., 0] * 34 * 34 + triples[..., 1] * 34 + triples[..., 2]
+
+
+def triple_counts(table: DrawTable) -> Dict[int, int]:
+    """
+    统计红球三元组共同出现的次数（稀疏表示，只保存出现过的三元组）
+
+    Args:
+        table: 开奖数据表
+
+    Returns:
+        dict: 三元组编码 -> 出现次数
+    """
+    keys, counts = np.unique(triple_keys(table.reds).ravel(), return_counts=True)
+    return dict(zip(keys.tolist(), counts.tolist()))
+
+
+def top_pairs(matrix: np.ndarray, top_k: int = 10) -> List[Tuple[Tuple[int, int], int]]:
+    """
+    选出共同出现次数最多的号码对
+
+    Args:
+        matrix: pair_matrix 返回的33×33矩阵
+        top_k: 选出的号码对个数
+
+    Returns:
+        list: ((号码a, 号码b), 次数) 列表，按次数降序排列，次数相同时按号码升序
+    """
+    rows, cols = np.triu_indices(33, k=1)
+    counts = matrix[rows, cols]
+    order = np.argsort(-counts, kind='stable')[:top_k]
+    return [((int(rows[i]) + 1, int(cols[i]) + 1), int(counts[i])) for i in order]
+
+
+def top_triples(counts: Dict[int, int], top_k: int = 10) -> List[Tuple[Tuple[int, int, int], int]]:
+    """
+    选出共同出现次数最多的三元组
+
+    Args:
+        counts: triple_counts 返回的稀疏计数
+        top_k: 选出的三元组个数
+
+    Returns:
+        list: ((号码a, 号码b, 号码c), 次数) 列表，按次数降序排列，次数相同时按号码升序
+    """
+    keys = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    order = np.lexsort((keys, -values))[:top_k]
+    return [((int(keys[i]) // (34 * 34), int(keys[i]) // 34 % 34, int(keys[i]) % 34), int(values[i])) for i in order]
+
+
+# 遗漏分布分析默认计算的百分位数
+GAP_PERCENTILES = (50, 75, 90, 95)
+
+
+def gap_distribution(table: DrawTable, percentiles: Iterable[int] = GAP_PERCENTILES) -> Dict[str, Any]:
+    """
+    单次向量化计算每个号码的历史遗漏分布
+
+    遗漏是号码相邻两次出现之间间隔的期数，由出现行号的差分得到；
+    第一次出现之前和最后一次出现之后的期数不是完整的遗漏，不计入分布，
+    最后一次出现之后的期数即为当前遗漏。
+
+    Args:
+        table: 开奖数据表，按期号升序排列
+        percentiles: 需要计算的百分位数
+
+    Returns:
+        dict: 包含 red_gaps 和 blue_gaps（每个号码的遗漏分布字典列表，按号码升序）及 total 的字典
+    """
+    percentiles = tuple(int(q) for q in percentiles)
+    total = len(table)
+    one_hot = np.concatenate([red_one_hot(table), blue_one_hot(table)], axis=1)
+
+    # 按号码、行号排列的全部出现位置
+    numbers, rows = np.nonzero(one_hot.T)
+    occurrences = np.bincount(numbers, minlength=49)
+    last_rows = np.full(49, -1)
+    appeared = occurrences > 0
+    last_rows[appeared] = rows[np.cumsum(occurrences)[appeared] - 1]
+    current = total - 1 - last_rows
+
+    # 同一号码相邻两次出现之间的遗漏，按号码、遗漏期数排序后计算最大值和百分位数
+    same = numbers[1:] == numbers[:-1]
+    gap_numbers = numbers[1:][same]
+    gaps = (np.diff(rows) - 1)[same]
+    order = np.lexsort((gaps, gap_numbers))
+    gaps = gaps[order]
+    counts = np.bincount(gap_numbers, minlength=49)
+    starts = np.cumsum(counts) - counts
+    has_gap = counts > 0
+
+    max_gaps = np.zeros(49, dtype=np.int64)
+    max_gaps[has_gap] = gaps[starts[has_gap] + counts[has_gap] - 1]
+    mean_gaps = np.zeros(49)
+    np.divide(np.bincount(gap_numbers, weights=gaps, minlength=49), counts, out=mean_gaps, where=has_gap)
+
+    quantiles = {}
+    for q in percentiles:
+        # 与 np.percentile 默认的线性插值相同
+        position = starts + (counts - 1).clip(0) * (q / 100)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        values = np.zeros(49)
+        values[has_gap] = (gaps[lower[has_gap]]
+                           + (gaps[upper[has_gap]] - gaps[lower[has_gap]]) * (position - lower)[has_gap])
+        quantiles[q] = values
+
+    ratios = np.zeros(49)
+    np.divide(current, max_gaps, out=ratios, where=max_gaps > 0)
+
+    stats = [
+        {
+            'number': i + 1 if i < 33 else i - 32,
+            'occurrences': int(occurrences[i]),
+            'current_gap': int(current[i]),
+            'max_gap': int(max_gaps[i]),
+            'mean_gap': round(float(mean_gaps[i]), 2),
+            'percentiles': {q: round(float(quantiles[q][i]), 2) for q in percentiles},
+            'current_ratio': round(float(ratios[i]), 3)
+        }
+        for i in range(49)
+    ]
+    return {'red_gaps': stats[:33], 'blue_gaps': stats[33:], 'total': total}
+
+
+def contains_all(table: DrawTable, red_numbers: Iterable[int] = (), blue_number: Optional[int] = None) -> np.ndarray:
+    """
+    查找包含指定全部号码的开奖
+
+    Args:
+        table: 开奖数据表
+        red_numbers: 必须全部出现的红球号码
+        blue_number: 必须出现的蓝球号码，为None时不限制
+
+    Returns:
+        ndarray: 布尔数组，True表示该期包含全部指定号码
+    """
+    red_mask = np.uint64(numbers_to_mask(red_numbers))
+    result = (table.red_masks & red_mask) == red_mask
+    if blue_number is not None:
+        result &= table.blues == blue_number
+    return result
+
+
+def overlap_size(table: DrawTable, red_numbers: Iterable[int], blue_number: Optional[int] = None
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算一注号码与每一期开奖号码的重合个数
+
+    Args:
+        table: 开奖数据表
+        red_numbers: 投注的红球号码（可以是复式，多于6个）
+        blue_number: 投注的蓝球号码，为None时不比较蓝球
+
+    Returns:
+        tuple: (每期红球重合个数数组, 每期蓝球是否相同的布尔数组)
+    """
+    red_hits = popcount(table.red_masks & np.uint64(numbers_to_mask(red_numbers)))
+    if blue_number is None:
+        blue_hits = np.zeros(len(table), dtype=bool)
+    else:
+        blue_hits = (table.blue_masks & np.uint16(numbers_to_mask([blue_number]))) != 0
+    return red_hits, blue_hits
+
+
+def common_numbers(table: DrawTable, first: int, second: int) -> List[int]:
+    """
+    获取两期开奖共同出现的红球号码
+
+    Args:
+        table: 开奖数据表
+        first: 第一期的行号
+        second: 第二期的行号
+
+    Returns:
+        list: 共同出现的红球号码
+    """
+    return mask_to_numbers(table.red_masks[first] & table.red_masks[second])
+
+
+def repeat_counts(table: DrawTable, lag: int = 1) -> np.ndarray:
+    """
+    计算每一期与相隔lag行的另一期共同出现的红球个数
+
+    Args:
+        table: 开奖数据表
+        lag: 相隔的行数，1表示相邻两期
+
+    Returns:
+        ndarray: 长度为 N-lag 的数组，第i个元素为第i行与第i+lag行的共同红球个数
+    """
+    masks = table.red_masks
+    if len(masks) <= lag:
+        return np.empty(0, dtype=np.uint8)
+    return popcount(masks[:-lag] & masks[lag:])
+
+
+# 以下汇总函数都是模块级函数，参数和返回值可以被pickle，可以交给进程池执行
+
+def frequency_summary(table: DrawTable, top_n: int = 10) -> Dict[str, pd.Series]:
+    """
+    统计号码出现频率
+
+    Args:
+        table: 非空的开奖数据表
+        top_n: 显示前N个高频号码
+
+    Returns:
+        dict: 包含红球和蓝球频率的字典
+    """
+    # 统计每个号码的出现次数，按次数降序排列，次数相同时按号码升序
+    red_counts = np.bincount(table.reds.ravel(), minlength=34)[1:]
+    blue_counts = np.bincount(table.blues, minlength=17)[1:]
+    return top_frequency(red_counts, blue_counts, top_n)
+
+
+def missing_summary(table: DrawTable, top_n: int = 10) -> Dict[str, Any]:
+    """
+    统计号码遗漏期数
+
+    Args:
+        table: 非空的开奖数据表，按期号降序排列
+        top_n: 显示前N个遗漏期数最多的号码
+
+    Returns:
+        dict: 包含红球和蓝球遗漏期数及最新期号的字典
+    """
+    # 号码第一次出现的行号即为遗漏期数，所有期都没出现时为总期数
+    red_rows, blue_rows = omission_rows(table)
+
+    result: Dict[str, Any] = top_missing(red_rows, blue_rows, top_n)
+    result['latest_issue'] = table[0].issue_strings()[0]
+    return result
+
+
+def cooccurrence_summary(table: DrawTable, top_k: int = 10) -> Dict[str, Any]:
+    """
+    统计红球号码共同出现的次数
+
+    Args:
+        table: 非空的开奖数据表
+        top_k: 显示前K个共同出现次数最多的号码对和三元组
+
+    Returns:
+        dict: 包含号码对和三元组共现次数的字典
+    """
+    # 号码对由独热矩阵的一次矩阵乘法得到，三元组只统计出现过的组合
+    return {
+        'pairs': top_pairs(pair_matrix(table), top_k),
+        'triples': top_triples(triple_counts(table), top_k),
+        'total': len(table),
+        'latest_issue': max(table.issue_strings())
+    }
+
+
+def match_summary(table: DrawTable, red_numbers: Iterable[int], blue_number: Optional[int] = None,
+                  top_n: int = 10) -> Dict[str, Any]:
+    """
+    将一注号码与每一期开奖号码比较
+
+    Args:
+        table: 非空的开奖数据表，按期号降序排列
+        red_numbers: 红球号码（可以是复式，多于6个）
+        blue_number: 蓝球号码，为None时不比较蓝球
+        top_n: 返回的完全包含和重合最多的开奖期数上限
+
+    Returns:
+        dict: 包含全部号码的开奖、红球重合个数分布、重合最多的开奖，
+              以及最新一期与上一期的重号和每期重号个数分布的字典
+    """
+    red_numbers = sorted(set(int(num) for num in red_numbers))
+    issues = table.issue_strings()
+    ticket_mask = np.uint64(numbers_to_mask(red_numbers))
+
+    contained = np.flatnonzero(contains_all(table, red_numbers, blue_number))
+    red_hits, blue_hits = overlap_size(table, red_numbers, blue_number)
+    # 红球重合个数多的在前，其次蓝球相同的在前，再次期号新的在前
+    best = np.lexsort((np.arange(len(table)), ~blue_hits, -red_hits.astype(np.int64)))[:top_n]
+    hit_counts = np.bincount(red_hits, minlength=min(len(red_numbers), 6) + 1)
+    repeats = repeat_counts(table)
+
+    return {
+        'red_numbers': red_numbers,
+        'blue_number': blue_number,
+        'matched_count': len(contained),
+        'matched_issues': [issues[i] for i in contained[:top_n].tolist()],
+        'hit_distribution': {k: int(count) for k, count in enumerate(hit_counts.tolist())},
+        'blue_hits': int(blue_hits.sum()),
+        'best_matches': [
+            {
+                'issue': issues[i],
+                'common_numbers': mask_to_numbers(table.red_masks[i] & ticket_mask),
+                'blue_hit': bool(blue_hits[i])
+            }
+            for i in best.tolist()
+        ],
+        'latest_repeat': common_numbers(table, 0, 1) if len(table) > 1 else [],
+        'repeat_distribution': {k: int(count) for k, count in enumerate(np.bincount(repeats, minlength=7).tolist())},
+        'total': len(table),
+        'latest_issue': issues[0]
+    }
+
+
+def gap_summary(table: DrawTable) -> Dict[str, Any]:
+    """
+    统计每个号码的历史遗漏分布
+
+    Args:
+        table: 非空的开奖数据表，按期号降序排列
+
+    Returns:
+        dict: 包含红球和蓝球遗漏分布及最新期号的字典
+    """
+    # 遗漏分布按时间顺序计算
+    result = gap_distribution(table[::-1])
+    result['latest_issue'] = table[0].issue_strings()[0]
+    return result
+
+
+class AnalysisEngine:
+    """
+    全部历史数据的增量分析引擎
+
+    保存每个号码的累计出现次数和当前遗漏期数。新开奖数据按期号升序逐期追加，
+    每追加一期只需更新49个计数器，全部历史的频率和遗漏分析无需重新扫描数据。
+
+    同时维护 (N+1)×49 的前缀和计数表（前33列为红球，后16列为蓝球），
+    第i行为前i期中每个号码的累计出现次数，任意区间的频率只需两行相减。
+    """
+
+    def __init__(self):
+        self.red_counts = np.zeros(33, dtype=np.int64)
+        self.blue_counts = np.zeros(16, dtype=np.int64)
+        self.red_omission = np.zeros(33, dtype=np.int64)
+        self.blue_omission = np.zeros(16, dtype=np.int64)
+        self.total = 0
+        self.earliest_issue: Optional[int] = None
+        self.latest_issue: Optional[int] = None
+        # 按期号升序保存的开奖数据和前缀和计数表，容量不足时倍增
+        self._issues = np.zeros(0, dtype=np.int32)
+        self._balls = np.zeros((0, 7), dtype=np.uint8)
+        self._days = np.zeros(0, dtype=np.int32)
+        self._prefix = np.zeros((1, 49), dtype=np.int32)
+        # 共现统计在首次使用时计算，之后随追加的数据增量更新
+        self._pairs: Optional[np.ndarray] = None
+        self._triples: Optional[Dict[int, int]] = None
+        self._cooccurrence_cache: Optional[Tuple[Optional[int], int, Dict[str, Any]]] = None
+        self._gap_cache: Optional[Tuple[Optional[int], Tuple[int, ...], Dict[str, Any]]] = None
+
+    @classmethod
+    def from_table(cls, table: DrawTable) -> 'AnalysisEngine':
+        """
+        由按期号升序排列的数据表一次性计算全部统计
+
+        Args:
+            table: 按期号升序排列的开奖数据表
+
+        Returns:
+            AnalysisEngine: 分析引擎
+        """
+        engine = cls()
+        if len(table) == 0:
+            return engine
+
+        engine.red_counts = np.bincount(table.reds.ravel(), minlength=34)[1:].astype(np.int64)
+        engine.blue_counts = np.bincount(table.blues, minlength=17)[1:].astype(np.int64)
+        # 遗漏期数为倒序后第一次出现的行号
+        latest_first = table[::-1]
+        engine.red_omission, engine.blue_omission = omission_rows(latest_first)
+        engine.total = len(table)
+        engine.earliest_issue = int(table.issues[0])
+        engine.latest_issue = int(table.issues[-1])
+
+        engine._issues = table.issues.copy()
+        engine._balls = table.balls.copy()
+        engine._days = table.days.copy()
+        one_hot = np.hstack([red_one_hot(table), blue_one_hot(table)])
+        engine._prefix = np.zeros((len(table) + 1, 49), dtype=np.int32)
+        np.cumsum(one_hot, axis=0, out=engine._prefix[1:])
+        return engine
+
+    @property
+    def table(self) -> DrawTable:
+        """引擎中按期号升序排列的全部开奖数据"""
+        n = self.total
+        return DrawTable(self._issues[:n], self._balls[:n], self._days[:n])
+
+    def _reserve(self, size: int) -> None:
+        """确保缓冲区至少能容纳size期数据"""
+        capacity = len(self._issues)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        n = self.total
+        issues = np.zeros(capacity, dtype=np.int32)
+        balls = np.zeros((capacity, 7), dtype=np.uint8)
+        days = np.zeros(capacity, dtype=np.int32)
+        prefix = np.zeros((capacity + 1, 49), dtype=np.int32)
+        issues[:n], balls[:n], days[:n], prefix[:n + 1] = \
+            self._issues[:n], self._balls[:n], self._days[:n], self._prefix[:n + 1]
+        self._issues, self._balls, self._days, self._prefix = issues, balls, days, prefix
+
+    def append(self, issue: int, red_balls: Iterable[int], blue_ball: int, day: int = NO_DATE) -> None:
+        """
+        追加一期开奖数据，均摊时间复杂度为O(1)
+
+        Args:
+            issue: 期号，必须比已追加的期号更新
+            red_balls: 6个红球号码
+            blue_ball: 蓝球号码
+            day: 开奖日期（距 1970-01-01 的天数）
+        """
+        reds = np.fromiter(red_balls, dtype=np.intp, count=6) - 1
+        self.red_counts[reds] += 1
+        self.blue_counts[blue_ball - 1] += 1
+        self.red_omission += 1
+        self.red_omission[reds] = 0
+        self.blue_omission += 1
+        self.blue_omission[blue_ball - 1] = 0
+
+        n = self.total
+        self._reserve(n + 1)
+        self._issues[n] = issue
+        self._balls[n, :6] = reds + 1
+        self._balls[n, 6] = blue_ball
+        self._days[n] = day
+        row = self._prefix[n + 1]
+        row[:] = self._prefix[n]
+        row[reds] += 1
+        row[33 + blue_ball - 1] += 1
+
+        if self._pairs is not None:
+            self._pairs[np.ix_(reds, reds)] += 1
+            for key in triple_keys((reds + 1)[None, :])[0].tolist():
+                self._triples[key] = self._triples.get(key, 0) + 1
+
+        self.total += 1
+        if self.earliest_issue is None:
+            self.earliest_issue = int(issue)
+        self.latest_issue = int(issue)
+
+    def extend(self, table: DrawTable) -> None:
+        """
+        按期号升序逐期追加开奖数据
+
+        Args:
+            table: 按期号升序排列的开奖数据表
+        """
+        for issue, balls, day in zip(table.issues.tolist(), table.balls.tolist(), table.days.tolist()):
+            self.append(issue, balls[:6], balls[6], day)
+
+    def row_range(self, start_issue: Optional[int] = None, end_issue: Optional[int] = None,
+                  start_day: Optional[int] = None, end_day: Optional[int] = None) -> Tuple[int, int]:
+        """
+        将期号范围和日期范围转换为行号区间，各条件之间取交集
+
+        Args:
+            start_issue: 起始期号（包含）
+            end_issue: 结束期号（包含）
+            start_day: 起始日期（距 1970-01-01 的天数，包含）
+            end_day: 结束日期（包含）
+
+        Returns:
+            tuple: 行号区间 [start, end)
+        """
+        n = self.total
+        issues, days = self._issues[:n], self._days[:n]
+        if start_day is not None or end_day is not None:
+            # 没有日期的开奖（NO_DATE）沿用前一期的日期，保证日期数组有序
+            days = np.maximum.accumulate(days)
+        start, end = 0, n
+        if start_issue is not None:
+            start = max(start, int(np.searchsorted(issues, start_issue, side='left')))
+        if end_issue is not None:
+            end = min(end, int(np.searchsorted(issues, end_issue, side='right')))
+        if start_day is not None:
+            start = max(start, int(np.searchsorted(days, start_day, side='left')))
+        if end_day is not None:
+            end = min(end, int(np.searchsorted(days, end_day, side='right')))
+        return start, max(start, end)
+
+    def date_span(self) -> Optional[Tuple[int, int]]:
+        """
+        引擎中有日期的开奖数据的最早和最晚日期
+
+        Returns:
+            tuple: (最早日期, 最晚日期)，均为距 1970-01-01 的天数，没有日期时返回None
+        """
+        days = self._days[:self.total]
+        days = days[days != NO_DATE]
+        if len(days) == 0:
+            return None
+        return int(days.min()), int(days.max())
+
+    def range_counts(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        计算行号区间 [start, end) 内每个号码的出现次数，只需前缀和表的两行相减
+
+        Args:
+            start: 起始行号
+            end: 结束行号（不包含）
+
+        Returns:
+            tuple: (长度为33的红球出现次数数组, 长度为16的蓝球出现次数数组)
+        """
+        counts = self._prefix[end] - self._prefix[start]
+        return counts[:33], counts[33:]
+
+    def frequency_between(self, start_issue: Optional[int] = None, end_issue: Optional[int] = None,
+                          start_day: Optional[int] = None, end_day: Optional[int] = None,
+                          top_n: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        任意期号范围或日期范围内的号码出现频率
+
+        Args:
+            start_issue: 起始期号（包含）
+            end_issue: 结束期号（包含）
+            start_day: 起始日期（距 1970-01-01 的天数，包含）
+            end_day: 结束日期（包含）
+            top_n: 显示前N个高频号码
+
+        Returns:
+            dict: 包含红球和蓝球频率、区间期数及首末期号的字典，区间内没有数据则返回None
+        """
+        start, end = self.row_range(start_issue, end_issue, start_day, end_day)
+        if end <= start:
+            return None
+        red_counts, blue_counts = self.range_counts(start, end)
+        result: Dict[str, Any] = top_frequency(red_counts, blue_counts, top_n)
+        result['count'] = end - start
+        result['start_issue'] = str(self._issues[start]).zfill(ISSUE_WIDTH)
+        result['end_issue'] = str(self._issues[end - 1]).zfill(ISSUE_WIDTH)
+        return result
+
+    def frequency(self, top_n: int = 10) -> Optional[Dict[str, pd.Series]]:
+        """
+        全部历史数据的号码出现频率，格式与 AsyncSSQCrawler.analyze_frequency 相同
+
+        Args:
+            top_n: 显示前N个高频号码
+
+        Returns:
+            dict: 包含红球和蓝球频率分析的字典，没有数据则返回None
+        """
+        if self.total == 0:
+            return None
+        return top_frequency(self.red_counts, self.blue_counts, top_n)
+
+    def missing(self, top_n: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        全部历史数据的号码遗漏期数，格式与 AsyncSSQCrawler.analyze_missing_periods 相同
+
+        Args:
+            top_n: 显示前N个遗漏期数最多的号码
+
+        Returns:
+            dict: 包含红球和蓝球遗漏期数分析的字典，没有数据则返回None
+        """
+        if self.total == 0:
+            return None
+        result: Dict[str, Any] = top_missing(self.red_omission, self.blue_omission, top_n)
+        result['latest_issue'] = str(self.latest_issue).zfill(ISSUE_WIDTH)
+        return result
+
+    def cooccurrence(self, top_k: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        全部历史数据中红球共同出现次数最多的号码对和三元组
+
+        共现矩阵首次使用时用一次矩阵乘法计算，之后随追加的数据增量更新；
+        结果按最新期号缓存，没有新数据时直接返回。
+
+        Args:
+            top_k: 选出的号码对和三元组个数
+
+        Returns:
+            dict: 包含 pairs、triples、total 和 latest_issue 的字典，没有数据则返回None
+        """
+        if self.total == 0:
+            return None
+
+        cache = self._cooccurrence_cache
+        if cache is not None and cache[0] == self.latest_issue and cache[1] == top_k:
+            return cache[2]
+
+        if self._pairs is None:
+            self._pairs = pair_matrix(self.table)
+            self._triples = triple_counts(self.table)
+
+        result = {
+            'pairs': top_pairs(self._pairs, top_k),
+            'triples': top_triples(self._triples, top_k),
+            'total': self.total,
+            'latest_issue': str(self.latest_issue).zfill(ISSUE_WIDTH)
+        }
+        self._cooccurrence_cache = (self.latest_issue, top_k, result)
+        return result
+
+    def gaps(self, percentiles: Iterable[int] = GAP_PERCENTILES) -> Optional[Dict[str, Any]]:
+        """
+        全部历史数据中每个号码的遗漏分布，结果按最新期号缓存
+
+        Args:
+            percentiles: 需要计算的百分位数
+
+        Returns:
+            dict: gap_distribution 的结果加上 latest_issue，没有数据则返回None
+        """
+        if self.total == 0:
+            return None
+
+        percentiles = tuple(percentiles)
+        cache = self._gap_cache
+        if cache is not None and cache[0] == self.latest_issue and cache[1] == percentiles:
+            return cache[2]
+
+        result = gap_distribution(self.table, percentiles)
+        result['latest_issue'] = str(self.latest_issue).zfill(ISSUE_WIDTH)
+        self._gap_cache = (self.latest_issue, percentiles, result)
+        return result
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+双色球数据内存缓存模块
+
+双色球每周二、四、日晚上开奖，两次开奖之间网站返回的数据不会变化，
+因此缓存条目在下一次开奖时间过期，而不是使用固定的过期时间。
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Tuple, Hashable, Callable, Awaitable, Any
+
+import pandas as pd
+
+from .table import DrawTable
+
+# 开奖时间：北京时间每周二、四、日 21:15
+CHINA_TZ = timezone(timedelta(hours=8))
+DRAW_WEEKDAYS = (1, 3, 6)
+DRAW_HOUR = 21
+DRAW_MINUTE = 15
+
+
+def next_draw_time(now: Optional[datetime] = None) -> datetime:
+    """
+    获取下一次开奖时间
+
+    Args:
+        now: 当前时间，默认为北京时间的当前时间
+
+    Returns:
+        datetime: 严格晚于当前时间的下一次开奖时间
+    """
+    now = (now or datetime.now(CHINA_TZ)).astimezone(CHINA_TZ)
+    candidate = now.replace(hour=DRAW_HOUR, minute=DRAW_MINUTE, second=0, microsecond=0)
+    for _ in range(8):
+        if candidate.weekday() in DRAW_WEEKDAYS and candidate > now:
+            return candidate
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def previous_draw_time(now: Optional[datetime] = None) -> datetime:
+    """
+    获取最近一次已经开始的开奖时间
+
+    Args:
+        now: 当前时间，默认为北京时间的当前时间
+
+    Returns:
+        datetime: 不晚于当前时间的最近一次开奖时间
+    """
+    now = (now or datetime.now(CHINA_TZ)).astimezone(CHINA_TZ)
+    candidate = now.replace(hour=DRAW_HOUR, minute=DRAW_MINUTE, second=0, microsecond=0)
+    for _ in range(8):
+        if candidate.weekday() in DRAW_WEEKDAYS and candidate <= now:
+            return candidate
+        candidate -= timedelta(days=1)
+    return candidate
+
+
+class DrawScheduleCache:
+    """按开奖时间过期的 fetch_data 结果缓存"""
+
+    def __init__(self, retry_interval: float = 300.0):
+        """
+        初始化缓存
+
+        Args:
+            retry_interval: 最近一次开奖结果尚未公布时，缓存条目的过期时间（秒）
+        """
+        self.retry_interval = retry_interval
+        # 按排序方式保存已获取的最大结果：sort -> (DataFrame, 请求的期数, 过期时间戳)
+        self._entries: Dict[int, Tuple[pd.DataFrame, int, float]] = {}
+        # 缓存条目转换后的紧凑数据表，首次按数据表读取时转换：sort -> DrawTable
+        self._tables: Dict[int, DrawTable] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, limit: int, sort: int = 0, allow_stale: bool = False) -> Optional[pd.DataFrame]:
+        """
+        读取缓存，较小的limit直接截取已缓存的较大结果
+
+        Args:
+            limit: 获取的期数
+            sort: 排序方式
+            allow_stale: 是否返回已过期的条目，用于上游不可用时降级
+
+        Returns:
+            DataFrame: 缓存的数据，未命中则返回None
+        """
+        df = self._lookup(limit, sort, allow_stale)
+        if df is None:
+            return None
+        return df.iloc[:limit].reset_index(drop=True)
+
+    def get_table(self, limit: int, sort: int = 0) -> Optional[DrawTable]:
+        """
+        以紧凑数据表的形式读取缓存，同一缓存条目只转换一次，之后按行切片
+
+        Args:
+            limit: 获取的期数
+            sort: 排序方式
+
+        Returns:
+            DrawTable: 缓存的数据表，未命中则返回None
+        """
+        df = self._lookup(limit, sort)
+        if df is None:
+            return None
+        table = self._tables.get(sort)
+        if table is None:
+            table = self._tables[sort] = DrawTable.from_dataframe(df)
+        return table[:limit]
+
+    def _lookup(self, limit: int, sort: int, allow_stale: bool = False) -> Optional[pd.DataFrame]:
+        """查找可以满足请求的缓存条目，返回条目中的完整DataFrame并统计命中次数"""
+        entry = self._entries.get(sort)
+        if entry is not None:
+            df, cached_limit, expires_at = entry
+            # 网站返回的期数少于请求的期数时，说明已经是全部数据
+            fresh = allow_stale or time.time() < expires_at
+            if fresh and (cached_limit >= limit or len(df) < cached_limit):
+                self.hits += 1
+                return df
+        self.misses += 1
+        return None
+
+    def put(self, limit: int, sort: int, df: Optional[pd.DataFrame]) -> None:
+        """
+        写入缓存，只保留同一排序方式下期数最多的结果
+
+        Args:
+            limit: 请求的期数
+            sort: 排序方式
+            df: 获取到的数据
+        """
+        if df is None or df.empty:
+            return
+        entry = self._entries.get(sort)
+        if entry is not None and entry[1] > limit and time.time() < entry[2]:
+            return
+        self._entries[sort] = (df, limit, self.expires_at(df))
+        self._tables.pop(sort, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+        self._tables.clear()
+
+    def expires_at(self, df: pd.DataFrame, now: Optional[datetime] = None) -> float:
+        """
+        计算缓存条目的过期时间
+
+        通常在下一次开奖时过期；如果数据中还没有最近一次开奖的结果（开奖后尚未公布），
+        则在 retry_interval 秒后过期，以便尽快获取新结果。
+
+        Args:
+            df: 获取到的数据
+            now: 当前时间
+
+        Returns:
+            float: 过期时间戳
+        """
+        now = (now or datetime.now(CHINA_TZ)).astimezone(CHINA_TZ)
+        if '开奖日期' in df.columns:
+            latest_date = str(df['开奖日期'].max() or "")
+            if latest_date and latest_date < previous_draw_time(now).strftime('%Y-%m-%d'):
+                return now.timestamp() + self.retry_interval
+        return next_draw_time(now).timestamp()
+
+
+class ConditionalCache:
+    """
+    按请求参数保存网站响应的校验信息和解析后的数据
+
+    再次请求相同参数时发送 If-None-Match / If-Modified-Since，
+    网站返回304时直接使用已解析的数据，不再下载和解析页面。
+    """
+
+    def __init__(self, max_entries: int = 64):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最多保存的请求数，超过时淘汰最久未使用的条目
+        """
+        self.max_entries = max_entries
+        # 请求参数 -> (ETag, Last-Modified, 解析后的数据)
+        self._entries: "OrderedDict[tuple, Tuple[Optional[str], Optional[str], pd.DataFrame]]" = OrderedDict()
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> tuple:
+        """请求参数对应的缓存键"""
+        return tuple(sorted((name, str(value)) for name, value in params.items()))
+
+    def headers(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        获取条件请求头
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since 请求头，没有缓存时为空
+        """
+        entry = self._entries.get(self.key(params))
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def get(self, params: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        读取网站返回304时使用的数据
+
+        Args:
+            params: 请求参数
+
+        Returns:
+            DataFrame: 上次解析的数据的副本，没有缓存则返回None
+        """
+        key = self.key(params)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[2].copy()
+
+    def put(self, params: Dict[str, Any], etag: Optional[str], last_modified: Optional[str],
+            df: Optional[pd.DataFrame]) -> None:
+        """
+        保存响应的校验信息和解析后的数据，网站没有返回校验信息时不保存
+
+        Args:
+            params: 请求参数
+            etag: 响应头中的 ETag
+            last_modified: 响应头中的 Last-Modified
+            df: 解析后的数据
+        """
+        key = self.key(params)
+        if df is None or not (etag or last_modified):
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (etag, last_modified, df)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+
+class SingleFlight:
+    """合并并发的相同上游请求"""
+
+    def __init__(self):
+        # 正在进行的请求：key -> [(请求的期数, 任务), ...]
+        self._inflight: Dict[Hashable, List[Tuple[int, asyncio.Task]]] = {}
+        self.shared = 0
+
+    async def run(self, key: Hashable, limit: int,
+                  loader: Callable[[], Awaitable[Optional[pd.DataFrame]]]) -> Optional[pd.DataFrame]:
+        """
+        执行请求，如果已有相同key且期数足够的请求正在进行，则等待该请求的结果
+
+        Args:
+            key: 请求标识，例如 ("recent", sort)
+            limit: 需要的期数，较小的期数从共享结果中截取
+            loader: 实际发起请求的协程函数
+
+        Returns:
+            DataFrame: 请求结果，获取失败则返回None
+        """
+        for inflight_limit, task in self._inflight.get(key, []):
+            if inflight_limit >= limit:
+                self.shared += 1
+                df = await asyncio.shield(task)
+                if df is None or len(df) <= limit:
+                    return df
+                return df.iloc[:limit].reset_index(drop=True)
+
+        task = asyncio.ensure_future(loader())
+        entry = (limit, task)
+        self._inflight.setdefault(key, []).append(entry)
+        task.add_done_callback(lambda _: self._remove(key, entry))
+        # 调用方被取消时不取消共享任务，其他等待者仍可获得结果
+        return await asyncio.shield(task)
+
+    def _remove(self, key: Hashable, entry: Tuple[int, asyncio.Task]) -> None:
+        """请求完成后移除记录"""
+        entries = self._inflight.get(key)
+        if entries and entry in entries:
+            entries.remove(entry)
+            if not entries:
+                del self._inflight[key]
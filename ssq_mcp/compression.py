@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+网站响应的压缩传输模块
+
+请求时显式声明支持的压缩格式，并自行解压响应内容，
+从而可以分别统计实际传输的字节数和解压后的字节数。
+brotli 为可选依赖，只有安装了 brotli 或 brotlicffi 时才声明支持 br。
+"""
+
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class Decompressor:
+    """按 Content-Encoding 逐块解压响应内容"""
+
+    def __init__(self, encoding: Optional[str] = None):
+        """
+        初始化解压器
+
+        Args:
+            encoding: 响应头中的 Content-Encoding，为空或 identity 时不解压
+
+        Raises:
+            ValueError: 不支持的压缩格式
+        """
+        self.encoding = (encoding or "identity").strip().lower()
+        self._decoder = None
+        if self.encoding in ("gzip", "x-gzip"):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == "br":
+            if brotli is None:
+                raise ValueError("未安装 brotli，无法解压 br 格式的响应")
+            self._decoder = brotli.Decompressor()
+        elif self.encoding not in ("identity", "deflate"):
+            raise ValueError(f"不支持的压缩格式: {self.encoding}")
+
+    def decompress(self, chunk: bytes) -> bytes:
+        """
+        解压一块数据
+
+        Args:
+            chunk: 网络上收到的数据
+
+        Returns:
+            bytes: 解压后的数据，可能为空
+        """
+        if self.encoding == "deflate" and self._decoder is None and chunk:
+            # deflate 可能带有 zlib 头，也可能是裸的 deflate 数据，根据第一个字节判断
+            wbits = zlib.MAX_WBITS if chunk[0] & 0x0F == 8 else -zlib.MAX_WBITS
+            self._decoder = zlib.decompressobj(wbits)
+        if self._decoder is None:
+            return chunk
+        if self.encoding == "br":
+            return self._decoder.process(chunk) if hasattr(self._decoder, "process") else self._decoder.decompress(chunk)
+        return self._decoder.decompress(chunk)
+
+    def flush(self) -> bytes:
+        """
+        返回解压器中剩余的数据
+
+        Returns:
+            bytes: 剩余的解压数据
+        """
+        if self._decoder is None or self.encoding == "br":
+            return b""
+        return self._decoder.flush()
+
+
+def decompress(data: bytes, encoding: Optional[str] = None) -> bytes:
+    """
+    解压完整的响应内容
+
+    Args:
+        data: 网络上收到的全部数据
+        encoding: 响应头中的 Content-Encoding
+
+    Returns:
+        bytes: 解压后的数据
+    """
+    decoder = Decompressor(encoding)
+    return decoder.decompress(data) + decoder.flush()
@@ -6,33 +6,342 @@
 
 import asyncio
 import re
+import sqlite3
+import time
+from datetime import datetime
+import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
 import aiohttp
-import io
-import lxml.html
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Tuple, Any, Union, Callable, Awaitable, Sequence
+
+from .analysis import AnalysisEngine, frequency_summary, missing_summary, cooccurrence_summary, gap_summary, match_summary
+from .cache import DrawScheduleCache, ConditionalCache, SingleFlight, CHINA_TZ
+from .compression import ACCEPT_ENCODING, Decompressor
+from .executor import CPUExecutor
+from .markdown import markdown_table
+from .parsers import HistoryStreamParser, ParserChain, DEFAULT_PARSERS, parse_with, rows_to_frame
+from .resilience import RetryPolicy, CircuitBreaker
+from .store import SSQDrawStore, COLUMNS
+from .table import DrawTable, ISSUE_WIDTH
+
+
+def normalize_issue(issue: Union[str, int]) -> str:
+    """
+    规范化期号为网站使用的5位格式（两位年份+三位序号）
+
+    Args:
+        issue: 期号，例如 "24001" 或 "2024001"
+
+    Returns:
+        str: 规范化后的期号，例如 "24001"
+    """
+    issue = str(issue).strip()
+    if len(issue) == 7 and issue.isdigit():
+        return issue[2:]
+    return issue
+
+
+def parse_issue_spec(spec: Union[str, int]) -> tuple:
+    """
+    解析单个期号或期号范围
+
+    Args:
+        spec: 期号（例如 "24100"）或用 "-"、"~"、":" 连接的期号范围（例如 "24100-24110"）
+
+    Returns:
+        tuple: 规范化后的 (起始期号, 结束期号)，单个期号的起止相同
+    """
+    parts = re.split(r'\s*[-~:]\s*', str(spec).strip(), maxsplit=1)
+    start_issue = normalize_issue(parts[0])
+    end_issue = normalize_issue(parts[1]) if len(parts) > 1 else start_issue
+    if start_issue > end_issue:
+        start_issue, end_issue = end_issue, start_issue
+    return start_issue, end_issue
+
+
+def merge_issue_ranges(ranges: List[tuple]) -> List[tuple]:
+    """
+    合并重叠或相邻的期号范围
+
+    Args:
+        ranges: (起始期号, 结束期号) 列表
+
+    Returns:
+        list: 合并后互不重叠的 (起始期号, 结束期号) 列表，按期号升序排列
+    """
+    merged: List[list] = []
+    for start_issue, end_issue in sorted(ranges):
+        if merged and start_issue.isdigit() and merged[-1][1].isdigit() \
+                and int(start_issue) <= int(merged[-1][1]) + 1:
+            merged[-1][1] = max(merged[-1][1], end_issue)
+        else:
+            merged.append([start_issue, end_issue])
+    return [tuple(item) for item in merged]
+
+
+def split_issue_range(start_issue: str, end_issue: str) -> List[tuple]:
+    """
+    按年份将期号范围拆分为多个区间
+
+    每年的期数不超过200期，按年份拆分后每个区间的数据量都较小。
+
+    Args:
+        start_issue: 起始期号（5位格式）
+        end_issue: 结束期号（5位格式）
+
+    Returns:
+        list: (起始期号, 结束期号) 列表，按期号升序排列
+    """
+    if not (len(start_issue) == len(end_issue) == 5 and start_issue.isdigit() and end_issue.isdigit()):
+        return [(start_issue, end_issue)]
+
+    start_year, end_year = int(start_issue[:2]), int(end_issue[:2])
+    chunks = []
+    for year in range(start_year, end_year + 1):
+        chunk_start = start_issue if year == start_year else f"{year:02d}001"
+        chunk_end = end_issue if year == end_year else f"{year:02d}999"
+        chunks.append((chunk_start, chunk_end))
+    return chunks
+
+
+def year_spans(ranges: List[tuple]) -> List[tuple]:
+    """
+    将多个期号范围按年份合并为每年一个请求区间
+
+    同一年内的多个范围合并为从最小期号到最大期号的一个区间，只需请求一次，
+    获取后再在本地筛选出请求的期号。每年的期数不超过200期，多出的数据量很小。
+
+    Args:
+        ranges: (起始期号, 结束期号) 列表
+
+    Returns:
+        list: 每年一个 (起始期号, 结束期号) 区间，按期号升序排列
+    """
+    spans: Dict[str, list] = {}
+    others = []
+    for start_issue, end_issue in ranges:
+        for chunk_start, chunk_end in split_issue_range(start_issue, end_issue):
+            if len(chunk_start) != 5 or not chunk_start.isdigit():
+                others.append((chunk_start, chunk_end))
+                continue
+            span = spans.setdefault(chunk_start[:2], [chunk_start, chunk_end])
+            span[0] = min(span[0], chunk_start)
+            span[1] = max(span[1], chunk_end)
+    return sorted([tuple(span) for span in spans.values()] + others)
 
 
 class AsyncSSQCrawler:
     """双色球数据爬虫类 - 异步版本"""
 
-    def __init__(self, proxy: Optional[str] = None):
+    # 流式读取响应内容时每次读取的字节数
+    STREAM_CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, proxy: Optional[str] = None, pool_size: int = 20, pool_per_host: int = 10,
+                 keepalive_timeout: float = 60.0, dns_cache_ttl: int = 300, timeout: float = 30.0,
+                 db_path: Optional[str] = None, sync_interval: float = 600.0,
+                 cache_enabled: bool = True, cache_retry_interval: float = 300.0,
+                 chunk_concurrency: int = 4, retry_attempts: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 conditional_requests: bool = True, cpu_executor: str = "thread", cpu_workers: int = 2,
+                 parsers: Sequence[str] = DEFAULT_PARSERS):
         """
         初始化爬虫
 
         Args:
             proxy: 代理服务器地址，例如 "socks5://127.0.0.1:10808"
+            pool_size: 连接池总连接数上限
+            pool_per_host: 单个主机的连接数上限
+            keepalive_timeout: 空闲连接保活时间（秒）
+            dns_cache_ttl: DNS缓存时间（秒）
+            timeout: 每次尝试的超时时间（秒）
+            db_path: 本地开奖数据库路径，为None时不使用本地存储
+            sync_interval: 本地数据与网站同步的最小间隔（秒）
+            cache_enabled: 是否启用按开奖时间过期的内存缓存
+            cache_retry_interval: 最近一期结果尚未公布时缓存的过期时间（秒）
+            chunk_concurrency: 分段获取期号范围时的最大并发请求数
+            retry_attempts: 超时、连接错误或5xx响应时每次请求最多尝试的次数
+            backoff_base: 第一次重试前等待时间的上限（秒），之后每次翻倍并随机抖动
+            backoff_max: 重试等待时间的最大值（秒）
+            failure_threshold: 熔断器打开前允许的连续失败请求数，为0时不启用熔断
+            reset_timeout: 熔断器打开后拒绝请求的时间（秒）
+            conditional_requests: 是否使用ETag/Last-Modified条件请求，页面未变化时复用上次的解析结果
+            cpu_executor: 页面解析和数据分析的执行方式，thread、process 或 inline
+            cpu_workers: 同时执行的解析和分析任务数上限
+            parsers: 流式解析失败时依次尝试的解析策略，可选 regex、lxml 和 bs4
         """
         self.base_url = "https://datachart.500.com/ssq/history/newinc/history.php"
         self.headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+            "Accept-Encoding": ACCEPT_ENCODING
         }
         self.proxy = proxy
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_guard: Optional[asyncio.Task] = None
+
+        # 本地开奖数据存储
+        self.store: Optional[SSQDrawStore] = None
+        if db_path:
+            try:
+                self.store = SSQDrawStore(db_path)
+            except (sqlite3.Error, OSError) as e:
+                print(f"无法打开本地数据库 {db_path}，将直接从网站获取数据: {e}")
+        self.sync_interval = sync_interval
+        self._last_sync: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+
+        # 内存缓存，在下一次开奖时过期
+        self.cache: Optional[DrawScheduleCache] = DrawScheduleCache(cache_retry_interval) if cache_enabled else None
+        # 合并并发的相同请求
+        self.singleflight = SingleFlight()
+        self.chunk_concurrency = chunk_concurrency
+        # 本地全部历史数据的增量分析引擎，首次使用时创建
+        self.engine: Optional[AnalysisEngine] = None
+
+        # 重试和熔断
+        self.retry = RetryPolicy(retry_attempts, backoff_base, backoff_max)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.upstream_stats: Dict[str, int] = {
+            "requests": 0, "attempts": 0, "retries": 0, "failures": 0,
+            "not_modified": 0, "bytes_received": 0, "bytes_decoded": 0
+        }
+        # 页面解析和数据分析在线程池或进程池中执行，不阻塞事件循环
+        self.cpu = CPUExecutor(cpu_executor, cpu_workers)
+        # 完整页面的解析策略链，记住最近一次成功的策略
+        self.parsers = ParserChain(parsers)
+        # 条件请求：按请求参数保存ETag/Last-Modified和解析结果
+        self.conditional: Optional[ConditionalCache] = ConditionalCache() if conditional_requests else None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        获取长连接会话，首次使用时创建
+
+        会话在整个爬虫生命周期内复用，避免每次请求都重新进行DNS解析、TCP和TLS握手。
+        如果会话已关闭或所在事件循环已变化，则重新创建。
+        响应内容由 _request 自行解压，以便统计实际传输的字节数。
+
+        Returns:
+            ClientSession: 复用的aiohttp会话
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._discard_session()
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                auto_decompress=False
+            )
+            self._session_loop = loop
+            self._session_guard = loop.create_task(self._close_with_loop(self._session))
+        return self._session
+
+    def _discard_session(self) -> None:
+        """
+        丢弃属于其他事件循环的旧会话
+
+        旧会话不能在当前事件循环中等待关闭：原事件循环仍在运行时交给它关闭；
+        原事件循环已结束时，会话通常已由 _close_with_loop 关闭，否则只能将其切换为已关闭状态。
+        """
+        session, loop = self._session, self._session_loop
+        self._session = None
+        self._session_loop = None
+        self._session_guard = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        else:
+            session.detach()
+
+    @staticmethod
+    async def _close_with_loop(session: aiohttp.ClientSession) -> None:
+        """
+        随事件循环结束关闭会话
+
+        asyncio.run 在关闭事件循环前会取消所有未完成的任务，此时关闭会话和连接池，
+        避免事件循环变化后旧会话和连接泄漏。
+        """
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            if not session.closed:
+                await session.close()
+
+    async def close(self) -> None:
+        """关闭复用的会话和连接池，以及解析和分析任务的线程池或进程池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self._session_guard is not None:
+            self._session_guard.cancel()
+        self._session = None
+        self._session_loop = None
+        self._session_guard = None
+        self.cpu.shutdown()
+
+    async def sync(self, min_count: int = 0) -> int:
+        """
+        将本地数据与网站同步
+
+        只下载比本地最新一期更新的数据：按期号范围请求本地最新一期之后、到当前年份最后一期为止的数据。
+        本地没有数据或期数少于 min_count 时，再获取网站最近 min_count 期以补充更早的数据，
+        此时本地最新一期已与网站衔接，保存的数据不会出现缺口。
+
+        Args:
+            min_count: 本地至少需要保存的期数
+
+        Returns:
+            int: 新增的期数
+        """
+        if self.store is None:
+            return 0
+
+        async with self._sync_lock:
+            count = self.store.count()
+            fresh = self._last_sync is not None and time.monotonic() - self._last_sync < self.sync_interval
+            if fresh and count >= min_count:
+                return 0
+
+            added = 0
+            latest = self.store.latest_issue()
+            if latest is not None and len(latest) == ISSUE_WIDTH and latest.isdigit():
+                end_year = max(datetime.now(CHINA_TZ).year % 100, int(latest[:2]))
+                df = await self._fetch_remote(start_issue=str(int(latest) + 1).zfill(ISSUE_WIDTH),
+                                              end_issue=f"{end_year:02d}999")
+                if df is None:
+                    # 同步失败时继续使用本地已有数据
+                    return 0
+                added = self.store.save(df)
+            else:
+                latest = None
+
+            if latest is None or self.store.count() < min_count:
+                window = max(min_count, 30)
+                df = await self._fetch_remote(limit=window)
+                if df is None:
+                    return added
+                newest = self.store.latest_issue()
+                # 窗口未与本地数据衔接时不保存，避免本地数据出现缺口
+                if newest is None or df.empty or df['期号'].min() <= newest or len(df) < window:
+                    added += self.store.save(df)
+
+            self._last_sync = time.monotonic()
+            return added
 
     async def fetch_data(self, limit: int = 500, sort: int = 0) -> Optional[pd.DataFrame]:
         """
-        获取双色球数据
+        获取双色球数据，依次尝试内存缓存、本地存储和网站
 
         Args:
             limit: 获取的期数
@@ -41,115 +350,350 @@ class AsyncSSQCrawler:
         Returns:
             DataFrame: 包含双色球数据的DataFrame，获取失败则返回None
         """
-        params = {
-            "limit": limit,
-            "sort": sort
-        }
+        if self.cache is not None:
+            df = self.cache.get(limit, sort)
+            if df is not None:
+                return df
 
+        return await self.singleflight.run(("recent", sort), limit, lambda: self._load_and_cache(limit, sort))
+
+    async def fetch_table(self, limit: int = 500, sort: int = 0) -> DrawTable:
+        """
+        以紧凑数据表的形式获取双色球数据，用于数据分析
+
+        内存缓存命中时直接复用缓存条目已转换的数据表，不需要每次都从DataFrame重新转换。
+
+        Args:
+            limit: 获取的期数
+            sort: 排序方式，0为按期号降序，1为按期号升序
+
+        Returns:
+            DrawTable: 开奖数据表，获取失败则返回空数据表
+        """
+        if self.cache is not None:
+            table = self.cache.get_table(limit, sort)
+            if table is not None:
+                return table
+            df = await self.singleflight.run(("recent", sort), limit, lambda: self._load_and_cache(limit, sort))
+        else:
+            df = await self.fetch_data(limit, sort)
+        return DrawTable.coerce(df)
+
+    async def _load_and_cache(self, limit: int, sort: int) -> Optional[pd.DataFrame]:
+        """获取数据并写入内存缓存，获取失败时返回已过期的缓存数据"""
+        df = await self._load_data(limit, sort)
+        if self.cache is not None:
+            if df is None:
+                df = self.cache.get(limit, sort, allow_stale=True)
+                if df is not None:
+                    print("无法从网站获取数据，返回已过期的缓存数据")
+                return df
+            self.cache.put(limit, sort, df)
+        return df
+
+    async def _load_data(self, limit: int, sort: int) -> Optional[pd.DataFrame]:
+        """
+        从本地存储或网站获取双色球数据
+
+        Args:
+            limit: 获取的期数
+            sort: 排序方式
+
+        Returns:
+            DataFrame: 包含双色球数据的DataFrame，获取失败则返回None
+        """
+        if self.store is None:
+            return await self._fetch_remote(limit=limit, sort=sort)
+
+        await self.sync(min_count=limit)
+        df = self.store.load_recent(limit)
+        if df is None:
+            return await self._fetch_remote(limit=limit, sort=sort)
+        return df
+
+    async def _fetch_remote(self, limit: Optional[int] = 500, sort: int = 0,
+                            start_issue: Optional[str] = None, end_issue: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        从网站获取双色球数据
+
+        Args:
+            limit: 获取的期数，指定期号范围时忽略
+            sort: 排序方式，0为按期号降序，1为按期号升序
+            start_issue: 起始期号，与end_issue同时指定时只请求该范围的数据
+            end_issue: 结束期号
+
+        Returns:
+            DataFrame: 包含双色球数据的DataFrame，获取失败则返回None
+        """
+        if start_issue is not None and end_issue is not None:
+            params = {
+                "start": start_issue,
+                "end": end_issue
+            }
+            limit = None
+        else:
+            params = {
+                "limit": limit,
+                "sort": sort
+            }
+
+        headers = self.conditional.headers(params) if self.conditional is not None else {}
+        response = await self._request(params, limit, headers)
+        if response is not None and response[0] == 304:
+            df = self.conditional.get(params)
+            if df is not None:
+                return df
+            # 缓存的解析结果已被淘汰，重新请求完整页面
+            response = await self._request(params, limit)
+        if response is None:
+            return None
+
+        _, df, validators = response
+        if self.conditional is not None:
+            self.conditional.put(params, validators.get("ETag"), validators.get("Last-Modified"), df)
+        return df
+
+    async def _parse_page(self, html_content: str, limit: Optional[int]) -> Optional[pd.DataFrame]:
+        """
+        按解析策略链解析完整的历史数据页面
+
+        最近一次成功的策略最先尝试；解析在CPU任务执行器中进行，策略链的状态在事件循环中更新。
+
+        Args:
+            html_content: 页面内容
+            limit: 请求的期数
+
+        Returns:
+            DataFrame: 包含双色球数据的DataFrame，解析失败则返回None
+        """
+        order = self.parsers.order()
+        name, df = await self.cpu.run(parse_with, html_content, order, limit)
+        self.parsers.record(order, name)
+        if name is None:
+            print("尝试所有解析方式后仍未找到数据")
+        return df
+
+    async def _request(self, params: Dict[str, Any], limit: Optional[int] = None,
+                       headers: Optional[Dict[str, str]] = None) -> Optional[Tuple[int, Optional[pd.DataFrame], Dict[str, str]]]:
+        """
+        请求并解析历史数据页面
+
+        超时、连接错误和5xx/429响应按指数退避重试，每次尝试使用单独的超时时间；
+        熔断器打开时直接返回None，不再等待上游超时。
+        响应内容边下载边解析，见 _read_page。
+
+        Args:
+            params: 请求参数
+            limit: 请求的期数，解析结果最多保留的期数
+            headers: 额外的请求头，例如条件请求的 If-None-Match
+
+        Returns:
+            tuple: (状态码200或304, 解析后的数据, 响应的 ETag 和 Last-Modified)，请求失败则返回None；
+                状态码为304或页面解析失败时数据为None
+        """
+        if not self.breaker.allow():
+            print("网站连续请求失败，熔断中，暂不发起请求")
+            return None
+
+        # 设置代理
+        proxy_settings = {}
+        if self.proxy:
+            proxy_settings = {"proxy": self.proxy}
+
+        self.upstream_stats["requests"] += 1
+        recorded = False
         try:
-            # 设置代理
-            proxy_settings = {}
-            if self.proxy:
-                proxy_settings = {"proxy": self.proxy}
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.base_url,
-                    params=params,
-                    headers=self.headers,
-                    **proxy_settings,
-                    timeout=30
-                ) as response:
-                    if response.status != 200:
+            for attempt in range(self.retry.attempts):
+                if attempt > 0:
+                    self.upstream_stats["retries"] += 1
+                    await asyncio.sleep(self.retry.delay(attempt - 1))
+                self.upstream_stats["attempts"] += 1
+
+                try:
+                    session = self._get_session()
+                    async with session.get(
+                        self.base_url,
+                        params=params,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=self.timeout),
+                        **proxy_settings
+                    ) as response:
+                        if response.status in (200, 304):
+                            df = None
+                            if response.status == 304:
+                                self.upstream_stats["not_modified"] += 1
+                            else:
+                                df = await self._read_page(response, limit)
+                            validators = {
+                                name: response.headers[name]
+                                for name in ("ETag", "Last-Modified") if name in response.headers
+                            }
+                            self.breaker.record_success()
+                            recorded = True
+                            return response.status, df, validators
+
                         print(f"请求失败，状态码: {response.status}")
-                        return None
-
-                    # 获取响应内容
-                    html_content = await response.text()
-                    
-                    # 尝试使用直接解析方法
-                    try:
-                        # 使用更精确的正则表达式提取数据
-                        # 查找包含期号和球号的行
-                        pattern = r'<tr[^>]*><!--<td>\d+</td>--><td>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td><td[^>]*>(\d+)</td>'
-                        matches = re.findall(pattern, html_content, re.DOTALL)
-
-                        if matches:
-                            # 创建DataFrame
-                            data = []
-                            for match in matches:
-                                if len(match) >= 8 and len(match[0]) >= 4:  # 确保期号至少有4位数字
-                                    try:
-                                        # 提取开奖日期
-                                        date_pattern = r'<td>{}.*?<td>(\d{{4}}-\d{{2}}-\d{{2}})</td>'.format(match[0])
-                                        date_match = re.search(date_pattern, html_content)
-                                        date = date_match.group(1) if date_match else ""
-
-                                        row = {
-                                            '期号': match[0],
-                                            '红球1': int(match[1]),
-                                            '红球2': int(match[2]),
-                                            '红球3': int(match[3]),
-                                            '红球4': int(match[4]),
-                                            '红球5': int(match[5]),
-                                            '红球6': int(match[6]),
-                                            '蓝球': int(match[7]),
-                                            '开奖日期': date
-                                        }
-                                        # 验证红球和蓝球的范围
-                                        valid = True
-                                        for i in range(1, 7):
-                                            if not (1 <= row[f'红球{i}'] <= 33):
-                                                valid = False
-                                                break
-                                        if not (1 <= row['蓝球'] <= 16):
-                                            valid = False
-
-                                        if valid:
-                                            data.append(row)
-                                    except (ValueError, IndexError) as e:
-                                        print(f"处理行时出错: {e}")
-                                        continue
-
-                            if data:
-                                df = pd.DataFrame(data)
-                                # 按期号降序排序
-                                df = df.sort_values('期号', ascending=False).reset_index(drop=True)
-                                # 只保留前limit条记录
-                                if len(df) > limit:
-                                    df = df.iloc[:limit]
-                                return df
-
-                        # 如果直接解析方法失败，尝试使用BeautifulSoup解析
-                        print("直接解析失败，尝试使用BeautifulSoup解析...")
-                        return await self._parse_html(html_content)
-                    except Exception as e:
-                        print(f"直接解析失败: {e}")
-                        return await self._parse_html(html_content)
-        except Exception as e:
-            print(f"获取数据时出错: {e}")
+                        if response.status != 429 and response.status < 500:
+                            # 其他客户端错误重试也不会成功，上游本身是可用的
+                            self.breaker.record_success()
+                            recorded = True
+                            return None
+                except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:
+                    print(f"获取数据时出错（第{attempt + 1}次尝试）: {e!r}")
+                except Exception as e:
+                    # 其他错误（例如代理地址格式错误）重试也不会成功
+                    print(f"获取数据时出错: {e}")
+                    return None
+
+            self.upstream_stats["failures"] += 1
+            self.breaker.record_failure()
+            recorded = True
             return None
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+    async def _read_page(self, response: aiohttp.ClientResponse, limit: Optional[int]) -> Optional[pd.DataFrame]:
+        """
+        边下载边解析历史数据页面
+
+        按块读取响应内容，解压后交给流式解析器，每个数据行的 </tr> 结束时即被解析，
+        不保存完整的页面文本，全部历史数据的页面也只占用固定大小的缓冲区。
+        同时统计传输和解压后的字节数。每块的解压和解析以及最后构造DataFrame
+        都在执行器中完成，事件循环只负责接收数据。
+
+        页面中有历史数据表格但没有数据行时，返回空的DataFrame；
+        如果流式解析没有得到任何数据行且不是这种情况（例如页面结构发生变化），
+        则使用保留的页面内容按解析策略链解析。
+
+        Args:
+            response: 状态码为200的响应
+            limit: 最多保留的期数
+
+        Returns:
+            DataFrame: 包含双色球数据的DataFrame（查询范围内没有数据时为空），解析失败则返回None
+        """
+        decoder = Decompressor(response.headers.get("Content-Encoding"))
+        parser = HistoryStreamParser(response.charset)
+        rows: List[Dict[str, Any]] = []
+        # 解析出第一行之前保留页面内容，用于流式解析失败时的备用解析
+        pending: Optional[List[bytes]] = []
+
+        async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+            self.upstream_stats["bytes_received"] += len(chunk)
+            # 解析器在多次调用之间保存状态，只能在当前进程中执行
+            body, chunk_rows = await self.cpu.run_local(self._feed_chunk, decoder, parser, chunk)
+            self.upstream_stats["bytes_decoded"] += len(body)
+            rows.extend(chunk_rows)
+            if pending is not None:
+                pending = None if rows else pending + [body]
+
+        body, chunk_rows = await self.cpu.run_local(self._feed_chunk, decoder, parser, b"", True)
+        self.upstream_stats["bytes_decoded"] += len(body)
+        rows.extend(chunk_rows)
+        if rows:
+            # 数据行传到子进程的序列化开销与构造DataFrame相当，同样在当前进程中执行
+            return await self.cpu.run_local(rows_to_frame, rows, limit)
+        if parser.empty:
+            # 查询范围内没有开奖数据（例如尚未开奖的期号），不是解析失败
+            return pd.DataFrame(columns=COLUMNS)
+
+        print("流式解析失败，尝试使用其他方式解析...")
+        html_content = self._decode_text(b"".join(pending or []) + body, response.charset)
+        return await self._parse_page(html_content, limit)
+
+    @staticmethod
+    def _feed_chunk(decoder: Decompressor, parser: HistoryStreamParser, chunk: bytes,
+                    final: bool = False) -> Tuple[bytes, List[Dict[str, Any]]]:
+        """
+        解压一块响应内容并交给流式解析器
+
+        Args:
+            decoder: 响应的解压器
+            parser: 流式解析器
+            chunk: 网络上收到的一块数据
+            final: 是否为最后一块，为True时取出解压器中剩余的数据并结束解析
+
+        Returns:
+            tuple: (解压后的数据, 这一块内容中结束的数据行)
+        """
+        body = decoder.decompress(chunk)
+        if final:
+            body += decoder.flush()
+        rows = parser.feed(body)
+        if final:
+            rows += parser.close()
+        return body, rows
+
+    @staticmethod
+    def _decode_text(body: bytes, charset: Optional[str]) -> str:
+        """
+        将页面内容解码为字符串
+
+        Args:
+            body: 解压后的页面内容
+            charset: 响应头中声明的字符集
+
+        Returns:
+            str: 页面内容，未声明字符集时依次尝试 UTF-8 和 GB18030
+        """
+        if charset:
+            try:
+                return body.decode(charset, errors="replace")
+            except LookupError:
+                pass
+        try:
+            return body.decode("utf-8")
+        except UnicodeDecodeError:
+            return body.decode("gb18030", errors="replace")
+
+    def upstream_status(self) -> Dict[str, Any]:
+        """
+        获取上游请求的统计信息
 
-    async def fetch_by_issue_range(self, start_issue: str, end_issue: str) -> Optional[pd.DataFrame]:
+        Returns:
+            dict: 请求、尝试、重试、失败和304次数，传输字节数，熔断器状态以及内存缓存命中情况
+        """
+        status: Dict[str, Any] = dict(self.upstream_stats)
+        if self.upstream_stats["bytes_decoded"]:
+            # 实际传输的字节数与解压后字节数之比，越小说明压缩节省的流量越多
+            status["compression_ratio"] = round(
+                self.upstream_stats["bytes_received"] / self.upstream_stats["bytes_decoded"], 3)
+        status["accept_encoding"] = ACCEPT_ENCODING
+        status["parsers"] = self.parsers.status()
+        status["circuit_breaker"] = self.breaker.status()
+        if self.cache is not None:
+            status["cache"] = {"hits": self.cache.hits, "misses": self.cache.misses}
+        if self.conditional is not None:
+            status["conditional_entries"] = len(self.conditional)
+        return status
+
+    async def fetch_by_issue_range(self, start_issue: str, end_issue: str,
+                                   progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None) -> Optional[pd.DataFrame]:
         """
         获取指定期号范围的双色球数据
 
+        只请求需要的期号范围，较大的范围按年份拆分后逐段获取。
+
         Args:
             start_issue: 起始期号
             end_issue: 结束期号
+            progress: 进度回调，每段数据获取完成后调用，参数为已完成数、总数和说明文字
 
         Returns:
             DataFrame: 包含指定期号范围的双色球数据，获取失败则返回None
         """
-        # 获取足够多的数据以覆盖指定范围
-        df = await self.fetch_data(limit=1000, sort=1)
+        start_issue, end_issue = normalize_issue(start_issue), normalize_issue(end_issue)
 
-        if df is None:
-            return None
+        # 本地数据覆盖该范围时直接读取
+        local_df = await self._load_local_range(start_issue, end_issue)
+        if local_df is not None:
+            return local_df
 
-        # 筛选期号范围
-        mask = (df['期号'] >= str(start_issue)) & (df['期号'] <= str(end_issue))
-        return df[mask].reset_index(drop=True)
+        return await self.singleflight.run(
+            ("range", start_issue, end_issue), 0,
+            lambda: self._fetch_remote_range(start_issue, end_issue, progress)
+        )
 
     async def fetch_by_issue(self, issue: str) -> Optional[pd.DataFrame]:
         """
@@ -161,295 +705,372 @@ class AsyncSSQCrawler:
         Returns:
             DataFrame: 包含指定期号的双色球数据，获取失败则返回None
         """
-        # 获取足够多的数据以覆盖指定期号
-        df = await self.fetch_data(limit=1000, sort=1)
+        issue = normalize_issue(issue)
+        return await self.fetch_by_issue_range(issue, issue)
 
-        if df is None:
-            return None
+    async def fetch_by_issues(self, specs: List[Union[str, int]],
+                              progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None) -> Optional[pd.DataFrame]:
+        """
+        一次获取多个期号和期号范围的双色球数据
 
-        # 筛选期号
-        return df[df['期号'] == str(issue)].reset_index(drop=True)
+        所有期号先合并为互不重叠的范围：本地数据覆盖时只执行一次查询，
+        否则每年只请求一次该年内的最小到最大期号，各年并发获取，再筛选出请求的期号。
 
-    async def _parse_html(self, html_content: str) -> Optional[pd.DataFrame]:
+        Args:
+            specs: 期号或期号范围列表，例如 ["24100", "24105-24110"]
+            progress: 进度回调，每段数据获取完成后调用，参数为已完成数、总数和说明文字
+
+        Returns:
+            DataFrame: 按期号降序排列、不含重复期号的数据，获取失败则返回None
         """
-        解析HTML内容
+        ranges = merge_issue_ranges([parse_issue_spec(spec) for spec in specs])
+        if not ranges:
+            return pd.DataFrame(columns=COLUMNS)
+
+        start_issue = ranges[0][0]
+        end_issue = max(end for _, end in ranges)
+
+        # 本地数据覆盖全部范围时一次读取后筛选
+        local_df = await self._load_local_range(start_issue, end_issue)
+        if local_df is not None:
+            return self._filter_ranges(local_df, ranges)
+
+        return await self.singleflight.run(
+            ("ranges",) + tuple(ranges), 0,
+            lambda: self._fetch_remote_ranges(ranges, progress)
+        )
+
+    async def _fetch_remote_range(self, start_issue: str, end_issue: str,
+                                  progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None) -> Optional[pd.DataFrame]:
+        """
+        从网站分段获取指定期号范围的数据
 
         Args:
-            html_content: HTML内容
+            start_issue: 起始期号
+            end_issue: 结束期号
+            progress: 进度回调
 
         Returns:
-            DataFrame: 解析后的数据，解析失败则返回None
+            DataFrame: 按期号降序排列的数据，所有分段都获取失败则返回None
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        return await self._fetch_remote_ranges([(start_issue, end_issue)], progress)
 
-        # 尝试找到表格 - 网站可能使用不同的类名或ID
-        table = soup.find('table', id='tablelist')
+    async def _fetch_remote_ranges(self, ranges: List[tuple],
+                                   progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None) -> Optional[pd.DataFrame]:
+        """
+        从网站并发获取多个期号范围的数据，每年只请求一次
 
-        if not table:
-            print("未找到数据表格，尝试其他方式查找...")
-            # 尝试找到所有表格
-            tables = soup.find_all('table')
-            if tables:
-                # 选择最可能包含数据的表格（通常是最大的表格）
-                table = max(tables, key=lambda t: len(t.find_all('tr')))
-            else:
-                print("网页中没有找到任何表格")
-                return None
+        Args:
+            ranges: 互不重叠的 (起始期号, 结束期号) 列表
+            progress: 进度回调，每段数据获取完成后调用
 
-        # 获取表头行
-        header_row = table.find('tr')
-        if not header_row:
-            print("表格中没有找到表头行")
-            return None
+        Returns:
+            DataFrame: 按期号降序排列的数据，所有分段都获取失败则返回None
+        """
+        chunks = year_spans(ranges)
+        done = 0
+
+        async def on_result(chunk: tuple, df: Optional[pd.DataFrame]) -> None:
+            nonlocal done
+            done += 1
+            await progress(done, len(chunks), f"已获取第{chunk[0]}期至第{chunk[1]}期数据")
+
+        results = await self._fetch_chunks(chunks, on_result=on_result if progress is not None else None)
+        frames = [df for df in results.values() if df is not None]
 
-        # 提取表头
-        headers = []
-        for td in header_row.find_all(['td', 'th']):
-            header_text = td.get_text().strip()
-            if '期号' in header_text:
-                headers.append('期号')
-            elif '红球号码' in header_text or '红球' in header_text:
-                # 添加6个红球列
-                headers.extend(['红球1', '红球2', '红球3', '红球4', '红球5', '红球6'])
-            elif '蓝球' in header_text:
-                headers.append('蓝球')
-            elif '开奖日期' in header_text:
-                headers.append('开奖日期')
-            elif '奖池奖金' in header_text:
-                headers.append('奖池奖金')
-            elif '一等奖注数' in header_text or '一等奖' in header_text:
-                headers.append('一等奖注数')
-            elif '一等奖奖金' in header_text:
-                headers.append('一等奖奖金')
-            elif '二等奖注数' in header_text or '二等奖' in header_text:
-                headers.append('二等奖注数')
-            elif '二等奖奖金' in header_text:
-                headers.append('二等奖奖金')
-            elif '总投注额' in header_text:
-                headers.append('总投注额')
+        if not frames:
+            return None if results else pd.DataFrame(columns=COLUMNS)
+
+        return self._filter_ranges(pd.concat(frames, ignore_index=True), ranges)
+
+    @staticmethod
+    def _filter_ranges(df: pd.DataFrame, ranges: List[tuple]) -> pd.DataFrame:
+        """
+        筛选出位于任一期号范围内的数据
+
+        Args:
+            df: 开奖数据
+            ranges: (起始期号, 结束期号) 列表
+
+        Returns:
+            DataFrame: 按期号降序排列、不含重复期号的数据
+        """
+        mask = np.zeros(len(df), dtype=bool)
+        for start_issue, end_issue in ranges:
+            mask |= ((df['期号'] >= start_issue) & (df['期号'] <= end_issue)).to_numpy()
+        df = df[mask].drop_duplicates('期号')
+        return df.sort_values('期号', ascending=False).reset_index(drop=True)
+
+    async def _fetch_chunks(self, chunks: List[tuple], concurrency: Optional[int] = None,
+                            on_result: Optional[Callable[[tuple, Optional[pd.DataFrame]], Awaitable[None]]] = None
+                            ) -> Dict[tuple, Optional[pd.DataFrame]]:
+        """
+        并发获取多个期号区间的数据，并发数由信号量限制
+
+        Args:
+            chunks: (起始期号, 结束期号) 列表
+            concurrency: 最大并发请求数，默认为 chunk_concurrency
+            on_result: 每个区间获取完成后立即调用的回调，参数为区间和解析后的数据
+
+        Returns:
+            dict: 区间 -> DataFrame，获取失败的区间对应None
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.chunk_concurrency)
+
+        async def fetch(chunk: tuple):
+            async with semaphore:
+                return chunk, await self._fetch_remote(start_issue=chunk[0], end_issue=chunk[1])
+
+        results = {}
+        for future in asyncio.as_completed([fetch(chunk) for chunk in chunks]):
+            chunk, df = await future
+            results[chunk] = df
+            if on_result is not None:
+                await on_result(chunk, df)
+        return results
+
+    async def backfill(self, start_year: int = 2003, concurrency: Optional[int] = None, rounds: int = 2,
+                       progress: Optional[Callable[[int, int, str], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """
+        并发获取全部历史数据
+
+        将期号空间按年份拆分，使用有限的并发数同时获取，每段数据到达后立即解析，
+        并按年份从新到旧依次写入本地存储，保证本地数据始终连续；
+        比尚未获取的年份先到达的数据先写入暂存表，衔接后再写入正式数据。
+        再次执行时会跳过本地已有和已暂存的年份，只获取缺少的年份。
+        未启用本地存储时不获取任何数据，直接返回错误。
+
+        Args:
+            start_year: 起始年份，双色球从2003年开始发行
+            concurrency: 最大并发请求数，默认为 chunk_concurrency
+            rounds: 获取失败的年份最多尝试的轮数
+            progress: 进度回调，参数为已完成数、总数和说明文字
+
+        Returns:
+            dict: 包含合并后的数据、已保存/已暂存/失败/跳过的年份和新增期数；未启用本地存储时 error 为错误信息
+        """
+        if self.store is None:
+            error = "未启用本地存储，回填的历史数据无处保存"
+            print(error)
+            return {'df': None, 'completed': [], 'staged': [], 'failed': [], 'skipped': [], 'added': 0, 'total': 0,
+                    'error': error}
+
+        # 以最新一期所在年份作为结束年份，避免请求尚未开奖的年份
+        await self.sync()
+        latest = self.store.latest_issue()
+        end_year = 2000 + int(latest[:2]) if latest and len(latest) == 5 else datetime.now(CHINA_TZ).year
+        years = list(range(end_year, start_year - 1, -1))
+        skipped = []
+
+        earliest = self.store.earliest_issue()
+        if earliest is not None and len(earliest) == 5:
+            # 本地数据是连续的，比最早一期所在年份更新的年份已经完整；
+            # 最早一期是该年第一期时，该年份也已完整
+            earliest_year = 2000 + int(earliest[:2])
+            if earliest.endswith("001"):
+                earliest_year -= 1
+            skipped = [year for year in years if year > earliest_year]
+            years = [year for year in years if year <= earliest_year]
+
+        # 已经连续的年份中残留的暂存数据直接写入（不会新增期数），清理暂存表
+        staged = set(self.store.staged_years())
+        for year in skipped:
+            if year in staged:
+                self.store.commit_staged(year)
+
+        total = len(years)
+        chunks = {year: (f"{year % 100:02d}001", f"{year % 100:02d}999") for year in years}
+        ready = {year for year in years if year in staged}  # 已暂存、等待写入的年份
+        pending = list(years)  # 按年份降序等待写入本地存储
+        completed: List[int] = []
+        added = 0
+
+        def flush() -> None:
+            nonlocal added
+            # 按年份从新到旧写入，前面的年份未完成时暂不写入
+            while pending and pending[0] in ready:
+                year = pending.pop(0)
+                ready.discard(year)
+                added += self.store.commit_staged(year)
+                completed.append(year)
+
+        async def on_result(chunk: tuple, df: Optional[pd.DataFrame]) -> None:
+            nonlocal added
+            if df is None:
+                return
+            year = next(y for y, c in chunks.items() if c == chunk)
+            if pending and pending[0] == year:
+                pending.pop(0)
+                added += self.store.save(df)
+                completed.append(year)
+                flush()
             else:
-                # 对于其他列，使用原始文本
-                headers.append(header_text)
+                self.store.stage(year, df)
+                ready.add(year)
+            if progress is not None:
+                await progress(total - len(pending) + len(ready), total, f"已获取{year}年数据（{len(df)}期）")
+
+        flush()
+        for _ in range(max(rounds, 1)):
+            remaining = [chunks[year] for year in pending if year not in ready]
+            if not remaining:
+                break
+            await self._fetch_chunks(remaining, concurrency, on_result)
+
+        failed = [year for year in pending if year not in ready]
+        # 合并本地已有数据和本次获取的数据
+        df = self.store.load_recent(self.store.count())
+        if failed:
+            print(f"以下年份获取失败，可稍后重新执行以继续: {failed}")
 
-        # 如果没有找到足够的列名，使用默认列名
-        if len(headers) < 10:
-            print(f"警告：只找到 {len(headers)} 个列名，使用默认列名")
-            headers = ['期号', '红球1', '红球2', '红球3', '红球4', '红球5', '红球6', '蓝球', '开奖日期']
+        return {
+            'df': df,
+            'completed': sorted(completed),
+            'staged': sorted(ready),
+            'failed': sorted(failed),
+            'skipped': sorted(skipped),
+            'added': added,
+            'total': 0 if df is None else len(df)
+        }
 
-        # 获取数据行
-        rows = []
-        data_rows = table.find_all('tr')[1:]  # 跳过表头行
+    async def history_engine(self) -> Optional[AnalysisEngine]:
+        """
+        获取本地全部历史数据的增量分析引擎
 
-        for tr in data_rows:
-            cells = tr.find_all(['td', 'th'])
-            if len(cells) < 8:  # 至少需要期号、6个红球和1个蓝球
-                continue
+        首次使用时一次性计算，之后只把比引擎最新一期更新的数据逐期追加到引擎中。
 
-            row = []
-            red_balls_added = 0
-
-            for i, td in enumerate(cells):
-                cell_text = td.get_text().strip()
-
-                # 处理期号
-                if i == 0 and cell_text.isdigit():
-                    row.append(cell_text)  # 期号
-                # 处理红球
-                elif 1 <= i <= 6:
-                    if cell_text.isdigit() and 1 <= int(cell_text) <= 33:
-                        row.append(cell_text)
-                        red_balls_added += 1
-                # 处理蓝球
-                elif i == 7 and cell_text.isdigit() and 1 <= int(cell_text) <= 16:
-                    row.append(cell_text)  # 蓝球
-                # 处理开奖日期
-                elif i > 7 and re.match(r'\d{4}-\d{2}-\d{2}', cell_text):
-                    row.append(cell_text)  # 开奖日期
-                # 其他数据
-                elif i > 7:
-                    row.append(cell_text)
-
-            # 确保红球数量正确
-            if red_balls_added != 6:
-                # 尝试从行中提取红球
-                red_balls = []
-                for td in cells:
-                    for span in td.find_all('span', class_='ball_1'):
-                        ball_text = span.get_text().strip()
-                        if ball_text.isdigit() and 1 <= int(ball_text) <= 33:
-                            red_balls.append(ball_text)
-
-                # 如果找到了6个红球，替换之前的红球数据
-                if len(red_balls) == 6:
-                    row = [row[0]] + red_balls + row[red_balls_added+1:]
-
-            if len(row) >= 8:  # 至少有期号、6个红球和1个蓝球
-                rows.append(row)
-
-        if not rows:
-            print("未找到有效的数据行")
-
-            # 尝试直接提取所有球号
-            all_rows = []
-            for tr in data_rows:
-                issue = tr.find('td')
-                if not issue:
-                    continue
-
-                issue_text = issue.get_text().strip()
-                if not issue_text.isdigit():
-                    continue
-
-                # 查找所有球号
-                red_spans = tr.find_all('span', class_='ball_1')
-                blue_span = tr.find('span', class_='ball_2')
-
-                if len(red_spans) == 6 and blue_span:
-                    red_balls = [span.get_text().strip() for span in red_spans]
-                    blue_ball = blue_span.get_text().strip()
-
-                    # 查找开奖日期
-                    date_cell = None
-                    for td in tr.find_all('td'):
-                        if re.match(r'\d{4}-\d{2}-\d{2}', td.get_text().strip()):
-                            date_cell = td.get_text().strip()
-                            break
-
-                    row = [issue_text] + red_balls + [blue_ball]
-                    if date_cell:
-                        row.append(date_cell)
-
-                    all_rows.append(row)
-
-            if all_rows:
-                rows = all_rows
-                if len(headers) != len(rows[0]):
-                    headers = ['期号', '红球1', '红球2', '红球3', '红球4', '红球5', '红球6', '蓝球']
-                    if len(rows[0]) > 8:
-                        headers.append('开奖日期')
-
-        if not rows:
-            print("尝试使用lxml解析...")
-            try:
-                # 尝试使用lxml解析
-                html_tree = lxml.html.parse(io.StringIO(html_content))
-                root = html_tree.getroot()
-
-                # 尝试找到表格
-                tables = root.xpath('//table')
-                if tables:
-                    table_element = tables[0]  # 使用第一个表格
-
-                    # 获取所有行
-                    tr_elements = table_element.xpath('.//tr')
-
-                    if len(tr_elements) > 1:
-                        # 提取数据
-                        lxml_rows = []
-                        for tr in tr_elements[1:]:  # 跳过表头
-                            cells = tr.xpath('.//td')
-                            if len(cells) >= 8:
-                                row_data = []
-                                for i, cell in enumerate(cells):
-                                    text = cell.text_content().strip()
-                                    if i == 0 and text.isdigit():  # 期号
-                                        row_data.append(text)
-                                    elif 1 <= i <= 6:  # 红球
-                                        if text.isdigit() and 1 <= int(text) <= 33:
-                                            row_data.append(text)
-                                    elif i == 7 and text.isdigit() and 1 <= int(text) <= 16:  # 蓝球
-                                        row_data.append(text)
-                                    elif i > 7:  # 其他数据
-                                        row_data.append(text)
-
-                                if len(row_data) >= 8:
-                                    lxml_rows.append(row_data)
-
-                        if lxml_rows:
-                            rows = lxml_rows
-                            headers = ['期号', '红球1', '红球2', '红球3', '红球4', '红球5', '红球6', '蓝球']
-                            if len(rows[0]) > 8:
-                                headers.append('开奖日期')
-            except Exception as e:
-                print(f"lxml解析失败: {e}")
-
-        if not rows:
-            print("尝试所有方法后仍未找到数据")
+        Returns:
+            AnalysisEngine: 分析引擎，未启用本地存储或没有数据时返回None
+        """
+        if self.store is None:
             return None
 
-        # 创建DataFrame
-        df = pd.DataFrame(rows)
+        await self.sync()
+        earliest = self.store.earliest_issue()
+        if earliest is None:
+            return None
 
-        # 检查是否有空行或无效行（第一行可能是表头）
-        if len(df) > 0 and df.iloc[0][0] == '1' and not df.iloc[0][1].isdigit():
-            df = df.iloc[1:].reset_index(drop=True)
+        if self.engine is None or int(earliest) < self.engine.earliest_issue:
+            # 首次使用或本地补充了更早的数据时重新计算
+            df = self.store.load_newer(None)
+            self.engine = AnalysisEngine.from_table(DrawTable.from_dataframe(df))
+        else:
+            df = self.store.load_newer(str(self.engine.latest_issue).zfill(ISSUE_WIDTH))
+            if df is not None:
+                self.engine.extend(DrawTable.from_dataframe(df))
+        return self.engine
+
+    async def analyze_frequency_range(self, start_issue: Optional[str] = None, end_issue: Optional[str] = None,
+                                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                      top_n: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        分析任意期号范围或日期范围内的号码出现频率
 
-        # 确保至少有8列（期号、6个红球、1个蓝球）
-        if len(df.columns) < 8:
-            print(f"警告：列数不足 ({len(df.columns)})")
+        本地数据覆盖该范围时使用分析引擎的前缀和计数表直接得出结果；
+        否则按 fetch_by_issue_range 获取该期号范围的数据后再统计，
+        只给出日期时按日期所在年份确定期号范围（每年的期号从该年的001开始）。
+
+        Args:
+            start_issue: 起始期号（包含）
+            end_issue: 结束期号（包含）
+            start_date: 起始日期，格式为 YYYY-MM-DD（包含）
+            end_date: 结束日期，格式为 YYYY-MM-DD（包含）
+            top_n: 显示前N个高频号码
+
+        Returns:
+            dict: 包含红球和蓝球频率、区间期数及首末期号的字典，没有数据则返回None
+        """
+        start_issue = normalize_issue(start_issue) if start_issue else None
+        end_issue = normalize_issue(end_issue) if end_issue else None
+        start_day = int(np.datetime64(start_date, 'D').astype(np.int64)) if start_date else None
+        end_day = int(np.datetime64(end_date, 'D').astype(np.int64)) if end_date else None
+
+        engine = await self.history_engine()
+        if engine is not None and self._engine_covers(engine, start_issue, end_issue, start_day, end_day):
+            return engine.frequency_between(
+                int(start_issue) if start_issue else None,
+                int(end_issue) if end_issue else None,
+                start_day, end_day, top_n
+            )
+
+        # 本地数据不覆盖时按期号范围获取，只给出日期时使用日期所在年份的全部期号
+        if start_issue is None:
+            if start_date is None:
+                return None
+            start_issue = f"{int(start_date[:4]) % 100:02d}001"
+        if end_issue is None:
+            end_year = int(end_date[:4]) if end_date else datetime.now(CHINA_TZ).year
+            end_issue = f"{end_year % 100:02d}999"
+        df = await self.fetch_by_issue_range(start_issue, end_issue)
+        table = DrawTable.coerce(df)[::-1]
+        if len(table) == 0:
             return None
+        engine = AnalysisEngine.from_table(table)
+        return engine.frequency_between(int(start_issue), int(end_issue), start_day, end_day, top_n)
 
-        # 重新设置列名，不依赖于之前解析的headers
-        num_cols = len(df.columns)
-        new_headers = []
+    def _engine_covers(self, engine: AnalysisEngine, start_issue: Optional[str], end_issue: Optional[str],
+                       start_day: Optional[int], end_day: Optional[int]) -> bool:
+        """
+        判断分析引擎中的本地数据是否覆盖请求的期号范围和日期范围
 
-        # 添加基本列名
-        if num_cols >= 1:
-            new_headers.append('期号')
+        请求的结束期号或日期晚于本地最新数据时，只要最近一次同步成功就视为覆盖（网站还没有更新的数据）。
 
-        # 添加红球列名
-        for i in range(1, 7):
-            if len(new_headers) < num_cols:
-                new_headers.append(f'红球{i}')
-
-        # 添加蓝球列名
-        if len(new_headers) < num_cols:
-            new_headers.append('蓝球')
-
-        # 添加开奖日期列名
-        if len(new_headers) < num_cols:
-            new_headers.append('开奖日期')
-
-        # 添加其他列名
-        while len(new_headers) < num_cols:
-            new_headers.append(f'列{len(new_headers)+1}')
-
-        # 设置列名
-        df.columns = new_headers
-
-        # 检查数据有效性
-        if len(df) > 0:
-            # 删除无效行
-            valid_rows = []
-            for i, row in df.iterrows():
-                # 检查期号是否是数字
-                if not str(row['期号']).isdigit():
-                    continue
-
-                # 检查是否有足够的红球数据
-                red_balls_valid = True
-                for j in range(1, 7):
-                    col_name = f'红球{j}'
-                    if col_name in df.columns and pd.isna(row[col_name]):
-                        red_balls_valid = False
-                        break
-
-                if not red_balls_valid:
-                    continue
-
-                valid_rows.append(i)
-
-            # 只保留有效行
-            if valid_rows:
-                df = df.iloc[valid_rows].reset_index(drop=True)
-            elif len(df) > 1:  # 如果没有有效行但有多行，可能第一行是表头
-                df = df.iloc[1:].reset_index(drop=True)
-
-        # 确保红球和蓝球列是数字
-        for col in df.columns:
-            if '红球' in col or col == '蓝球':
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        Args:
+            engine: 本地全部历史数据的分析引擎
+            start_issue: 起始期号
+            end_issue: 结束期号
+            start_day: 起始日期（距 1970-01-01 的天数）
+            end_day: 结束日期
+
+        Returns:
+            bool: 是否可以直接使用分析引擎得出结果
+        """
+        if engine.total == 0:
+            return False
+        if start_issue is not None and int(start_issue) < engine.earliest_issue:
+            return False
+        synced = self._last_sync is not None
+        if end_issue is not None and int(end_issue) > engine.latest_issue and not synced:
+            return False
+        if start_day is None and end_day is None:
+            return True
+
+        span = engine.date_span()
+        if span is None:
+            return False
+        first_day, last_day = span
+        if start_day is not None and start_day < first_day:
+            return False
+        if end_day is not None and end_day > last_day and not synced:
+            return False
+        return True
+
+    async def _load_local_range(self, start_issue: str, end_issue: str) -> Optional[pd.DataFrame]:
+        """
+        从本地存储读取指定期号范围的数据
+
+        Args:
+            start_issue: 起始期号
+            end_issue: 结束期号
+
+        Returns:
+            DataFrame: 本地数据覆盖该范围时返回对应数据（可能为空），否则返回None
+        """
+        if self.store is None:
+            return None
+
+        # 请求的期号比本地最新一期更新时，先尝试同步
+        latest = self.store.latest_issue()
+        if latest is None or str(end_issue) > latest:
+            await self.sync()
 
+        earliest = self.store.earliest_issue()
+        if earliest is None or str(start_issue) < earliest:
+            return None
+
+        df = self.store.load_range(start_issue, end_issue)
+        if df is None:
+            return pd.DataFrame(columns=COLUMNS)
         return df
 
     def format_to_markdown(self, df: Optional[pd.DataFrame]) -> str:
@@ -487,45 +1108,24 @@ class AsyncSSQCrawler:
         if not display_columns:
             return "没有找到有效的列"
 
-        # 使用tabulate生成Markdown表格
-        return df[display_columns].to_markdown(index=False)
+        # 直接拼接字符串生成Markdown表格
+        return markdown_table(display_columns, [df[col].tolist() for col in display_columns])
 
-    async def analyze_frequency(self, df: Optional[pd.DataFrame], top_n: int = 10) -> Optional[Dict[str, pd.Series]]:
+    async def analyze_frequency(self, df: Union[pd.DataFrame, DrawTable, None], top_n: int = 10) -> Optional[Dict[str, pd.Series]]:
         """
         分析号码出现频率
 
         Args:
-            df: DataFrame数据
+            df: DataFrame数据或紧凑数据表
             top_n: 显示前N个高频号码
 
         Returns:
             dict: 包含红球和蓝球频率分析的字典，分析失败则返回None
         """
-        if df is None or df.empty:
+        table = DrawTable.coerce(df)
+        if len(table) == 0:
             return None
-
-        # 分析红球频率
-        red_balls_list = []
-        for i in range(1, 7):
-            col_name = f'红球{i}'
-            if col_name in df.columns:
-                red_balls_list.append(df[col_name])
-
-        # 使用concat合并非空列表
-        if red_balls_list:
-            red_balls = pd.concat(red_balls_list)
-        else:
-            red_balls = pd.Series()
-
-        red_freq = red_balls.value_counts().head(top_n)
-
-        # 分析蓝球频率
-        blue_freq = df['蓝球'].value_counts().head(top_n)
-
-        return {
-            'red_freq': red_freq,
-            'blue_freq': blue_freq
-        }
+        return await self.cpu.run(frequency_summary, table, top_n)
 
     def format_frequency_to_markdown(self, freq_data: Optional[Dict[str, pd.Series]]) -> str:
         """
@@ -547,67 +1147,30 @@ class AsyncSSQCrawler:
 
         if red_freq is not None and not red_freq.empty:
             result.append("### 红球出现频率（前10）\n")
-            red_df = pd.DataFrame({'号码': red_freq.index, '出现次数': red_freq.values})
-            result.append(red_df.to_markdown(index=False))
+            result.append(markdown_table(['号码', '出现次数'], [red_freq.index.tolist(), red_freq.tolist()]))
             result.append("\n")
 
         if blue_freq is not None and not blue_freq.empty:
             result.append("### 蓝球出现频率（前10）\n")
-            blue_df = pd.DataFrame({'号码': blue_freq.index, '出现次数': blue_freq.values})
-            result.append(blue_df.to_markdown(index=False))
+            result.append(markdown_table(['号码', '出现次数'], [blue_freq.index.tolist(), blue_freq.tolist()]))
 
         return "\n".join(result)
 
-    async def analyze_missing_periods(self, df: Optional[pd.DataFrame], top_n: int = 10) -> Optional[Dict[str, Any]]:
+    async def analyze_missing_periods(self, df: Union[pd.DataFrame, DrawTable, None], top_n: int = 10) -> Optional[Dict[str, Any]]:
         """
         分析号码遗漏期数
 
         Args:
-            df: DataFrame数据
+            df: DataFrame数据或紧凑数据表，按期号降序排列
             top_n: 显示前N个遗漏期数最多的号码
 
         Returns:
             dict: 包含红球和蓝球遗漏期数分析的字典，分析失败则返回None
         """
-        if df is None or df.empty:
+        table = DrawTable.coerce(df)
+        if len(table) == 0:
             return None
-
-        # 获取最新一期的期号
-        latest_issue = df.iloc[0]['期号'] if '期号' in df.columns else None
-
-        # 所有可能的红球和蓝球号码
-        all_red_balls = list(range(1, 34))
-        all_blue_balls = list(range(1, 17))
-
-        # 分析红球遗漏
-        red_missing = {}
-        for num in all_red_balls:
-            for i, row in df.iterrows():
-                if any(num == row[f'红球{j}'] for j in range(1, 7) if f'红球{j}' in df.columns):
-                    red_missing[num] = i
-                    break
-            else:
-                red_missing[num] = len(df)  # 如果所有期都没出现
-
-        # 分析蓝球遗漏
-        blue_missing = {}
-        for num in all_blue_balls:
-            for i, row in df.iterrows():
-                if num == row['蓝球']:
-                    blue_missing[num] = i
-                    break
-            else:
-                blue_missing[num] = len(df)  # 如果所有期都没出现
-
-        # 转换为Series并排序
-        red_missing_series = pd.Series(red_missing).sort_values(ascending=False).head(top_n)
-        blue_missing_series = pd.Series(blue_missing).sort_values(ascending=False).head(top_n)
-
-        return {
-            'red_missing': red_missing_series,
-            'blue_missing': blue_missing_series,
-            'latest_issue': latest_issue
-        }
+        return await self.cpu.run(missing_summary, table, top_n)
 
     def format_missing_to_markdown(self, missing_data: Optional[Dict[str, Any]]) -> str:
         """
@@ -633,13 +1196,192 @@ class AsyncSSQCrawler:
 
         if red_missing is not None and not red_missing.empty:
             result.append("### 红球遗漏期数（前10）\n")
-            red_df = pd.DataFrame({'号码': red_missing.index, '遗漏期数': red_missing.values})
-            result.append(red_df.to_markdown(index=False))
+            result.append(markdown_table(['号码', '遗漏期数'], [red_missing.index.tolist(), red_missing.tolist()]))
             result.append("\n")
 
         if blue_missing is not None and not blue_missing.empty:
             result.append("### 蓝球遗漏期数（前10）\n")
-            blue_df = pd.DataFrame({'号码': blue_missing.index, '遗漏期数': blue_missing.values})
-            result.append(blue_df.to_markdown(index=False))
+            result.append(markdown_table(['号码', '遗漏期数'], [blue_missing.index.tolist(), blue_missing.tolist()]))
 
         return "\n".join(result)
+
+    async def analyze_cooccurrence(self, df: Union[pd.DataFrame, DrawTable, None], top_k: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        分析红球号码共同出现的次数
+
+        Args:
+            df: DataFrame数据或紧凑数据表
+            top_k: 显示前K个共同出现次数最多的号码对和三元组
+
+        Returns:
+            dict: 包含号码对和三元组共现次数的字典，分析失败则返回None
+        """
+        table = DrawTable.coerce(df)
+        if len(table) == 0:
+            return None
+        return await self.cpu.run(cooccurrence_summary, table, top_k)
+
+    def format_cooccurrence_to_markdown(self, cooccurrence_data: Optional[Dict[str, Any]]) -> str:
+        """
+        将共现分析结果格式化为Markdown表格
+
+        Args:
+            cooccurrence_data: 共现分析结果
+
+        Returns:
+            str: Markdown格式的表格
+        """
+        if cooccurrence_data is None:
+            return "没有找到数据"
+
+        pairs = cooccurrence_data.get('pairs') or []
+        triples = cooccurrence_data.get('triples') or []
+        latest_issue = cooccurrence_data.get('latest_issue')
+
+        result = []
+
+        if latest_issue:
+            result.append(f"### 截至第{latest_issue}期共{cooccurrence_data.get('total', 0)}期红球共现分析\n")
+
+        if pairs:
+            result.append(f"### 红球号码对共同出现次数（前{len(pairs)}）\n")
+            result.append(markdown_table(['号码对', '出现次数'], [
+                [" ".join(f"{n:02d}" for n in numbers) for numbers, _ in pairs],
+                [count for _, count in pairs]
+            ]))
+            result.append("\n")
+
+        if triples:
+            result.append(f"### 红球三元组共同出现次数（前{len(triples)}）\n")
+            result.append(markdown_table(['三元组', '出现次数'], [
+                [" ".join(f"{n:02d}" for n in numbers) for numbers, _ in triples],
+                [count for _, count in triples]
+            ]))
+
+        return "\n".join(result)
+
+    async def match_numbers(self, df: Union[pd.DataFrame, DrawTable, None], red_numbers: List[int],
+                            blue_number: Optional[int] = None, top_n: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        将一注号码与历史开奖号码比较
+
+        每期红球编码为位掩码后，“包含全部号码”、“与投注的重合个数”和“两期的共同号码”
+        都只需对全部数据做几次按位运算。
+
+        Args:
+            df: DataFrame数据或紧凑数据表，按期号降序排列
+            red_numbers: 红球号码（1-33，可以是复式）
+            blue_number: 蓝球号码（1-16），为None时不比较蓝球
+            top_n: 返回的完全包含和重合最多的开奖期数上限
+
+        Returns:
+            dict: 比较结果，号码无效或没有数据则返回None
+        """
+        if not red_numbers or any(not 1 <= int(num) <= 33 for num in red_numbers):
+            print(f"红球号码无效: {red_numbers}")
+            return None
+        if blue_number is not None and not 1 <= int(blue_number) <= 16:
+            print(f"蓝球号码无效: {blue_number}")
+            return None
+        table = DrawTable.coerce(df)
+        if len(table) == 0:
+            return None
+        return await self.cpu.run(match_summary, table, red_numbers, blue_number, top_n)
+
+    def format_match_to_markdown(self, match_data: Optional[Dict[str, Any]]) -> str:
+        """
+        将号码比较结果格式化为Markdown
+
+        Args:
+            match_data: 号码比较结果
+
+        Returns:
+            str: Markdown格式的比较结果
+        """
+        if match_data is None:
+            return "没有找到数据"
+
+        numbers = " ".join(f"{num:02d}" for num in match_data['red_numbers'])
+        if match_data.get('blue_number') is not None:
+            numbers += f" + {match_data['blue_number']:02d}"
+
+        result = [f"### 号码 {numbers} 与截至第{match_data['latest_issue']}期共{match_data['total']}期开奖的比较\n"]
+
+        matched = match_data['matched_issues']
+        result.append(f"- 包含全部号码的开奖: {match_data['matched_count']}期"
+                      + (f"（最近: {', '.join(matched)}）" if matched else ""))
+        if match_data.get('blue_number') is not None:
+            result.append(f"- 蓝球相同的开奖: {match_data['blue_hits']}期")
+        result.append("\n### 红球重合个数分布\n")
+        distribution = match_data['hit_distribution']
+        result.append(markdown_table(['重合个数', '期数'], [list(distribution), list(distribution.values())]))
+
+        best = match_data['best_matches']
+        if best:
+            result.append(f"\n### 重合最多的开奖（前{len(best)}）\n")
+            result.append(markdown_table(['期号', '重合红球', '蓝球相同'], [
+                [item['issue'] for item in best],
+                [" ".join(f"{num:02d}" for num in item['common_numbers']) or "-" for item in best],
+                ["是" if item['blue_hit'] else "否" for item in best]
+            ]))
+
+        latest_repeat = " ".join(f"{num:02d}" for num in match_data['latest_repeat']) or "无"
+        result.append("\n### 相邻两期红球重号\n")
+        result.append(f"- 第{match_data['latest_issue']}期与上一期的重号: {latest_repeat}\n")
+        repeats = match_data['repeat_distribution']
+        result.append(markdown_table(['重号个数', '期数'], [list(repeats), list(repeats.values())]))
+
+        return "\n".join(result)
+
+    async def analyze_gap_distribution(self, df: Union[pd.DataFrame, DrawTable, None]) -> Optional[Dict[str, Any]]:
+        """
+        分析每个号码的历史遗漏分布
+
+        Args:
+            df: DataFrame数据或紧凑数据表，按期号降序排列
+
+        Returns:
+            dict: 包含红球和蓝球遗漏分布的字典，分析失败则返回None
+        """
+        table = DrawTable.coerce(df)
+        if len(table) == 0:
+            return None
+        return await self.cpu.run(gap_summary, table)
+
+    def format_gap_distribution_to_markdown(self, gap_data: Optional[Dict[str, Any]]) -> str:
+        """
+        将遗漏分布分析结果格式化为Markdown表格
+
+        Args:
+            gap_data: 遗漏分布分析结果
+
+        Returns:
+            str: Markdown格式的表格
+        """
+        if gap_data is None:
+            return "没有找到数据"
+
+        latest_issue = gap_data.get('latest_issue')
+
+        result = []
+
+        if latest_issue:
+            result.append(f"### 截至第{latest_issue}期共{gap_data.get('total', 0)}期遗漏分布分析\n")
+
+        for key, title in (('red_gaps', "红球"), ('blue_gaps', "蓝球")):
+            stats = gap_data.get(key) or []
+            if not stats:
+                continue
+            result.append(f"### {title}遗漏分布\n")
+            headers = ['号码', '出现次数', '当前遗漏', '最大遗漏', '平均遗漏']
+            columns = [[item[key] for item in stats]
+                       for key in ('number', 'occurrences', 'current_gap', 'max_gap', 'mean_gap')]
+            for q in stats[0]['percentiles']:
+                headers.append(f'P{q}')
+                columns.append([item['percentiles'][q] for item in stats])
+            headers.append('当前/最大')
+            columns.append([item['current_ratio'] for item in stats])
+            result.append(markdown_table(headers, columns))
+            result.append("\n")
+
+        return "\n".join(result).rstrip()
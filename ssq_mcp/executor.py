@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+CPU密集任务的执行器模块
+
+页面解析和数据分析都是不会让出事件循环的同步计算，直接在协程中执行会阻塞
+同一事件循环上的所有MCP请求和健康检查。这里将它们交给线程池或进程池执行，
+同时限制同时执行的任务数，并统计排队和执行耗时。
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Optional, Dict, Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+EXECUTOR_KINDS = ("thread", "process", "inline")
+
+
+class CPUExecutor:
+    """
+    CPU密集任务执行器
+
+    - thread: 线程池，任务与事件循环共享内存，没有序列化开销
+    - process: 进程池，不受GIL限制，任务函数和参数必须可以被pickle
+    - inline: 直接在事件循环中执行，用于调试
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 2):
+        """
+        初始化执行器
+
+        Args:
+            kind: 执行方式，thread、process 或 inline
+            max_workers: 同时执行的任务数上限，超过时任务排队等待
+
+        Raises:
+            ValueError: 不支持的执行方式
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"不支持的执行方式: {kind}，可选值为 {', '.join(EXECUTOR_KINDS)}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+        # 进程池方式下执行 run_local 任务的线程池
+        self._local_executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.queued = 0
+        self.running = 0
+        self.stats: Dict[str, Any] = {
+            "submitted": 0, "completed": 0, "failed": 0, "max_queued": 0,
+            "wait_time": 0.0, "max_wait_time": 0.0, "run_time": 0.0
+        }
+
+    def _get_executor(self) -> Executor:
+        """获取线程池或进程池，首次使用时创建"""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ssq-cpu")
+        return self._executor
+
+    def _get_local_executor(self) -> Executor:
+        """获取在当前进程中执行任务的线程池，线程池方式下与 _get_executor 相同"""
+        if self.kind != "process":
+            return self._get_executor()
+        if self._local_executor is None:
+            self._local_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ssq-local")
+        return self._local_executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取限制同时执行任务数的信号量，事件循环变化时重新创建"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        执行CPU密集任务
+
+        正在执行的任务数达到上限时在事件循环中排队，而不是堆积在线程池或进程池的内部队列中，
+        从而可以统计排队的任务数和等待时间。
+
+        Args:
+            func: 任务函数
+            args: 位置参数
+            kwargs: 关键字参数
+
+        Returns:
+            任务函数的返回值
+        """
+        return await self._run(self._get_executor, func, args, kwargs)
+
+    async def run_local(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        在当前进程中执行CPU密集任务
+
+        任务会修改当前进程中的对象（例如跨多次调用保存状态的流式解析器），
+        或参数和结果的序列化开销不低于计算本身时使用：进程池方式下改为在线程池中执行，
+        其他方式与 run 相同。
+
+        Args:
+            func: 任务函数
+            args: 位置参数
+            kwargs: 关键字参数
+
+        Returns:
+            任务函数的返回值
+        """
+        return await self._run(self._get_local_executor, func, args, kwargs)
+
+    async def _run(self, get_executor: Callable[[], Executor], func: Callable[..., T],
+                   args: tuple, kwargs: Dict[str, Any]) -> T:
+        """排队等待后在指定的线程池或进程池中执行任务，并统计排队和执行耗时"""
+        self.stats["submitted"] += 1
+        self.queued += 1
+        self.stats["max_queued"] = max(self.stats["max_queued"], self.queued)
+        queued_at = time.perf_counter()
+        semaphore = self._get_semaphore()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started = time.perf_counter()
+        wait = started - queued_at
+        self.stats["wait_time"] += wait
+        self.stats["max_wait_time"] = max(self.stats["max_wait_time"], wait)
+        self.running += 1
+        try:
+            if self.kind == "inline":
+                result = func(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+            self.stats["completed"] += 1
+            return result
+        except BaseException:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.running -= 1
+            self.stats["run_time"] += time.perf_counter() - started
+            semaphore.release()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        获取执行器状态
+
+        Returns:
+            dict: 执行方式、任务数上限、正在执行和排队的任务数，以及平均和最大等待时间、平均执行时间（毫秒）
+        """
+        finished = self.stats["completed"] + self.stats["failed"]
+        started = self.stats["submitted"] - self.queued
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.stats["max_queued"],
+            "submitted": self.stats["submitted"],
+            "completed": self.stats["completed"],
+            "failed": self.stats["failed"],
+            "avg_wait_ms": round(self.stats["wait_time"] / started * 1000, 2) if started else 0.0,
+            "max_wait_ms": round(self.stats["max_wait_time"] * 1000, 2),
+            "avg_run_ms": round(self.stats["run_time"] / finished * 1000, 2) if finished else 0.0
+        }
+
+    def shutdown(self) -> None:
+        """关闭线程池或进程池，不等待正在执行的任务，下次使用时重新创建"""
+        for executor in (self._executor, self._local_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._local_executor = None
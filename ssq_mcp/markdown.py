@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Markdown表格生成模块
+
+直接拼接字符串生成Markdown表格，不经过 pandas 的 to_markdown 和 tabulate。
+单元格不做宽度补齐，渲染结果与 tabulate 的 pipe 格式相同，但生成更快、文本更短。
+"""
+
+from numbers import Number
+from typing import Any, List, Sequence
+
+
+def format_cell(value: Any) -> str:
+    """
+    格式化单元格的值
+
+    Args:
+        value: 单元格的值
+
+    Returns:
+        str: 浮点数使用与 tabulate 相同的 "g" 格式，其他值直接转为字符串
+    """
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def markdown_table(headers: Sequence[str], columns: Sequence[Sequence[Any]]) -> str:
+    """
+    按列生成Markdown表格
+
+    与 tabulate 相同，数值列（包括全部由数字组成的字符串，例如期号）右对齐，其他列左对齐。
+
+    Args:
+        headers: 列名
+        columns: 每一列的值，各列长度相同
+
+    Returns:
+        str: Markdown格式的表格
+    """
+    separators = []
+    cells: List[List[str]] = []
+    for column in columns:
+        numeric = len(column) > 0 and all(
+            isinstance(value, Number) or (isinstance(value, str) and value.isdigit()) for value in column)
+        separators.append("---:" if numeric else ":---")
+        if not any(isinstance(value, float) for value in column):
+            cells.append(list(map(str, column)))
+        else:
+            cells.append([format_cell(value) for value in column])
+
+    lines = ["| " + " | ".join(headers) + " |", "|" + "|".join(separators) + "|"]
+    lines.extend("| " + " | ".join(row) + " |" for row in zip(*cells))
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据工具的游标分页模块
+
+游标是不透明的字符串，记录查询参数的摘要、第一页时结果中的最新期号和下一页的起始位置。
+出现新的开奖数据后，按位置计算的分页会错位，因此结果的最新期号变化后旧游标即失效。
+"""
+
+import base64
+import hashlib
+import json
+from typing import Optional, Tuple, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def query_digest(*params: Any) -> str:
+    """
+    计算查询参数的摘要，防止游标被用于参数不同的查询
+
+    Args:
+        params: 工具名和查询参数
+
+    Returns:
+        str: 参数摘要
+    """
+    text = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def encode_cursor(digest: str, latest_issue: str, offset: int) -> str:
+    """
+    生成分页游标
+
+    Args:
+        digest: 查询参数摘要
+        latest_issue: 结果中的最新期号
+        offset: 下一页的起始位置
+
+    Returns:
+        str: 游标字符串
+    """
+    payload = json.dumps({'q': digest, 'i': latest_issue, 'o': offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, digest: str) -> Tuple[str, int]:
+    """
+    解析分页游标
+
+    Args:
+        cursor: 游标字符串
+        digest: 当前查询参数的摘要
+
+    Returns:
+        tuple: (生成游标时的最新期号, 下一页的起始位置)
+
+    Raises:
+        ValueError: 游标格式错误或不属于当前查询
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        latest_issue, offset = str(payload['i']), int(payload['o'])
+        matched = payload['q'] == digest
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("分页游标格式错误")
+    if not matched or offset < 0:
+        raise ValueError("分页游标与当前查询参数不匹配")
+    return latest_issue, offset
+
+
+def paginate(df: "pd.DataFrame", digest: str, page_size: int = 0,
+             cursor: Optional[str] = None) -> Tuple["pd.DataFrame", Optional[str]]:
+    """
+    从按期号降序排列的数据中截取一页
+
+    Args:
+        df: 完整的查询结果，按期号降序排列
+        digest: 查询参数摘要
+        page_size: 每页的期数，为0时不分页
+        cursor: 上一页返回的游标，为None时返回第一页
+
+    Returns:
+        tuple: (当前页的数据, 下一页的游标)，没有更多数据时游标为None
+
+    Raises:
+        ValueError: 游标无效，或生成游标后出现了新的开奖数据
+    """
+    latest_issue = str(df['期号'].iloc[0]) if not df.empty else ""
+    offset = 0
+    if cursor:
+        cursor_issue, offset = decode_cursor(cursor, digest)
+        if cursor_issue != latest_issue:
+            raise ValueError(f"分页游标已失效（最新一期已从第{cursor_issue}期变为第{latest_issue}期），请重新查询")
+
+    if page_size <= 0:
+        return df.iloc[offset:], None
+
+    end = offset + page_size
+    next_cursor = encode_cursor(digest, latest_issue, end) if end < len(df) else None
+    return df.iloc[offset:end], next_cursor
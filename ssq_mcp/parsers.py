@@ -0,0 +1,479 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+双色球历史数据页面解析模块
+
+下载时使用逐块接收页面内容、每个 </tr> 结束时立即产出数据行的流式解析；
+流式解析失败时，由 ParserChain 按顺序尝试对完整页面的多种解析策略：
+单次扫描的正则解析、lxml XPath 解析和 BeautifulSoup 解析，所有策略输出相同的列。
+"""
+
+import re
+from typing import Optional, Dict, List, Any, Iterable, Iterator, Callable, Sequence, Tuple
+
+import pandas as pd
+
+
+# 数据行：注释掉的序号列、期号、6个红球、1个蓝球，以及该行剩余的所有列
+ROW_PATTERN = re.compile(
+    r'<tr[^>]*>\s*<!--<td>\d+</td>-->\s*<td>(\d+)</td>'
+    + r'\s*<td[^>]*>(\d+)</td>' * 7
+    + r'(.*?)</tr>',
+    re.DOTALL
+)
+CELL_PATTERN = re.compile(r'<td[^>]*>(.*?)</td>', re.DOTALL)
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+# 历史数据表格（table#tablelist）或数据行所在的 tbody#tdata
+TABLE_MARKER = re.compile(rb'id\s*=\s*["\']?(?:tablelist|tdata)\b')
+
+
+def parse_history_rows(html_content: str) -> List[Dict[str, Any]]:
+    """
+    单次扫描解析历史数据页面中的所有数据行
+
+    按文档顺序逐行匹配，期号、球号和开奖日期都从同一行中提取，
+    解析时间与页面大小成线性关系。
+
+    Args:
+        html_content: HTML内容
+
+    Returns:
+        list: 数据行字典列表，红球或蓝球超出范围的行会被跳过
+    """
+    data = []
+    for match in ROW_PATTERN.finditer(html_content):
+        issue = match.group(1)
+        if len(issue) < 4:  # 确保期号至少有4位数字
+            continue
+
+        balls = [int(match.group(i)) for i in range(2, 9)]
+        # 开奖日期位于该行剩余列中
+        row = make_row(issue, balls, CELL_PATTERN.findall(match.group(9)))
+        if row is not None:
+            data.append(row)
+    return data
+
+
+def make_row(issue: str, balls: List[int], rest: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """
+    生成数据行字典
+
+    Args:
+        issue: 期号
+        balls: 6个红球和1个蓝球
+        rest: 该行剩余的单元格文本，从中查找开奖日期
+
+    Returns:
+        dict: 数据行，红球或蓝球超出范围时返回None
+    """
+    # 验证红球和蓝球的范围
+    if not all(1 <= ball <= 33 for ball in balls[:6]) or not 1 <= balls[6] <= 16:
+        return None
+
+    date = ""
+    for cell in rest:
+        cell = cell.strip()
+        if len(cell) == 10 and DATE_PATTERN.fullmatch(cell):
+            date = cell
+            break
+
+    return {
+        '期号': issue,
+        '红球1': balls[0],
+        '红球2': balls[1],
+        '红球3': balls[2],
+        '红球4': balls[3],
+        '红球5': balls[4],
+        '红球6': balls[5],
+        '蓝球': balls[6],
+        '开奖日期': date
+    }
+
+
+def row_from_cells(cells: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    从一行的单元格文本中提取期号、球号和开奖日期
+
+    Args:
+        cells: 去掉首尾空白的单元格文本，依次为期号、6个红球、1个蓝球和其他列
+
+    Returns:
+        dict: 数据行，表头等不是数据行的行返回None
+    """
+    if len(cells) < 8:
+        return None
+    issue = cells[0]
+    # 确保期号至少有4位数字，表头等其他行的第一列不是数字
+    if len(issue) < 4 or not issue.isdigit() or not ''.join(cells[1:8]).isdigit():
+        return None
+    return make_row(issue, list(map(int, cells[1:8])), cells[8:])
+
+
+class _HistoryRowTarget:
+    """
+    lxml 解析器的事件接收对象，只记录 <tr> 中各 <td> 的文本，不构建文档树
+
+    只实现 data 和 end 回调：不定义 start 可以避免 lxml 为每个开始标签构造属性字典，
+    不定义 comment 则数据行开头注释掉的序号列被直接跳过。单元格之间的空白文本在 strip 后为空。
+    表头（</thead>）之后有内容却无法识别为数据行的行计入 skipped，用于区分没有数据和页面结构变化。
+    """
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.skipped = 0
+        self._header_done = False
+        self._cells: List[str] = []
+        self._text: List[str] = []
+
+    def data(self, data: str) -> None:
+        self._text.append(data)
+
+    def end(self, tag: str) -> None:
+        if tag == 'td':
+            self._cells.append(''.join(self._text).strip())
+            self._text.clear()
+        elif tag == 'tr':
+            row = row_from_cells(self._cells)
+            if row is not None:
+                self.rows.append(row)
+            elif self._header_done and any(self._cells):
+                self.skipped += 1
+            self._cells = []
+            self._text.clear()
+        elif tag == 'thead':
+            self._header_done = True
+
+    def close(self) -> None:
+        pass
+
+
+class HistoryStreamParser:
+    """
+    历史数据页面的流式解析器
+
+    将页面内容逐块交给 lxml 的增量 HTML 解析器，每个数据行的 </tr> 结束时即产出该行，
+    不需要保存完整的页面文本，也不构建文档树，内存占用与页面大小无关。
+
+    同时记录页面中是否出现了历史数据表格：查询范围内没有开奖数据时，网站返回只有表头的表格，
+    此时 empty 为True，解析结果是空的而不是解析失败。
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        """
+        初始化解析器
+
+        Args:
+            encoding: 页面的字符集，为None时由 lxml 根据页面内容判断
+        """
+        from lxml import etree
+
+        self._target = _HistoryRowTarget()
+        self._parser = etree.HTMLParser(target=self._target, encoding=encoding)
+        self._closed = False
+        self._produced = 0
+        self.table_found = False
+        # 上一块末尾的内容，用于查找跨越两块的表格标记
+        self._tail = b""
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        """
+        解析一块页面内容
+
+        Args:
+            data: 页面内容的一部分
+
+        Returns:
+            list: 这一块内容中结束的数据行
+        """
+        if data:
+            if not self.table_found:
+                window = self._tail + data
+                self.table_found = TABLE_MARKER.search(window) is not None
+                self._tail = window[-32:]
+            self._parser.feed(data)
+        return self._drain()
+
+    @property
+    def empty(self) -> bool:
+        """页面包含历史数据表格，但表格中没有任何数据行，也没有无法识别的行"""
+        return self.table_found and self._produced == 0 and not self._target.rows and self._target.skipped == 0
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        结束解析
+
+        Returns:
+            list: 页面结束时才闭合的数据行
+        """
+        if not self._closed:
+            self._closed = True
+            try:
+                self._parser.close()
+            except Exception:
+                # 空页面或截断的页面，已经产出的数据行仍然有效
+                pass
+        return self._drain()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        """取出已解析的数据行"""
+        rows = self._target.rows
+        if rows:
+            self._target.rows = []
+            self._produced += len(rows)
+        return rows
+
+
+def iter_history_rows(chunks: Iterable[bytes], encoding: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    流式解析历史数据页面
+
+    Args:
+        chunks: 页面内容的分块
+        encoding: 页面的字符集
+
+    Yields:
+        dict: 数据行，按页面中的顺序
+    """
+    parser = HistoryStreamParser(encoding)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def rows_to_frame(data: List[Dict[str, Any]], limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    将数据行转换为按期号降序排列的DataFrame
+
+    Args:
+        data: 数据行字典列表
+        limit: 最多保留的期数，为None时保留全部
+
+    Returns:
+        DataFrame: 按期号降序排列的数据，没有数据行则返回None
+    """
+    if not data:
+        return None
+
+    df = pd.DataFrame(data)
+    # 按期号降序排序
+    df = df.sort_values('期号', ascending=False).reset_index(drop=True)
+    # 只保留前limit条记录
+    if limit is not None and len(df) > limit:
+        df = df.iloc[:limit]
+    return df
+
+
+def parse_history_html(html_content: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    解析历史数据页面为DataFrame
+
+    Args:
+        html_content: HTML内容
+        limit: 最多保留的期数，为None时保留全部
+
+    Returns:
+        DataFrame: 按期号降序排列的数据，没有匹配到数据行则返回None
+    """
+    return rows_to_frame(parse_history_rows(html_content), limit)
+
+
+def parse_history_lxml(html_content: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    使用 lxml 解析历史数据页面
+
+    用 XPath 定位 table#tablelist（找不到时使用行数最多的表格），逐行读取单元格文本。
+    解析在 libxml2 中完成，比 BeautifulSoup 快一个数量级，且不依赖数据行开头的注释列。
+
+    Args:
+        html_content: HTML内容
+        limit: 最多保留的期数，为None时保留全部
+
+    Returns:
+        DataFrame: 按期号降序排列的数据，没有找到数据行则返回None
+    """
+    from lxml import etree
+
+    root = etree.HTML(html_content)
+    if root is None:
+        return None
+
+    tables = root.xpath('//table[@id="tablelist"]')
+    if not tables:
+        tables = sorted(root.xpath('//table'), key=lambda t: len(t.xpath('.//tr')), reverse=True)
+        if not tables:
+            return None
+
+    data = []
+    for tr in tables[0].iter('tr'):
+        # 单元格通常只有文本，只有包含子元素时才拼接全部文本
+        cells = [(td.text or '').strip() if len(td) == 0 else ''.join(td.itertext()).strip()
+                 for td in tr.iterchildren('td')]
+        row = row_from_cells(cells)
+        if row is not None:
+            data.append(row)
+    return rows_to_frame(data, limit)
+
+
+def parse_history_bs4(html_content: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    使用 BeautifulSoup 的 html.parser 解析历史数据页面
+
+    最宽松也最慢的解析方式，还支持球号放在 span.ball_1 / span.ball_2 中的旧版页面。
+
+    Args:
+        html_content: HTML内容
+        limit: 最多保留的期数，为None时保留全部
+
+    Returns:
+        DataFrame: 按期号降序排列的数据，没有找到数据行则返回None
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    # 尝试找到表格 - 网站可能使用不同的类名或ID
+    table = soup.find('table', id='tablelist')
+    if table is None:
+        tables = soup.find_all('table')
+        if not tables:
+            return None
+        # 选择最可能包含数据的表格（通常是最大的表格）
+        table = max(tables, key=lambda t: len(t.find_all('tr')))
+
+    data = []
+    for tr in table.find_all('tr'):
+        cells = [td.get_text().strip() for td in tr.find_all(['td', 'th'], recursive=False)]
+        row = row_from_cells(cells)
+        if row is None and cells:
+            # 旧版页面的球号放在 span 中
+            red_balls = [span.get_text().strip() for span in tr.find_all('span', class_='ball_1')]
+            blue_ball = tr.find('span', class_='ball_2')
+            if len(red_balls) == 6 and blue_ball is not None:
+                row = row_from_cells([cells[0]] + red_balls + [blue_ball.get_text().strip()] + cells[1:])
+        if row is not None:
+            data.append(row)
+    return rows_to_frame(data, limit)
+
+
+# 解析策略：名称 -> 解析函数(HTML内容, 最多保留的期数)
+PARSERS: Dict[str, Callable[[str, Optional[int]], Optional[pd.DataFrame]]] = {
+    'regex': parse_history_html,
+    'lxml': parse_history_lxml,
+    'bs4': parse_history_bs4,
+}
+DEFAULT_PARSERS = ('regex', 'lxml', 'bs4')
+
+
+def register_parser(name: str, parser: Callable[[str, Optional[int]], Optional[pd.DataFrame]]) -> None:
+    """
+    注册解析策略
+
+    使用进程池执行解析时，子进程只能看到导入模块时注册的策略。
+
+    Args:
+        name: 策略名称
+        parser: 解析函数，参数为HTML内容和最多保留的期数，返回按期号降序排列的DataFrame或None
+    """
+    PARSERS[name] = parser
+
+
+def parse_with(html_content: str, names: Sequence[str],
+               limit: Optional[int] = None) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+    """
+    按顺序尝试解析策略，返回第一个得到数据的结果
+
+    Args:
+        html_content: HTML内容
+        names: 策略名称，按尝试顺序排列
+        limit: 最多保留的期数
+
+    Returns:
+        tuple: (成功的策略名称, 解析后的数据)，全部失败时为 (None, None)
+    """
+    for name in names:
+        try:
+            df = PARSERS[name](html_content, limit)
+        except Exception as e:
+            print(f"{name} 解析出错: {e}")
+            continue
+        if df is not None and not df.empty:
+            return name, df
+        print(f"{name} 解析未找到数据")
+    return None, None
+
+
+class ParserChain:
+    """
+    解析策略链
+
+    按配置的顺序尝试各解析策略，并记住最近一次成功的策略，之后优先尝试该策略。
+    页面结构变化导致正则解析失效后，后续请求不必每次都先失败一次。
+    """
+
+    def __init__(self, names: Sequence[str] = DEFAULT_PARSERS):
+        """
+        初始化策略链
+
+        Args:
+            names: 策略名称，按默认的尝试顺序排列
+
+        Raises:
+            ValueError: 策略名称未注册
+        """
+        unknown = [name for name in names if name not in PARSERS]
+        if unknown:
+            raise ValueError(f"未知的解析策略: {', '.join(unknown)}，可选值为 {', '.join(PARSERS)}")
+        self.names = list(names)
+        self.preferred: Optional[str] = None
+        self.stats: Dict[str, Dict[str, int]] = {name: {"success": 0, "failure": 0} for name in self.names}
+
+    def order(self) -> List[str]:
+        """
+        本次解析的尝试顺序
+
+        Returns:
+            list: 最近一次成功的策略在最前，其余按配置的顺序排列
+        """
+        if self.preferred is None:
+            return list(self.names)
+        return [self.preferred] + [name for name in self.names if name != self.preferred]
+
+    def record(self, order: Sequence[str], succeeded: Optional[str]) -> None:
+        """
+        记录一次解析的结果
+
+        Args:
+            order: 本次的尝试顺序
+            succeeded: 成功的策略名称，全部失败时为None
+        """
+        tried = order if succeeded is None else order[:list(order).index(succeeded)]
+        for name in tried:
+            self.stats[name]["failure"] += 1
+        if succeeded is not None:
+            self.stats[succeeded]["success"] += 1
+            self.preferred = succeeded
+
+    def parse(self, html_content: str, limit: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        在当前线程中按策略链解析页面
+
+        Args:
+            html_content: HTML内容
+            limit: 最多保留的期数
+
+        Returns:
+            DataFrame: 解析后的数据，全部策略失败时返回None
+        """
+        order = self.order()
+        name, df = parse_with(html_content, order, limit)
+        self.record(order, name)
+        return df
+
+    def status(self) -> Dict[str, Any]:
+        """
+        获取策略链状态
+
+        Returns:
+            dict: 尝试顺序、最近一次成功的策略以及各策略的成功和失败次数
+        """
+        return {"order": self.order(), "preferred": self.preferred, "stats": self.stats}
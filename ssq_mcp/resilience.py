@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+上游请求的重试与熔断模块
+
+偶发的超时、连接重置或5xx响应通过带随机抖动的指数退避重试解决；
+上游持续不可用时由熔断器直接拒绝请求，避免每次调用都等待超时。
+"""
+
+import random
+import time
+from typing import Optional, Dict, Any
+
+
+class RetryPolicy:
+    """带随机抖动的指数退避重试策略"""
+
+    def __init__(self, attempts: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        """
+        初始化重试策略
+
+        Args:
+            attempts: 每次请求最多尝试的次数（包括第一次）
+            backoff_base: 第一次重试前等待时间的上限（秒），之后每次翻倍
+            backoff_max: 等待时间的最大值（秒）
+        """
+        self.attempts = max(1, attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt: int) -> float:
+        """
+        计算第attempt次尝试失败后的等待时间
+
+        使用"完全抖动"：在 [0, min(backoff_max, backoff_base * 2^attempt)] 中均匀取值，
+        避免多个客户端在同一时刻重试。
+
+        Args:
+            attempt: 已失败的尝试序号，从0开始
+
+        Returns:
+            float: 等待时间（秒）
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    连续失败达到阈值后进入打开状态，在 reset_timeout 秒内直接拒绝请求；
+    之后进入半开状态，只放行一个探测请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 进入打开状态的连续失败次数，为0时不启用熔断
+            reset_timeout: 打开状态持续的时间（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """当前状态"""
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def allow(self) -> bool:
+        """
+        判断是否允许发起请求
+
+        Returns:
+            bool: 关闭状态或半开状态的第一个探测请求返回True
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """记录一次成功的请求，关闭熔断器"""
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """记录一次失败的请求，连续失败达到阈值或探测失败时打开熔断器"""
+        self.failures += 1
+        self._probing = False
+        if self.failure_threshold > 0 and (self.opened_at is not None or self.failures >= self.failure_threshold):
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """请求被取消、没有结果时释放半开状态的探测名额"""
+        self._probing = False
+
+    def status(self) -> Dict[str, Any]:
+        """
+        获取熔断器状态
+
+        Returns:
+            dict: 状态、连续失败次数和被拒绝的请求数
+        """
+        state = self.state
+        retry_in = None
+        if state == self.OPEN:
+            retry_in = round(self.reset_timeout - (time.monotonic() - self.opened_at), 1)
+        return {
+            "state": state,
+            "consecutive_failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in": retry_in
+        }
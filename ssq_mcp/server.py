@@ -7,14 +7,38 @@
 import asyncio
 import json
 import os
-from typing import Optional, Dict, List, Any, Union
-import pandas as pd
-from pydantic import BaseModel, Field
-import aiohttp
-from aiohttp import web
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, List, Any, Literal, Tuple, TYPE_CHECKING
+from pydantic import BaseModel, Field, TypeAdapter
 
 from fastmcp import FastMCP, Context
-from .crawler import AsyncSSQCrawler
+from .pagination import paginate, query_digest
+
+# pandas、NumPy、aiohttp 等依赖较重，只在第一次使用爬虫时导入，以缩短服务启动时间
+if TYPE_CHECKING:
+    import pandas as pd
+    from .crawler import AsyncSSQCrawler
+
+
+# 工具的输出方式：结构化数据和Markdown都返回、只返回结构化数据、只返回Markdown
+OutputMode = Literal["both", "structured", "markdown"]
+
+
+def output_parts(output: str) -> Tuple[bool, bool]:
+    """
+    解析输出方式
+
+    Args:
+        output: 输出方式
+
+    Returns:
+        tuple: (是否返回结构化数据, 是否生成Markdown)
+    """
+    return output != "markdown", output != "structured"
+
+
+# 数据工具的返回结构：按期返回对象列表，或按列返回并行数组
+DataLayout = Literal["rows", "columns"]
 
 
 # 定义数据模型
@@ -26,11 +50,25 @@ class SSQData(BaseModel):
     draw_date: Optional[str] = Field(None, description="开奖日期")
 
 
+class SSQColumns(BaseModel):
+    """按列排列的双色球数据模型，各数组按相同的顺序对应"""
+    issues: List[str] = Field(..., description="期号数组")
+    red_balls: List[int] = Field(..., description="红球号码数组，每期6个依次排列，第i期为第6i到6i+5个")
+    blue_balls: List[int] = Field(..., description="蓝球号码数组")
+    draw_dates: Optional[List[str]] = Field(None, description="开奖日期数组")
+
+
 class SSQDataList(BaseModel):
     """双色球数据列表模型"""
-    data: List[SSQData] = Field(..., description="双色球数据列表")
-    total: int = Field(..., description="数据总数")
+    data: List[SSQData] = Field(..., description="双色球数据列表（分页时为当前页的数据，按列返回时为空）")
+    total: int = Field(..., description="数据总数（分页时为全部页的数据总数）")
     markdown: str = Field(..., description="Markdown格式的数据表格")
+    next_cursor: Optional[str] = Field(None, description="下一页的分页游标，没有更多数据时为None")
+    columns: Optional[SSQColumns] = Field(None, description="按列返回的双色球数据（layout 为 columns 时）")
+
+
+# 批量校验SSQData列表
+_SSQ_DATA_LIST = TypeAdapter(List[SSQData])
 
 
 class FrequencyAnalysis(BaseModel):
@@ -48,8 +86,73 @@ class MissingAnalysis(BaseModel):
     markdown: str = Field(..., description="Markdown格式的分析结果")
 
 
-# 创建 MCP 服务
-mcp = FastMCP(name="双色球数据服务")
+class NumberGapStats(BaseModel):
+    """单个号码的遗漏分布模型"""
+    number: int = Field(..., description="号码")
+    occurrences: int = Field(..., description="出现次数")
+    current_gap: int = Field(..., description="当前遗漏期数")
+    max_gap: int = Field(..., description="历史最大遗漏期数")
+    mean_gap: float = Field(..., description="平均遗漏期数")
+    percentiles: Dict[int, float] = Field(..., description="遗漏期数的百分位数，键为百分位")
+    current_ratio: float = Field(..., description="当前遗漏与历史最大遗漏之比，超过1表示创出新高")
+
+
+class GapDistributionAnalysis(BaseModel):
+    """遗漏分布分析结果模型"""
+    red_gaps: List[NumberGapStats] = Field(..., description="红球遗漏分布，按号码升序")
+    blue_gaps: List[NumberGapStats] = Field(..., description="蓝球遗漏分布，按号码升序")
+    total: int = Field(..., description="分析的期数")
+    latest_issue: Optional[str] = Field(None, description="最新一期期号")
+    markdown: str = Field(..., description="Markdown格式的分析结果")
+
+
+class NumberGroupCount(BaseModel):
+    """号码组合共现次数模型"""
+    numbers: List[int] = Field(..., description="红球号码组合，按号码升序排列")
+    count: int = Field(..., description="共同出现的次数")
+
+
+class CooccurrenceAnalysis(BaseModel):
+    """红球共现分析结果模型"""
+    pairs: List[NumberGroupCount] = Field(..., description="共同出现次数最多的红球号码对")
+    triples: List[NumberGroupCount] = Field(..., description="共同出现次数最多的红球三元组")
+    total: int = Field(..., description="分析的期数")
+    latest_issue: Optional[str] = Field(None, description="最新一期期号")
+    markdown: str = Field(..., description="Markdown格式的分析结果")
+
+
+class DrawMatch(BaseModel):
+    """单期开奖与投注号码的比较结果模型"""
+    issue: str = Field(..., description="期号")
+    common_numbers: List[int] = Field(..., description="与投注号码相同的红球")
+    blue_hit: bool = Field(..., description="蓝球是否相同")
+
+
+class NumberMatchAnalysis(BaseModel):
+    """投注号码与历史开奖比较结果模型"""
+    red_numbers: List[int] = Field(..., description="比较的红球号码，按号码升序排列")
+    blue_number: Optional[int] = Field(None, description="比较的蓝球号码")
+    matched_count: int = Field(..., description="包含全部比较号码的开奖期数")
+    matched_issues: List[str] = Field(..., description="包含全部比较号码的最近几期期号")
+    hit_distribution: Dict[int, int] = Field(..., description="红球重合个数 -> 期数")
+    blue_hits: int = Field(..., description="蓝球相同的期数")
+    best_matches: List[DrawMatch] = Field(..., description="红球重合最多的开奖")
+    latest_repeat: List[int] = Field(..., description="最新一期与上一期相同的红球")
+    repeat_distribution: Dict[int, int] = Field(..., description="相邻两期红球重号个数 -> 期数")
+    total: int = Field(..., description="比较的期数")
+    latest_issue: Optional[str] = Field(None, description="最新一期期号")
+    markdown: str = Field(..., description="Markdown格式的比较结果")
+
+
+class BackfillResult(BaseModel):
+    """历史数据回填结果模型"""
+    completed: List[int] = Field(..., description="本次获取并保存到本地的年份")
+    staged: List[int] = Field(..., description="已获取但因更新的年份未完成而暂存、尚未保存的年份，重新执行时不会再次获取")
+    failed: List[int] = Field(..., description="获取失败的年份，重新执行时会继续获取")
+    skipped: List[int] = Field(..., description="本地已有数据而跳过的年份")
+    added: int = Field(..., description="新增的期数")
+    total: int = Field(..., description="历史数据总期数")
+    markdown: str = Field(..., description="Markdown格式的回填结果")
 
 
 # 加载配置
@@ -62,184 +165,391 @@ def load_config() -> Dict[str, Any]:
     return {"proxy": None}
 
 
-# 创建爬虫实例
-config = load_config()
-crawler = AsyncSSQCrawler(proxy=config.get("proxy"))
+def resolve_db_path(config: Dict[str, Any]) -> Optional[str]:
+    """获取本地数据库路径，未启用本地存储时返回None"""
+    store_config = config.get("store", {})
+    if not store_config.get("enabled", True):
+        return None
+    return store_config.get("db_path") or os.path.join(os.path.dirname(__file__), "ssq_draws.db")
+
+
+# 爬虫实例，第一次调用工具时创建
+_crawler: Optional["AsyncSSQCrawler"] = None
+
+
+def get_crawler() -> "AsyncSSQCrawler":
+    """获取爬虫实例，第一次调用时读取配置并创建"""
+    global _crawler
+    if _crawler is None:
+        from .crawler import AsyncSSQCrawler
+
+        config = load_config()
+        retry_config = config.get("retry", {})
+        _crawler = AsyncSSQCrawler(
+            proxy=config.get("proxy"),
+            db_path=resolve_db_path(config),
+            sync_interval=config.get("store", {}).get("sync_interval", 600),
+            cache_enabled=config.get("cache", {}).get("enabled", True),
+            cache_retry_interval=config.get("cache", {}).get("retry_interval", 300),
+            conditional_requests=config.get("cache", {}).get("conditional", True),
+            cpu_executor=config.get("executor", {}).get("kind", "thread"),
+            cpu_workers=config.get("executor", {}).get("max_workers", 2),
+            parsers=config.get("parser", {}).get("strategies", ["regex", "lxml", "bs4"]),
+            chunk_concurrency=config.get("backfill", {}).get("concurrency", 4),
+            retry_attempts=retry_config.get("attempts", 3),
+            backoff_base=retry_config.get("backoff_base", 0.5),
+            backoff_max=retry_config.get("backoff_max", 8.0),
+            failure_threshold=retry_config.get("failure_threshold", 5),
+            reset_timeout=retry_config.get("reset_timeout", 60.0),
+            **config.get("connector", {})
+        )
+    return _crawler
+
 
+@asynccontextmanager
+async def lifespan(server):
+    """MCP 服务生命周期，关闭时释放爬虫的连接池"""
+    try:
+        yield
+    finally:
+        if _crawler is not None:
+            await _crawler.close()
 
-@mcp.tool()
-async def get_recent_data(limit: int = 10, ctx: Context = None) -> SSQDataList:
+
+# 创建 MCP 服务
+mcp = FastMCP(name="双色球数据服务", lifespan=lifespan)
+
+
+def progress_reporter(ctx: Optional[Context]):
+    """创建通过MCP进度通知报告进度的回调，没有上下文时返回None"""
+    if ctx is None:
+        return None
+
+    async def progress(done: int, total: int, message: str) -> None:
+        await ctx.report_progress(done, total, message)
+
+    return progress
+
+
+def build_ssq_data(df: "pd.DataFrame") -> List[SSQData]:
     """
-    获取最近N期的双色球数据
+    按列批量将查询结果转换为SSQData列表
+
+    直接读取DataFrame的列数组，不再经过逐行的 iterrows 或数据表与字符串之间的往返转换，
+    所有行由 pydantic-core 一次批量校验构造。
 
     Args:
-        limit: 获取的期数，默认为10
-        ctx: MCP上下文
+        df: 查询结果
 
     Returns:
-        SSQDataList: 双色球数据列表
+        list: SSQData列表，顺序与DataFrame一致
     """
-    if ctx:
-        await ctx.info(f"正在获取最近{limit}期双色球数据...")
+    issues = df['期号'].tolist()
+    reds = df[['红球1', '红球2', '红球3', '红球4', '红球5', '红球6']].to_numpy().tolist()
+    blues = df['蓝球'].tolist()
+    dates = df['开奖日期'].tolist() if '开奖日期' in df.columns else [None] * len(df)
 
-    df = await crawler.fetch_data(limit=limit)
+    return _SSQ_DATA_LIST.validate_python([
+        {'issue': issue, 'red_balls': red_balls, 'blue_ball': blue_ball, 'draw_date': draw_date}
+        for issue, red_balls, blue_ball, draw_date in zip(issues, reds, blues, dates)
+    ])
+
+
+def build_ssq_columns(df: "pd.DataFrame") -> SSQColumns:
+    """
+    将查询结果转换为按列排列的数据，不重复每期的字段名
+
+    Args:
+        df: 查询结果
 
+    Returns:
+        SSQColumns: 按列排列的数据，顺序与DataFrame一致
+    """
+    return SSQColumns(
+        issues=df['期号'].tolist(),
+        red_balls=df[['红球1', '红球2', '红球3', '红球4', '红球5', '红球6']].to_numpy().ravel().tolist(),
+        blue_balls=df['蓝球'].tolist(),
+        draw_dates=df['开奖日期'].tolist() if '开奖日期' in df.columns else None
+    )
+
+
+def build_data_list(df: Optional["pd.DataFrame"], digest: str, page_size: int = 0,
+                    cursor: Optional[str] = None, output: str = "both",
+                    layout: str = "rows") -> SSQDataList:
+    """
+    将查询结果转换为数据列表，分页时只转换当前页
+
+    Args:
+        df: 按期号降序排列的查询结果
+        digest: 查询参数摘要
+        page_size: 每页的期数，为0时不分页
+        cursor: 上一页返回的分页游标
+        output: 输出方式，只生成需要的结构化数据或Markdown
+        layout: 结构化数据的返回结构，"rows" 返回对象列表，"columns" 返回并行数组
+
+    Returns:
+        SSQDataList: 双色球数据列表
+    """
     if df is None or df.empty:
         return SSQDataList(data=[], total=0, markdown="没有找到数据")
 
-    # 转换为SSQData列表
-    data_list = []
-    for _, row in df.iterrows():
-        data = SSQData(
-            issue=row['期号'],
-            red_balls=[
-                int(row['红球1']), int(row['红球2']), int(row['红球3']),
-                int(row['红球4']), int(row['红球5']), int(row['红球6'])
-            ],
-            blue_ball=int(row['蓝球']),
-            draw_date=row['开奖日期'] if '开奖日期' in row else None
-        )
-        data_list.append(data)
+    try:
+        page, next_cursor = paginate(df, digest, page_size, cursor)
+    except ValueError as e:
+        print(f"分页失败: {e}")
+        return SSQDataList(data=[], total=len(df), markdown=str(e))
+
+    structured, with_markdown = output_parts(output)
+
+    # 转换为SSQData列表或按列排列的数据
+    data_list = build_ssq_data(page) if structured and layout == "rows" else []
+    columns = build_ssq_columns(page) if structured and layout == "columns" else None
 
     # 生成Markdown表格
-    markdown = crawler.format_to_markdown(df)
+    markdown = get_crawler().format_to_markdown(page) if with_markdown else ""
 
-    return SSQDataList(
+    # 列表中的SSQData已经校验过，无需再次校验
+    return SSQDataList.model_construct(
         data=data_list,
-        total=len(data_list),
-        markdown=markdown
+        total=len(df),
+        markdown=markdown,
+        next_cursor=next_cursor,
+        columns=columns
     )
 
 
 @mcp.tool()
-async def get_data_by_issue_range(start_issue: str, end_issue: str, ctx: Context = None) -> SSQDataList:
+async def get_recent_data(limit: int = 10, page_size: int = 0, cursor: Optional[str] = None,
+                          output: OutputMode = "both", layout: DataLayout = "rows",
+                          ctx: Context = None) -> SSQDataList:
+    """
+    获取最近N期的双色球数据
+
+    Args:
+        limit: 获取的期数，默认为10
+        page_size: 每页的期数，默认为0即不分页；分页时通过返回的 next_cursor 获取下一页
+        cursor: 上一页返回的分页游标
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        layout: 返回结构，默认为 "rows"；"columns" 在 columns 字段中按列返回并行数组
+        ctx: MCP上下文
+
+    Returns:
+        SSQDataList: 双色球数据列表
+    """
+    crawler = get_crawler()
+
+    if ctx:
+        await ctx.info(f"正在获取最近{limit}期双色球数据...")
+
+    df = await crawler.fetch_data(limit=limit)
+
+    digest = query_digest("get_recent_data", limit)
+    return build_data_list(df, digest, page_size, cursor, output=output, layout=layout)
+
+
+@mcp.tool()
+async def get_data_by_issue_range(start_issue: str, end_issue: str, page_size: int = 0,
+                                  cursor: Optional[str] = None, output: OutputMode = "both",
+                                  layout: DataLayout = "rows", ctx: Context = None) -> SSQDataList:
     """
     获取指定期号范围的双色球数据
 
     Args:
         start_issue: 起始期号
         end_issue: 结束期号
+        page_size: 每页的期数，默认为0即不分页；分页时通过返回的 next_cursor 获取下一页
+        cursor: 上一页返回的分页游标
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        layout: 返回结构，默认为 "rows"；"columns" 在 columns 字段中按列返回并行数组
         ctx: MCP上下文
 
     Returns:
         SSQDataList: 双色球数据列表
     """
+    crawler = get_crawler()
+
     if ctx:
         await ctx.info(f"正在获取第{start_issue}期至第{end_issue}期双色球数据...")
 
-    df = await crawler.fetch_by_issue_range(start_issue, end_issue)
+    df = await crawler.fetch_by_issue_range(start_issue, end_issue, progress=progress_reporter(ctx))
 
-    if df is None or df.empty:
-        return SSQDataList(data=[], total=0, markdown="没有找到数据")
-
-    # 转换为SSQData列表
-    data_list = []
-    for _, row in df.iterrows():
-        data = SSQData(
-            issue=row['期号'],
-            red_balls=[
-                int(row['红球1']), int(row['红球2']), int(row['红球3']),
-                int(row['红球4']), int(row['红球5']), int(row['红球6'])
-            ],
-            blue_ball=int(row['蓝球']),
-            draw_date=row['开奖日期'] if '开奖日期' in row else None
-        )
-        data_list.append(data)
-
-    # 生成Markdown表格
-    markdown = crawler.format_to_markdown(df)
-
-    return SSQDataList(
-        data=data_list,
-        total=len(data_list),
-        markdown=markdown
-    )
+    digest = query_digest("get_data_by_issue_range", start_issue, end_issue)
+    return build_data_list(df, digest, page_size, cursor, output=output, layout=layout)
 
 
 @mcp.tool()
-async def get_data_by_issue(issue: str, ctx: Context = None) -> SSQDataList:
+async def get_data_by_issue(issue: str, output: OutputMode = "both", layout: DataLayout = "rows",
+                            ctx: Context = None) -> SSQDataList:
     """
     获取指定期号的双色球数据
 
     Args:
         issue: 期号
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        layout: 返回结构，默认为 "rows"；"columns" 在 columns 字段中按列返回并行数组
         ctx: MCP上下文
 
     Returns:
         SSQDataList: 双色球数据列表
     """
+    crawler = get_crawler()
+
     if ctx:
         await ctx.info(f"正在获取第{issue}期双色球数据...")
 
     df = await crawler.fetch_by_issue(issue)
 
-    if df is None or df.empty:
-        return SSQDataList(data=[], total=0, markdown="没有找到数据")
+    return build_data_list(df, query_digest("get_data_by_issue", issue), output=output, layout=layout)
 
-    # 转换为SSQData列表
-    data_list = []
-    for _, row in df.iterrows():
-        data = SSQData(
-            issue=row['期号'],
-            red_balls=[
-                int(row['红球1']), int(row['红球2']), int(row['红球3']),
-                int(row['红球4']), int(row['红球5']), int(row['红球6'])
-            ],
-            blue_ball=int(row['蓝球']),
-            draw_date=row['开奖日期'] if '开奖日期' in row else None
-        )
-        data_list.append(data)
+
+@mcp.tool()
+async def get_data_by_issues(issues: List[str], page_size: int = 0, cursor: Optional[str] = None,
+                             output: OutputMode = "both", layout: DataLayout = "rows",
+                             ctx: Context = None) -> SSQDataList:
+    """
+    一次获取多个期号或期号范围的双色球数据
+
+    Args:
+        issues: 期号或期号范围列表，范围用"-"连接，例如 ["24100", "24105-24110"]
+        page_size: 每页的期数，默认为0即不分页；分页时通过返回的 next_cursor 获取下一页
+        cursor: 上一页返回的分页游标
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        layout: 返回结构，默认为 "rows"；"columns" 在 columns 字段中按列返回并行数组
+        ctx: MCP上下文
+
+    Returns:
+        SSQDataList: 合并后按期号降序排列的双色球数据列表
+    """
+    crawler = get_crawler()
+
+    if ctx:
+        await ctx.info(f"正在获取{len(issues)}个期号或期号范围的双色球数据...")
+
+    df = await crawler.fetch_by_issues(issues, progress=progress_reporter(ctx))
+
+    digest = query_digest("get_data_by_issues", issues)
+    return build_data_list(df, digest, page_size, cursor, output=output, layout=layout)
+
+
+@mcp.tool()
+async def analyze_frequency(limit: int = 100, output: OutputMode = "both", ctx: Context = None) -> FrequencyAnalysis:
+    """
+    分析双色球号码出现频率
+
+    Args:
+        limit: 分析的期数，默认为100；为0时分析本地保存的全部历史数据
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        ctx: MCP上下文
+
+    Returns:
+        FrequencyAnalysis: 频率分析结果
+    """
+    crawler = get_crawler()
+
+    if limit <= 0:
+        if ctx:
+            await ctx.info("正在分析全部历史双色球号码出现频率...")
+
+        # 全部历史数据的统计由增量分析引擎维护，无需重新扫描
+        engine = await crawler.history_engine()
+        freq_data = engine.frequency() if engine is not None else None
+
+        if freq_data is None:
+            return FrequencyAnalysis(
+                red_freq={},
+                blue_freq={},
+                markdown="没有找到数据（分析全部历史数据需要启用本地存储）"
+            )
+    else:
+        if ctx:
+            await ctx.info(f"正在分析最近{limit}期双色球号码出现频率...")
+
+        table = await crawler.fetch_table(limit=limit)
+
+        if len(table) == 0:
+            return FrequencyAnalysis(
+                red_freq={},
+                blue_freq={},
+                markdown="没有找到数据"
+            )
+
+        # 分析频率
+        freq_data = await crawler.analyze_frequency(table)
+
+        if freq_data is None:
+            return FrequencyAnalysis(
+                red_freq={},
+                blue_freq={},
+                markdown="分析失败"
+            )
+
+    structured, with_markdown = output_parts(output)
+
+    # 转换为字典
+    red_freq_dict = {int(k): int(v) for k, v in freq_data['red_freq'].items()} if structured else {}
+    blue_freq_dict = {int(k): int(v) for k, v in freq_data['blue_freq'].items()} if structured else {}
 
     # 生成Markdown表格
-    markdown = crawler.format_to_markdown(df)
+    markdown = crawler.format_frequency_to_markdown(freq_data) if with_markdown else ""
 
-    return SSQDataList(
-        data=data_list,
-        total=len(data_list),
+    return FrequencyAnalysis(
+        red_freq=red_freq_dict,
+        blue_freq=blue_freq_dict,
         markdown=markdown
     )
 
 
 @mcp.tool()
-async def analyze_frequency(limit: int = 100, ctx: Context = None) -> FrequencyAnalysis:
+async def analyze_frequency_range(start_issue: Optional[str] = None, end_issue: Optional[str] = None,
+                                  start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                  output: OutputMode = "both", ctx: Context = None) -> FrequencyAnalysis:
     """
-    分析双色球号码出现频率
+    分析任意期号范围或日期范围内的双色球号码出现频率
 
     Args:
-        limit: 分析的期数，默认为100
+        start_issue: 起始期号，例如 "15001" 或 "2015001"
+        end_issue: 结束期号，例如 "18150" 或 "2018150"
+        start_date: 起始日期，格式为 YYYY-MM-DD
+        end_date: 结束日期，格式为 YYYY-MM-DD
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
         ctx: MCP上下文
 
     Returns:
         FrequencyAnalysis: 频率分析结果
     """
-    if ctx:
-        await ctx.info(f"正在分析最近{limit}期双色球号码出现频率...")
+    crawler = get_crawler()
 
-    df = await crawler.fetch_data(limit=limit)
+    if ctx:
+        await ctx.info(f"正在分析期号{start_issue or '最早'}至{end_issue or '最新'}、"
+                       f"日期{start_date or '最早'}至{end_date or '最新'}的双色球号码出现频率...")
 
-    if df is None or df.empty:
+    try:
+        freq_data = await crawler.analyze_frequency_range(start_issue, end_issue, start_date, end_date)
+    except ValueError as e:
         return FrequencyAnalysis(
             red_freq={},
             blue_freq={},
-            markdown="没有找到数据"
+            markdown=f"参数格式错误: {e}"
         )
 
-    # 分析频率
-    freq_data = await crawler.analyze_frequency(df)
-
     if freq_data is None:
         return FrequencyAnalysis(
             red_freq={},
             blue_freq={},
-            markdown="分析失败"
+            markdown="没有找到数据"
         )
 
+    structured, with_markdown = output_parts(output)
+
     # 转换为字典
-    red_freq_dict = {int(k): int(v) for k, v in freq_data['red_freq'].items()}
-    blue_freq_dict = {int(k): int(v) for k, v in freq_data['blue_freq'].items()}
+    red_freq_dict = {int(k): int(v) for k, v in freq_data['red_freq'].items()} if structured else {}
+    blue_freq_dict = {int(k): int(v) for k, v in freq_data['blue_freq'].items()} if structured else {}
 
     # 生成Markdown表格
-    markdown = crawler.format_frequency_to_markdown(freq_data)
+    markdown = ""
+    if with_markdown:
+        markdown = (f"### 第{freq_data['start_issue']}期至第{freq_data['end_issue']}期（共{freq_data['count']}期）\n\n"
+                    + crawler.format_frequency_to_markdown(freq_data))
 
     return FrequencyAnalysis(
         red_freq=red_freq_dict,
@@ -249,47 +559,68 @@ async def analyze_frequency(limit: int = 100, ctx: Context = None) -> FrequencyA
 
 
 @mcp.tool()
-async def analyze_missing_periods(limit: int = 100, ctx: Context = None) -> MissingAnalysis:
+async def analyze_missing_periods(limit: int = 100, output: OutputMode = "both", ctx: Context = None) -> MissingAnalysis:
     """
     分析双色球号码遗漏期数
 
     Args:
-        limit: 分析的期数，默认为100
+        limit: 分析的期数，默认为100；为0时分析本地保存的全部历史数据
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
         ctx: MCP上下文
 
     Returns:
         MissingAnalysis: 遗漏期数分析结果
     """
-    if ctx:
-        await ctx.info(f"正在分析最近{limit}期双色球号码遗漏期数...")
-
-    df = await crawler.fetch_data(limit=limit)
-
-    if df is None or df.empty:
-        return MissingAnalysis(
-            red_missing={},
-            blue_missing={},
-            latest_issue=None,
-            markdown="没有找到数据"
-        )
-
-    # 分析遗漏期数
-    missing_data = await crawler.analyze_missing_periods(df)
-
-    if missing_data is None:
-        return MissingAnalysis(
-            red_missing={},
-            blue_missing={},
-            latest_issue=None,
-            markdown="分析失败"
-        )
+    crawler = get_crawler()
+
+    if limit <= 0:
+        if ctx:
+            await ctx.info("正在分析全部历史双色球号码遗漏期数...")
+
+        # 全部历史数据的统计由增量分析引擎维护，无需重新扫描
+        engine = await crawler.history_engine()
+        missing_data = engine.missing() if engine is not None else None
+
+        if missing_data is None:
+            return MissingAnalysis(
+                red_missing={},
+                blue_missing={},
+                latest_issue=None,
+                markdown="没有找到数据（分析全部历史数据需要启用本地存储）"
+            )
+    else:
+        if ctx:
+            await ctx.info(f"正在分析最近{limit}期双色球号码遗漏期数...")
+
+        table = await crawler.fetch_table(limit=limit)
+
+        if len(table) == 0:
+            return MissingAnalysis(
+                red_missing={},
+                blue_missing={},
+                latest_issue=None,
+                markdown="没有找到数据"
+            )
+
+        # 分析遗漏期数
+        missing_data = await crawler.analyze_missing_periods(table)
+
+        if missing_data is None:
+            return MissingAnalysis(
+                red_missing={},
+                blue_missing={},
+                latest_issue=None,
+                markdown="分析失败"
+            )
+
+    structured, with_markdown = output_parts(output)
 
     # 转换为字典
-    red_missing_dict = {int(k): int(v) for k, v in missing_data['red_missing'].items()}
-    blue_missing_dict = {int(k): int(v) for k, v in missing_data['blue_missing'].items()}
+    red_missing_dict = {int(k): int(v) for k, v in missing_data['red_missing'].items()} if structured else {}
+    blue_missing_dict = {int(k): int(v) for k, v in missing_data['blue_missing'].items()} if structured else {}
 
     # 生成Markdown表格
-    markdown = crawler.format_missing_to_markdown(missing_data)
+    markdown = crawler.format_missing_to_markdown(missing_data) if with_markdown else ""
 
     return MissingAnalysis(
         red_missing=red_missing_dict,
@@ -299,6 +630,272 @@ async def analyze_missing_periods(limit: int = 100, ctx: Context = None) -> Miss
     )
 
 
+@mcp.tool()
+async def analyze_gap_distribution(limit: int = 0, output: OutputMode = "both",
+                                   ctx: Context = None) -> GapDistributionAnalysis:
+    """
+    分析双色球每个号码的历史遗漏分布（最大、平均、百分位遗漏及当前遗漏与最大遗漏之比）
+
+    Args:
+        limit: 分析的期数，默认为0，即分析本地保存的全部历史数据
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        ctx: MCP上下文
+
+    Returns:
+        GapDistributionAnalysis: 遗漏分布分析结果
+    """
+    crawler = get_crawler()
+
+    if limit <= 0:
+        if ctx:
+            await ctx.info("正在分析全部历史双色球号码遗漏分布...")
+
+        engine = await crawler.history_engine()
+        gap_data = engine.gaps() if engine is not None else None
+
+        if gap_data is None:
+            return GapDistributionAnalysis(
+                red_gaps=[],
+                blue_gaps=[],
+                total=0,
+                latest_issue=None,
+                markdown="没有找到数据（分析全部历史数据需要启用本地存储）"
+            )
+    else:
+        if ctx:
+            await ctx.info(f"正在分析最近{limit}期双色球号码遗漏分布...")
+
+        table = await crawler.fetch_table(limit=limit)
+
+        if len(table) == 0:
+            return GapDistributionAnalysis(
+                red_gaps=[],
+                blue_gaps=[],
+                total=0,
+                latest_issue=None,
+                markdown="没有找到数据"
+            )
+
+        gap_data = await crawler.analyze_gap_distribution(table)
+
+        if gap_data is None:
+            return GapDistributionAnalysis(
+                red_gaps=[],
+                blue_gaps=[],
+                total=0,
+                latest_issue=None,
+                markdown="分析失败"
+            )
+
+    structured, with_markdown = output_parts(output)
+
+    return GapDistributionAnalysis(
+        red_gaps=[NumberGapStats(**item) for item in gap_data['red_gaps']] if structured else [],
+        blue_gaps=[NumberGapStats(**item) for item in gap_data['blue_gaps']] if structured else [],
+        total=gap_data['total'],
+        latest_issue=gap_data.get('latest_issue'),
+        markdown=crawler.format_gap_distribution_to_markdown(gap_data) if with_markdown else ""
+    )
+
+
+@mcp.tool()
+async def analyze_cooccurrence(limit: int = 0, top_k: int = 10, output: OutputMode = "both",
+                               ctx: Context = None) -> CooccurrenceAnalysis:
+    """
+    分析红球号码共同出现的次数（号码对和三元组）
+
+    Args:
+        limit: 分析的期数，默认为0，即分析本地保存的全部历史数据
+        top_k: 返回共同出现次数最多的前K个号码对和三元组，默认为10
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        ctx: MCP上下文
+
+    Returns:
+        CooccurrenceAnalysis: 共现分析结果
+    """
+    crawler = get_crawler()
+
+    top_k = max(top_k, 1)
+
+    if limit <= 0:
+        if ctx:
+            await ctx.info("正在分析全部历史双色球红球共现次数...")
+
+        # 全部历史数据的共现矩阵由增量分析引擎维护，按最新期号缓存
+        engine = await crawler.history_engine()
+        cooccurrence_data = engine.cooccurrence(top_k) if engine is not None else None
+
+        if cooccurrence_data is None:
+            return CooccurrenceAnalysis(
+                pairs=[],
+                triples=[],
+                total=0,
+                latest_issue=None,
+                markdown="没有找到数据（分析全部历史数据需要启用本地存储）"
+            )
+    else:
+        if ctx:
+            await ctx.info(f"正在分析最近{limit}期双色球红球共现次数...")
+
+        table = await crawler.fetch_table(limit=limit)
+
+        if len(table) == 0:
+            return CooccurrenceAnalysis(
+                pairs=[],
+                triples=[],
+                total=0,
+                latest_issue=None,
+                markdown="没有找到数据"
+            )
+
+        cooccurrence_data = await crawler.analyze_cooccurrence(table, top_k)
+
+        if cooccurrence_data is None:
+            return CooccurrenceAnalysis(
+                pairs=[],
+                triples=[],
+                total=0,
+                latest_issue=None,
+                markdown="分析失败"
+            )
+
+    structured, with_markdown = output_parts(output)
+
+    return CooccurrenceAnalysis(
+        pairs=[NumberGroupCount(numbers=list(numbers), count=count)
+               for numbers, count in cooccurrence_data['pairs']] if structured else [],
+        triples=[NumberGroupCount(numbers=list(numbers), count=count)
+                 for numbers, count in cooccurrence_data['triples']] if structured else [],
+        total=cooccurrence_data['total'],
+        latest_issue=cooccurrence_data.get('latest_issue'),
+        markdown=crawler.format_cooccurrence_to_markdown(cooccurrence_data) if with_markdown else ""
+    )
+
+
+@mcp.tool()
+async def match_numbers(red_numbers: List[int], blue_number: Optional[int] = None, limit: int = 0,
+                        top_n: int = 10, output: OutputMode = "both", ctx: Context = None) -> NumberMatchAnalysis:
+    """
+    将一注号码与历史开奖号码比较：包含全部号码的开奖、红球重合个数分布和重合最多的开奖，
+    以及相邻两期的红球重号
+
+    Args:
+        red_numbers: 红球号码（1-33），可以是复式，例如 [3, 7, 12, 21, 28, 33]
+        blue_number: 蓝球号码（1-16），默认为None即不比较蓝球
+        limit: 比较的期数，默认为0，即比较本地保存的全部历史数据
+        top_n: 返回的完全包含和重合最多的开奖期数上限，默认为10
+        output: 输出方式，默认为 "both"；"structured" 只返回结构化数据，"markdown" 只返回Markdown
+        ctx: MCP上下文
+
+    Returns:
+        NumberMatchAnalysis: 比较结果
+    """
+    crawler = get_crawler()
+
+    def empty(markdown: str) -> NumberMatchAnalysis:
+        return NumberMatchAnalysis(
+            red_numbers=sorted(set(red_numbers)), blue_number=blue_number, matched_count=0, matched_issues=[],
+            hit_distribution={}, blue_hits=0, best_matches=[], latest_repeat=[], repeat_distribution={},
+            total=0, latest_issue=None, markdown=markdown
+        )
+
+    if not red_numbers or any(not 1 <= num <= 33 for num in red_numbers) \
+            or (blue_number is not None and not 1 <= blue_number <= 16):
+        return empty("号码无效：红球号码为1-33，蓝球号码为1-16")
+
+    if limit <= 0:
+        if ctx:
+            await ctx.info("正在与全部历史双色球开奖号码比较...")
+
+        # 分析引擎按期号升序保存全部历史数据，比较时按期号降序
+        engine = await crawler.history_engine()
+        if engine is None or engine.total == 0:
+            return empty("没有找到数据（比较全部历史数据需要启用本地存储）")
+        table = engine.table[::-1]
+    else:
+        if ctx:
+            await ctx.info(f"正在与最近{limit}期双色球开奖号码比较...")
+
+        table = await crawler.fetch_table(limit=limit)
+        if len(table) == 0:
+            return empty("没有找到数据")
+
+    match_data = await crawler.match_numbers(table, red_numbers, blue_number, max(top_n, 1))
+    if match_data is None:
+        return empty("分析失败")
+
+    structured, with_markdown = output_parts(output)
+
+    return NumberMatchAnalysis(
+        red_numbers=match_data['red_numbers'],
+        blue_number=match_data['blue_number'],
+        matched_count=match_data['matched_count'],
+        matched_issues=match_data['matched_issues'] if structured else [],
+        hit_distribution=match_data['hit_distribution'] if structured else {},
+        blue_hits=match_data['blue_hits'],
+        best_matches=[DrawMatch(**item) for item in match_data['best_matches']] if structured else [],
+        latest_repeat=match_data['latest_repeat'],
+        repeat_distribution=match_data['repeat_distribution'] if structured else {},
+        total=match_data['total'],
+        latest_issue=match_data['latest_issue'],
+        markdown=crawler.format_match_to_markdown(match_data) if with_markdown else ""
+    )
+
+
+@mcp.tool()
+async def backfill_history(start_year: int = 2003, concurrency: Optional[int] = None, ctx: Context = None) -> BackfillResult:
+    """
+    获取全部历史数据并保存到本地
+
+    按年份拆分后并发获取，中途失败的年份可以重新执行本工具继续获取。
+
+    Args:
+        start_year: 起始年份，默认为2003
+        concurrency: 最大并发请求数，默认使用配置中的 backfill.concurrency
+        ctx: MCP上下文
+
+    Returns:
+        BackfillResult: 回填结果
+    """
+    crawler = get_crawler()
+
+    if ctx:
+        await ctx.info(f"正在获取{start_year}年以来的全部双色球历史数据...")
+
+    result = await crawler.backfill(start_year=start_year, concurrency=concurrency, progress=progress_reporter(ctx))
+
+    if result.get('error'):
+        return BackfillResult(
+            completed=[],
+            staged=[],
+            failed=[],
+            skipped=[],
+            added=0,
+            total=0,
+            markdown=f"历史数据回填失败：{result['error']}"
+        )
+
+    lines = [
+        "### 历史数据回填结果\n",
+        f"- 历史数据总期数: {result['total']}",
+        f"- 新增期数: {result['added']}",
+        f"- 已保存的年份: {', '.join(map(str, result['completed'])) or '无'}",
+        f"- 已获取但暂未保存的年份: {', '.join(map(str, result['staged'])) or '无'}",
+        f"- 本地已有的年份: {', '.join(map(str, result['skipped'])) or '无'}",
+        f"- 获取失败的年份: {', '.join(map(str, result['failed'])) or '无'}"
+    ]
+
+    return BackfillResult(
+        completed=result['completed'],
+        staged=result['staged'],
+        failed=result['failed'],
+        skipped=result['skipped'],
+        added=result['added'],
+        total=result['total'],
+        markdown="\n".join(lines)
+    )
+
+
 @mcp.tool()
 async def get_proxy_status(ctx: Context = None) -> Dict[str, Any]:
     """
@@ -317,14 +914,46 @@ async def get_proxy_status(ctx: Context = None) -> Dict[str, Any]:
     }
 
 
+@mcp.tool()
+async def get_upstream_status(ctx: Context = None) -> Dict[str, Any]:
+    """
+    获取上游网站请求的统计信息、流量和熔断器状态
+
+    Args:
+        ctx: MCP上下文
+
+    Returns:
+        Dict: 请求、重试、失败和304次数，传输字节数与压缩比，解析策略链、熔断器状态以及内存缓存命中情况
+    """
+    return get_crawler().upstream_status()
+
+
+@mcp.tool()
+async def get_executor_status(ctx: Context = None) -> Dict[str, Any]:
+    """
+    获取页面解析和数据分析任务执行器的状态
+
+    Args:
+        ctx: MCP上下文
+
+    Returns:
+        Dict: 执行方式、任务数上限、正在执行和排队的任务数，以及平均和最大排队时间、平均执行时间（毫秒）
+    """
+    return get_crawler().cpu.status()
+
+
 # 健康检查端点
 async def health_check(request):
     """健康检查端点"""
+    from aiohttp import web
+
     return web.json_response({"status": "ok"})
 
 # 启动 Web 服务器和 MCP 服务
 async def start_server():
     """启动 Web 服务器和 MCP 服务"""
+    from aiohttp import web
+
     # 创建 Web 应用
     app = web.Application()
     app.router.add_get('/health', health_check)
@@ -338,7 +967,10 @@ async def start_server():
     print("Web 服务器已启动，监听端口 8000")
 
     # 启动 MCP 服务
-    await mcp.run_async()
+    try:
+        await mcp.run_async()
+    finally:
+        await runner.cleanup()
 
 if __name__ == "__main__":
     # 启动服务器
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+双色球开奖数据本地存储模块
+
+使用 SQLite 保存已经公布的开奖数据。开奖结果一经公布就不会再变化，
+因此本地数据只需要追加，不需要更新。
+
+存储中的数据始终是一段连续的期号区间：从最早保存的一期一直到最新保存的一期，
+中间没有缺口，所以 ``earliest_issue()`` 到 ``latest_issue()`` 之间的查询可以完全在本地完成。
+回填历史数据时先到达、暂时无法与已有数据衔接的年份保存在暂存表中，衔接后再写入正式数据表。
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional, List, Tuple
+
+import pandas as pd
+
+
+# DataFrame 列名，与爬虫解析结果保持一致
+COLUMNS = ['期号', '红球1', '红球2', '红球3', '红球4', '红球5', '红球6', '蓝球', '开奖日期']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS draws (
+    issue TEXT PRIMARY KEY,
+    red1 INTEGER NOT NULL,
+    red2 INTEGER NOT NULL,
+    red3 INTEGER NOT NULL,
+    red4 INTEGER NOT NULL,
+    red5 INTEGER NOT NULL,
+    red6 INTEGER NOT NULL,
+    blue INTEGER NOT NULL,
+    draw_date TEXT
+);
+CREATE TABLE IF NOT EXISTS draws_staging (
+    issue TEXT PRIMARY KEY,
+    red1 INTEGER NOT NULL,
+    red2 INTEGER NOT NULL,
+    red3 INTEGER NOT NULL,
+    red4 INTEGER NOT NULL,
+    red5 INTEGER NOT NULL,
+    red6 INTEGER NOT NULL,
+    blue INTEGER NOT NULL,
+    draw_date TEXT
+);
+CREATE TABLE IF NOT EXISTS staged_years (
+    year INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_SELECT = "SELECT issue, red1, red2, red3, red4, red5, red6, blue, draw_date FROM draws"
+
+
+class SSQDrawStore:
+    """双色球开奖数据本地存储类（SQLite）"""
+
+    def __init__(self, db_path: str):
+        """
+        初始化本地存储
+
+        Args:
+            db_path: SQLite 数据库文件路径，不存在时自动创建
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def count(self) -> int:
+        """
+        获取本地保存的期数
+
+        Returns:
+            int: 期数
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM draws").fetchone()[0]
+
+    def latest_issue(self) -> Optional[str]:
+        """
+        获取本地保存的最新期号
+
+        Returns:
+            str: 最新期号，没有数据则返回None
+        """
+        with self._lock:
+            return self._conn.execute("SELECT MAX(issue) FROM draws").fetchone()[0]
+
+    def earliest_issue(self) -> Optional[str]:
+        """
+        获取本地保存的最早期号
+
+        Returns:
+            str: 最早期号，没有数据则返回None
+        """
+        with self._lock:
+            return self._conn.execute("SELECT MIN(issue) FROM draws").fetchone()[0]
+
+    def save(self, df: Optional[pd.DataFrame]) -> int:
+        """
+        保存开奖数据，已存在的期号会被忽略
+
+        Args:
+            df: 爬虫返回的DataFrame数据
+
+        Returns:
+            int: 新增的期数
+        """
+        if df is None or df.empty:
+            return 0
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO draws VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _records(df)
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def stage(self, year: int, df: Optional[pd.DataFrame]) -> None:
+        """
+        暂存某一年份的完整开奖数据，等待与正式数据衔接后再写入
+
+        Args:
+            year: 年份
+            df: 该年份的全部开奖数据
+        """
+        records = [] if df is None else _records(df)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO draws_staging VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            self._conn.execute("INSERT OR IGNORE INTO staged_years VALUES (?)", (int(year),))
+            self._conn.commit()
+
+    def staged_years(self) -> List[int]:
+        """
+        获取已暂存的年份
+
+        Returns:
+            list: 年份列表，按升序排列
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT year FROM staged_years ORDER BY year").fetchall()
+        return [row[0] for row in rows]
+
+    def commit_staged(self, year: int) -> int:
+        """
+        将暂存的某一年份数据写入正式数据表，并从暂存表中删除
+
+        Args:
+            year: 年份
+
+        Returns:
+            int: 新增的期数
+        """
+        start, end = f"{year % 100:02d}001", f"{year % 100:02d}999"
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute(
+                "INSERT OR IGNORE INTO draws SELECT * FROM draws_staging WHERE issue BETWEEN ? AND ?",
+                (start, end)
+            )
+            added = self._conn.total_changes - before
+            self._conn.execute("DELETE FROM draws_staging WHERE issue BETWEEN ? AND ?", (start, end))
+            self._conn.execute("DELETE FROM staged_years WHERE year = ?", (int(year),))
+            self._conn.commit()
+            return added
+
+    def load_recent(self, limit: int) -> Optional[pd.DataFrame]:
+        """
+        读取最近N期数据，按期号降序排列
+
+        Args:
+            limit: 读取的期数
+
+        Returns:
+            DataFrame: 开奖数据，没有数据则返回None
+        """
+        return self._query(f"{_SELECT} ORDER BY issue DESC LIMIT ?", (limit,))
+
+    def load_range(self, start_issue: str, end_issue: str) -> Optional[pd.DataFrame]:
+        """
+        读取指定期号范围的数据，按期号降序排列
+
+        Args:
+            start_issue: 起始期号
+            end_issue: 结束期号
+
+        Returns:
+            DataFrame: 开奖数据，没有数据则返回None
+        """
+        return self._query(
+            f"{_SELECT} WHERE issue BETWEEN ? AND ? ORDER BY issue DESC",
+            (str(start_issue), str(end_issue))
+        )
+
+    def load_newer(self, issue: Optional[str]) -> Optional[pd.DataFrame]:
+        """
+        读取比指定期号更新的数据，按期号升序排列
+
+        Args:
+            issue: 期号，为None时读取全部数据
+
+        Returns:
+            DataFrame: 开奖数据，没有数据则返回None
+        """
+        if issue is None:
+            return self._query(f"{_SELECT} ORDER BY issue ASC", ())
+        return self._query(f"{_SELECT} WHERE issue > ? ORDER BY issue ASC", (str(issue),))
+
+    def _query(self, sql: str, params: Tuple) -> Optional[pd.DataFrame]:
+        """执行查询并转换为DataFrame"""
+        with self._lock:
+            rows: List[Tuple] = self._conn.execute(sql, params).fetchall()
+        if not rows:
+            return None
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        df['开奖日期'] = df['开奖日期'].fillna("")
+        return df
+
+
+def _records(df: pd.DataFrame) -> List[Tuple]:
+    """将DataFrame转换为数据库记录"""
+    dates = df['开奖日期'] if '开奖日期' in df.columns else [None] * len(df)
+    return [
+        (str(issue), int(r1), int(r2), int(r3), int(r4), int(r5), int(r6), int(blue), date or None)
+        for issue, r1, r2, r3, r4, r5, r6, blue, date in zip(
+            df['期号'], df['红球1'], df['红球2'], df['红球3'],
+            df['红球4'], df['红球5'], df['红球6'], df['蓝球'], dates
+        )
+    ]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+双色球紧凑数据表模块
+
+用连续的 NumPy 数组保存开奖数据：N×7 的 uint8 球号矩阵（前6列为红球，第7列为蓝球）、
+int32 期号数组和 int32 开奖日期数组（距 1970-01-01 的天数）。
+全部历史数据只占几十KB，分析时可以整体放入CPU缓存。
+
+每期的红球还可以编码为 uint64 位掩码（号码n对应第n-1位，共33位），
+蓝球编码为 uint16 位掩码（共16位），用于向量化的集合运算。
+"""
+
+from typing import Optional, List, Union
+
+import numpy as np
+import pandas as pd
+
+
+# 期号的显示宽度，例如 3001 显示为 "03001"
+ISSUE_WIDTH = 5
+# 没有开奖日期时使用的天数
+NO_DATE = -1
+
+RED_COLUMNS = ['红球1', '红球2', '红球3', '红球4', '红球5', '红球6']
+
+
+class DrawTable:
+    """紧凑的双色球开奖数据表"""
+
+    __slots__ = ('issues', 'balls', 'days', '_red_masks', '_blue_masks')
+
+    def __init__(self, issues: np.ndarray, balls: np.ndarray, days: np.ndarray):
+        """
+        初始化数据表
+
+        Args:
+            issues: 期号数组，长度为N
+            balls: 球号矩阵，形状为N×7，前6列为红球，第7列为蓝球
+            days: 开奖日期数组（距 1970-01-01 的天数），没有日期时为 NO_DATE
+        """
+        self.issues = np.ascontiguousarray(issues, dtype=np.int32)
+        self.balls = np.ascontiguousarray(balls, dtype=np.uint8).reshape(-1, 7)
+        self.days = np.ascontiguousarray(days, dtype=np.int32)
+        self._red_masks: Optional[np.ndarray] = None
+        self._blue_masks: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.issues)
+
+    def __getitem__(self, index) -> 'DrawTable':
+        """按切片或索引数组选取行"""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+        return DrawTable(self.issues[index], self.balls[index], self.days[index])
+
+    @property
+    def reds(self) -> np.ndarray:
+        """红球矩阵，形状为N×6"""
+        return self.balls[:, :6]
+
+    @property
+    def blues(self) -> np.ndarray:
+        """蓝球数组，长度为N"""
+        return self.balls[:, 6]
+
+    @property
+    def red_masks(self) -> np.ndarray:
+        """红球位掩码数组（uint64），号码n对应第n-1位，首次访问时计算"""
+        if self._red_masks is None:
+            bits = np.left_shift(np.uint64(1), self.reds.astype(np.uint64) - np.uint64(1))
+            self._red_masks = np.bitwise_or.reduce(bits, axis=1) if len(self) else np.empty(0, np.uint64)
+        return self._red_masks
+
+    @property
+    def blue_masks(self) -> np.ndarray:
+        """蓝球位掩码数组（uint16），号码n对应第n-1位，首次访问时计算"""
+        if self._blue_masks is None:
+            self._blue_masks = np.left_shift(np.uint16(1), self.blues.astype(np.uint16) - np.uint16(1))
+        return self._blue_masks
+
+    @property
+    def nbytes(self) -> int:
+        """占用的内存字节数"""
+        return self.issues.nbytes + self.balls.nbytes + self.days.nbytes
+
+    @classmethod
+    def empty(cls) -> 'DrawTable':
+        """创建空数据表"""
+        return cls(np.empty(0, np.int32), np.empty((0, 7), np.uint8), np.empty(0, np.int32))
+
+    @classmethod
+    def from_dataframe(cls, df: Optional[pd.DataFrame]) -> 'DrawTable':
+        """
+        从爬虫返回的DataFrame创建数据表
+
+        Args:
+            df: 包含期号、红球1-6、蓝球和开奖日期列的DataFrame
+
+        Returns:
+            DrawTable: 数据表，行顺序与DataFrame一致
+        """
+        if df is None or df.empty:
+            return cls.empty()
+
+        try:
+            issues = np.fromiter(map(int, df['期号'].tolist()), dtype=np.int32, count=len(df))
+        except ValueError:
+            issues = pd.to_numeric(df['期号'], errors='coerce').fillna(0).to_numpy(np.int32)
+        balls = df[RED_COLUMNS + ['蓝球']].to_numpy(np.uint8)
+
+        if '开奖日期' in df.columns:
+            try:
+                # 日期都是 YYYY-MM-DD 或空字符串时直接由NumPy解析，空字符串解析为NaT
+                dates = np.array(df['开奖日期'].fillna("").tolist(), dtype='datetime64[D]')
+            except ValueError:
+                dates = pd.to_datetime(df['开奖日期'], format='%Y-%m-%d', errors='coerce').to_numpy('datetime64[D]')
+            days = dates.astype(np.int64)
+            days[np.isnat(dates)] = NO_DATE
+        else:
+            days = np.full(len(df), NO_DATE)
+
+        return cls(issues, balls, days)
+
+    @classmethod
+    def coerce(cls, data: Union[pd.DataFrame, 'DrawTable', None]) -> 'DrawTable':
+        """将DataFrame或数据表统一转换为数据表"""
+        if isinstance(data, DrawTable):
+            return data
+        return cls.from_dataframe(data)
+
+    def issue_strings(self) -> List[str]:
+        """期号字符串列表，例如 "03001" """
+        return [str(issue).zfill(ISSUE_WIDTH) for issue in self.issues.tolist()]
+
+    def date_strings(self) -> List[str]:
+        """开奖日期字符串列表，没有日期时为空字符串"""
+        dates = np.datetime_as_string(self.days.astype('datetime64[D]'))
+        dates[self.days == NO_DATE] = ""
+        return dates.tolist()
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        转换为爬虫使用的DataFrame格式
+
+        Returns:
+            DataFrame: 包含期号、红球1-6、蓝球和开奖日期列的DataFrame
+        """
+        df = pd.DataFrame(self.balls.astype(np.int64), columns=RED_COLUMNS + ['蓝球'])
+        df.insert(0, '期号', self.issue_strings())
+        df['开奖日期'] = self.date_strings()
+        return df